@@ -0,0 +1,319 @@
+"""
+Disk-backed animal storage for the Wildlife Rehabilitation Management System.
+
+AnimalStore keeps animal records in SQLite so that populations larger than
+memory can be tracked. AnimalCache sits in front of a store as a bounded LRU
+of hydrated Animal objects and can be passed to RehabilitationCenter in place
+of its in-memory animal dict. LazyAnimal is an Animal that carries only the
+fields routine operations need (species included, since placement checks it
+against the species catalog) and loads the rest from the store on demand.
+"""
+
+import sqlite3
+import sys
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+from wildlife_rehabilitation_management_system import Animal
+
+
+class AnimalStore:
+    """SQLite-backed table of animal records keyed by animal_id."""
+    
+    def __init__(self, path=":memory:"):
+        """
+        Open (or create) an animal store.
+        
+        Args:
+            path: SQLite database file, or ":memory:" for a temporary store
+        """
+        self.__conn = None
+        if not isinstance(path, str) or not path:
+            raise ValueError("Store path must be a non-empty string")
+        
+        self.__path = path
+        self.__conn = sqlite3.connect(path)
+        self.__conn.execute(
+            "CREATE TABLE IF NOT EXISTS animals ("
+            "animal_id TEXT PRIMARY KEY, species TEXT, condition TEXT, intake_date TEXT, "
+            "discharge_date TEXT, assigned_enclosure TEXT, status TEXT)"
+        )
+    
+    def __del__(self):
+        """Commit pending writes and close the database connection."""
+        self.close()
+    
+    @property
+    def path(self): return self.__path
+    
+    @property
+    def closed(self): return self.__conn is None
+    
+    def __len__(self):
+        return self.__conn.execute("SELECT COUNT(*) FROM animals").fetchone()[0]
+    
+    def __contains__(self, animal_id):
+        row = self.__conn.execute("SELECT 1 FROM animals WHERE animal_id = ?", (animal_id,)).fetchone()
+        return row is not None
+    
+    def get(self, animal_id):
+        """Return the record tuple for an animal, or None if it is not stored."""
+        return self.__conn.execute("SELECT * FROM animals WHERE animal_id = ?", (animal_id,)).fetchone()
+    
+    def put(self, record):
+        """Insert or replace a single record (see Animal.to_record)."""
+        self.__conn.execute("INSERT OR REPLACE INTO animals VALUES (?, ?, ?, ?, ?, ?, ?)", record)
+    
+    def get_details(self, animal_id):
+        """Return (species, condition, intake_date) for an animal, or None."""
+        return self.__conn.execute(
+            "SELECT species, condition, intake_date FROM animals WHERE animal_id = ?", (animal_id,)
+        ).fetchone()
+    
+    def get_lazy(self, animal_id):
+        """Return a LazyAnimal for a stored animal, or None."""
+        row = self.__conn.execute(
+            "SELECT animal_id, species, status, assigned_enclosure, discharge_date FROM animals "
+            "WHERE animal_id = ?",
+            (animal_id,),
+        ).fetchone()
+        return LazyAnimal(*row, store=self) if row is not None else None
+    
+    def load_lazy(self):
+        """Yield a LazyAnimal for every stored animal, reading only the hot columns."""
+        rows = self.__conn.execute(
+            "SELECT animal_id, species, status, assigned_enclosure, discharge_date FROM animals"
+        ).fetchall()
+        for row in rows:
+            yield LazyAnimal(*row, store=self)
+    
+    def put_many(self, records):
+        """Insert or replace many records in one statement."""
+        self.__conn.executemany("INSERT OR REPLACE INTO animals VALUES (?, ?, ?, ?, ?, ?, ?)", records)
+    
+    def update_state(self, states):
+        """Update (discharge_date, assigned_enclosure, status, animal_id) rows in bulk."""
+        self.__conn.executemany(
+            "UPDATE animals SET discharge_date = ?, assigned_enclosure = ?, status = ? WHERE animal_id = ?",
+            states,
+        )
+    
+    def delete(self, animal_id):
+        """Remove a record. Returns True if one was deleted."""
+        return self.__conn.execute("DELETE FROM animals WHERE animal_id = ?", (animal_id,)).rowcount > 0
+    
+    def ids(self):
+        """Return a list of every stored animal_id."""
+        return [row[0] for row in self.__conn.execute("SELECT animal_id FROM animals")]
+    
+    def commit(self):
+        """Make pending writes durable."""
+        self.__conn.commit()
+    
+    def close(self):
+        """Commit and close the connection. Safe to call more than once."""
+        if self.__conn is not None:
+            self.__conn.commit()
+            self.__conn.close()
+            self.__conn = None
+
+
+class LazyAnimal(Animal):
+    """
+    Animal proxy holding only animal_id, species, status, assigned_enclosure
+    and discharge_date; condition and intake_date are read from the store
+    on first access.
+    """
+    
+    def __init__(self, animal_id, species, status, assigned_enclosure, discharge_date, store):
+        """Initialize the proxy from the hot columns of a stored record."""
+        super().__init__(animal_id, species, None, None)
+        if discharge_date is not None:
+            self.discharge(discharge_date, status)
+        self.assigned_enclosure = assigned_enclosure
+        self.__store = store
+        self.__details = None
+    
+    @property
+    def is_loaded(self): return self.__details is not None
+    
+    @property
+    def condition(self): return self.__load()[1]
+    
+    @property
+    def intake_date(self): return self.__load()[2]
+    
+    def __load(self):
+        if self.__details is None:
+            details = self.__store.get_details(self.animal_id)
+            if details is None:
+                raise KeyError(f"Animal {self.animal_id} is no longer in the store")
+            self.__details = tuple(details)
+        return self.__details
+
+
+def state_of(animal):
+    """Return the mutable part of an animal's record, used for dirty checks."""
+    return (animal.discharge_date, animal.assigned_enclosure, animal.status)
+
+
+def estimate_size(animal):
+    """Approximate bytes held by a hydrated animal and its loaded field values."""
+    size = sys.getsizeof(animal) + sys.getsizeof(animal.__dict__)
+    for value in animal.__dict__.values():
+        if isinstance(value, str):
+            size += sys.getsizeof(value)
+        elif isinstance(value, tuple):
+            size += sum(sys.getsizeof(item) for item in value)
+    return size
+
+
+class AnimalCache(MutableMapping):
+    """
+    Bounded LRU of hydrated Animal objects in front of an AnimalStore.
+    
+    New animals are written through to the store. Entries whose state changed
+    since they were loaded (discharge, assigned_enclosure) are written back
+    when they are evicted or on flush(). Animals handed out before being
+    evicted are detached copies; fetch them again after further cache traffic.
+    With lazy=True, misses hydrate LazyAnimal proxies instead of full animals.
+    """
+    
+    def __init__(self, store, max_entries=None, max_bytes=None, lazy=False):
+        """
+        Initialize the cache.
+        
+        Args:
+            store: AnimalStore holding the full population
+            max_entries: Maximum number of hydrated animals kept in memory
+            max_bytes: Maximum estimated bytes of hydrated animals kept in memory
+            lazy: Hydrate LazyAnimal proxies instead of fully loaded animals
+        """
+        self.__store = None
+        if max_entries is None and max_bytes is None:
+            raise ValueError("Either max_entries or max_bytes must be given")
+        if max_entries is not None and (not isinstance(max_entries, int) or max_entries <= 0):
+            raise ValueError("max_entries must be a positive integer")
+        if max_bytes is not None and (not isinstance(max_bytes, int) or max_bytes <= 0):
+            raise ValueError("max_bytes must be a positive integer")
+        
+        self.__store = store
+        self.__max_entries = max_entries
+        self.__max_bytes = max_bytes
+        self.__lazy = lazy
+        # animal_id -> (animal, state when loaded, estimated size)
+        self.__entries = OrderedDict()
+        self.__bytes = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__writebacks = 0
+    
+    def __del__(self):
+        """Write back dirty entries before the cache goes away."""
+        self.flush()
+    
+    @property
+    def store(self): return self.__store
+    
+    @property
+    def cached_count(self): return len(self.__entries)
+    
+    @property
+    def cached_bytes(self): return self.__bytes
+    
+    def stats(self):
+        """Return hit/miss/eviction counters as a dict."""
+        lookups = self.__hits + self.__misses
+        return {
+            "hits": self.__hits,
+            "misses": self.__misses,
+            "evictions": self.__evictions,
+            "writebacks": self.__writebacks,
+            "hit_ratio": self.__hits / lookups if lookups else 0.0,
+            "cached_entries": len(self.__entries),
+            "cached_bytes": self.__bytes,
+        }
+    
+    def __getitem__(self, animal_id):
+        entry = self.__entries.get(animal_id)
+        if entry is not None:
+            self.__hits += 1
+            self.__entries.move_to_end(animal_id)
+            return entry[0]
+        
+        self.__misses += 1
+        if self.__lazy:
+            animal = self.__store.get_lazy(animal_id)
+        else:
+            record = self.__store.get(animal_id)
+            animal = Animal.from_record(record) if record is not None else None
+        if animal is None:
+            raise KeyError(animal_id)
+        self.__insert(animal)
+        return animal
+    
+    def __setitem__(self, animal_id, animal):
+        if animal_id != animal.animal_id:
+            raise ValueError("Key must match the animal's animal_id")
+        self.__store.put(animal.to_record())
+        self.__discard(animal_id)
+        self.__insert(animal)
+    
+    def __delitem__(self, animal_id):
+        self.__discard(animal_id)
+        if not self.__store.delete(animal_id):
+            raise KeyError(animal_id)
+    
+    def __contains__(self, animal_id):
+        return animal_id in self.__entries or animal_id in self.__store
+    
+    def __len__(self):
+        return len(self.__store)
+    
+    def __iter__(self):
+        return iter(self.__store.ids())
+    
+    def flush(self):
+        """Write back every dirty cached entry and commit the store."""
+        if self.__store is None or self.__store.closed:
+            return
+        dirty = []
+        for animal_id, (animal, loaded, size) in self.__entries.items():
+            state = state_of(animal)
+            if state != loaded:
+                dirty.append(state + (animal_id,))
+                self.__entries[animal_id] = (animal, state, size)
+        self.__store.update_state(dirty)
+        self.__writebacks += len(dirty)
+        self.__store.commit()
+    
+    def clear(self):
+        """Flush and drop every hydrated animal; the store itself is kept."""
+        self.flush()
+        self.__entries.clear()
+        self.__bytes = 0
+    
+    def __insert(self, animal):
+        size = estimate_size(animal) if self.__max_bytes is not None else 0
+        self.__entries[animal.animal_id] = (animal, state_of(animal), size)
+        self.__bytes += size
+        while len(self.__entries) > 1 and (
+            (self.__max_entries is not None and len(self.__entries) > self.__max_entries)
+            or (self.__max_bytes is not None and self.__bytes > self.__max_bytes)
+        ):
+            self.__evict()
+    
+    def __evict(self):
+        animal_id, (animal, loaded, size) = self.__entries.popitem(last=False)
+        self.__bytes -= size
+        self.__evictions += 1
+        state = state_of(animal)
+        if state != loaded:
+            self.__store.update_state([state + (animal_id,)])
+            self.__writebacks += 1
+    
+    def __discard(self, animal_id):
+        entry = self.__entries.pop(animal_id, None)
+        if entry is not None:
+            self.__bytes -= entry[2]
@@ -0,0 +1,357 @@
+"""
+Medical attachment storage for the Wildlife Rehabilitation Management System.
+
+AttachmentStore keeps intake photos, X-rays, lab reports and similar files
+on disk instead of in memory. Each distinct content is stored once, keyed
+by its SHA-256 digest, so the same file attached to several animals costs
+its size only once. Contents are appended to pack files (a new pack is
+started when a record would take the current one past pack_size; a
+content larger than that gets a pack of its own); a pack record is a
+fixed header (digest, length) followed by the data, and records are never
+rewritten once complete. Reads map the pack with mmap and return memoryview slices of
+it, so reading an attachment copies nothing into the Python heap.
+
+Which animal has which attachments is kept in an append-only catalog file
+in the same directory, keyed by animal ID rather than held on the Animal
+objects, so it survives eviction from an AnimalCache, serialization and
+replication. Animal.attach() and Animal.stream_attachment() are thin
+wrappers over the store.
+
+Opening a store rebuilds the digest index by reading only the pack
+headers. A record cut short by a crash is truncated away: put() writes
+the header before the data, so a short record's length reaches past the
+end of the pack, and put_stream(), which only knows the digest at the
+end, first writes a provisional header that marks the record incomplete.
+Records with that marker or an all-zero digest end the valid part of a
+pack.
+"""
+
+import hashlib
+import mmap
+import os
+import threading
+from collections import namedtuple
+
+Attachment = namedtuple("Attachment", "name digest size media_type")
+
+DEFAULT_PACK_SIZE = 256 * 1024 * 1024
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# Pack record header: raw SHA-256 digest, then the content length (little-endian)
+_DIGEST_BYTES = 32
+_HEADER_BYTES = _DIGEST_BYTES + 8
+# Header of a streamed record whose digest is not known yet
+_INCOMPLETE = bytes(_DIGEST_BYTES) + b"\xff" * 8
+_CATALOG = "attachments.catalog"
+
+
+def _key(digest):
+    # Digests are hex strings in the API and raw bytes in the index
+    try:
+        return bytes.fromhex(digest)
+    except (TypeError, ValueError):
+        raise ValueError("Digest must be a hex string") from None
+
+
+class AttachmentStore:
+    """Content-addressed, append-only store of attachment blobs."""
+    
+    def __init__(self, directory, pack_size=DEFAULT_PACK_SIZE):
+        """
+        Open (or create) an attachment store.
+        
+        Args:
+            directory: Directory holding the pack and catalog files (created if missing)
+            pack_size: Size in bytes after which a new pack file is started
+        """
+        self.__packs = {}
+        self.__catalog = None
+        # Validate parameters
+        if not isinstance(directory, str) or not directory:
+            raise ValueError("Store directory must be a non-empty string")
+        if not isinstance(pack_size, int) or pack_size <= 0:
+            raise ValueError("Pack size must be a positive integer")
+        
+        os.makedirs(directory, exist_ok=True)
+        self.__directory = directory
+        self.__pack_size = pack_size
+        self.__lock = threading.Lock()
+        self.__index = {}
+        self.__maps = {}
+        self.__attachments = {}
+        self.__stored_bytes = 0
+        self.__duplicates = 0
+        self.__load_packs()
+        self.__load_catalog()
+    
+    def __del__(self):
+        """Close the pack and catalog files."""
+        self.close()
+    
+    @property
+    def directory(self): return self.__directory
+    
+    @property
+    def pack_count(self): return len(self.__packs)
+    
+    @property
+    def stored_bytes(self): return self.__stored_bytes
+    
+    @property
+    def duplicate_count(self): return self.__duplicates
+    
+    @property
+    def closed(self): return self.__catalog is None
+    
+    def __len__(self):
+        return len(self.__index)
+    
+    def __contains__(self, digest):
+        return _key(digest) in self.__index
+    
+    def put(self, data):
+        """Store a bytes-like content; returns its hex digest. Content already stored is not written again."""
+        view = memoryview(data).cast("B")
+        digest = hashlib.sha256(view).digest()
+        with self.__lock:
+            if digest in self.__index:
+                self.__duplicates += 1
+                return digest.hex()
+            
+            fd, pack, offset = self.__reserve(len(view))
+            os.pwrite(fd, digest + len(view).to_bytes(8, "little"), offset)
+            self.__write_all(fd, view, offset + _HEADER_BYTES)
+            return self.__commit(digest, pack, offset, len(view))
+    
+    def put_stream(self, stream, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Store the content read from a binary file object without holding it in memory.
+        
+        Args:
+            stream: Object with a read(size) method, e.g. an open file
+            chunk_size: Bytes read per call
+        
+        Returns:
+            str: Hex digest of the content
+        """
+        # Validate parameters
+        if not isinstance(chunk_size, int) or chunk_size <= 0:
+            raise ValueError("Chunk size must be a positive integer")
+        
+        with self.__lock:
+            # The digest is only known at the end: write the data behind a
+            # provisional header, then either fill in the real header or take
+            # the data back if it is a duplicate
+            fd, pack, offset = self.__reserve(0)
+            os.pwrite(fd, _INCOMPLETE, offset)
+            hasher = hashlib.sha256()
+            length = 0
+            try:
+                while True:
+                    chunk = stream.read(chunk_size)
+                    if not chunk:
+                        break
+                    if offset and offset + _HEADER_BYTES + length + len(chunk) > self.__pack_size:
+                        # Outgrew the space left in this pack
+                        fd, pack, offset = self.__relocate(fd, offset, length)
+                    hasher.update(chunk)
+                    self.__write_all(fd, memoryview(chunk), offset + _HEADER_BYTES + length)
+                    length += len(chunk)
+            except BaseException:
+                os.ftruncate(fd, offset)
+                raise
+            
+            digest = hasher.digest()
+            if digest in self.__index:
+                os.ftruncate(fd, offset)
+                self.__duplicates += 1
+                return digest.hex()
+            os.pwrite(fd, digest + length.to_bytes(8, "little"), offset)
+            return self.__commit(digest, pack, offset, length)
+    
+    def size(self, digest):
+        """Return the stored length of a content, or None if it is not stored."""
+        location = self.__index.get(_key(digest))
+        return location[2] if location else None
+    
+    def get(self, digest):
+        """
+        Return a content as a read-only memoryview over the mapped pack, or None.
+        
+        The view stays valid after the store is closed; release it (or let it
+        go) when done so the mapping can be unmapped.
+        """
+        location = self.__index.get(_key(digest))
+        if location is None:
+            return None
+        
+        pack, offset, length = location
+        start = offset + _HEADER_BYTES
+        mapped = self.__maps.get(pack)
+        if mapped is None or len(mapped) < start + length:
+            with self.__lock:
+                mapped = self.__map(pack)
+        return memoryview(mapped)[start:start + length]
+    
+    def stream(self, digest, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Return an iterator over a content as memoryview chunks of at most chunk_size bytes."""
+        # Validate parameters
+        if not isinstance(chunk_size, int) or chunk_size <= 0:
+            raise ValueError("Chunk size must be a positive integer")
+        
+        view = self.get(digest)
+        if view is None:
+            raise KeyError(f"Attachment {digest} is not stored")
+        return (view[start:start + chunk_size] for start in range(0, len(view), chunk_size))
+    
+    def attach(self, animal_id, data, name, media_type=None):
+        """
+        Store a content and record it as one of an animal's attachments.
+        
+        Args:
+            animal_id: ID of the animal the attachment belongs to
+            data: Bytes-like content, or a binary file object to stream from
+            name: Attachment name, unique per animal (e.g. "intake-xray.png")
+            media_type: Optional MIME type, e.g. "image/png"
+        
+        Returns:
+            Attachment: The recorded attachment
+        """
+        # Validate parameters
+        if not isinstance(animal_id, str) or not animal_id:
+            raise ValueError("Animal ID must be a non-empty string")
+        for field in (animal_id, name, media_type or ""):
+            if not isinstance(field, str) or "\t" in field or "\n" in field:
+                raise ValueError("Attachment fields must be strings without tabs or newlines")
+        if not name:
+            raise ValueError("Attachment name must be a non-empty string")
+        
+        digest = self.put_stream(data) if hasattr(data, "read") else self.put(data)
+        attachment = Attachment(name, digest, self.size(digest), media_type)
+        with self.__lock:
+            line = "\t".join((animal_id, name, digest, str(attachment.size), media_type or "")) + "\n"
+            self.__catalog.write(line.encode("utf-8"))
+            self.__record(animal_id, attachment)
+        return attachment
+    
+    def attachments(self, animal_id):
+        """Return an animal's attachments, oldest first."""
+        return list(self.__attachments.get(animal_id, {}).values())
+    
+    def find(self, animal_id, name):
+        """Return an animal's attachment by name, or None."""
+        return self.__attachments.get(animal_id, {}).get(name)
+    
+    def flush(self, sync=False):
+        """Write out the catalog; with sync=True also fsync the catalog and packs."""
+        with self.__lock:
+            self.__catalog.flush()
+            if sync:
+                os.fsync(self.__catalog.fileno())
+                for fd in self.__packs.values():
+                    os.fsync(fd)
+    
+    def close(self):
+        """Close the files. Safe to call more than once."""
+        if self.__catalog is None:
+            return
+        
+        self.__catalog.close()
+        self.__catalog = None
+        for mapped in self.__maps.values():
+            try:
+                mapped.close()
+            except BufferError:
+                # Views handed out by get() are still alive; unmapped when they go
+                pass
+        self.__maps = {}
+        for fd in self.__packs.values():
+            os.close(fd)
+        self.__packs = {}
+    
+    def __pack_path(self, pack):
+        return os.path.join(self.__directory, f"pack-{pack:06d}.pack")
+    
+    def __load_packs(self):
+        pack = 1
+        while os.path.exists(self.__pack_path(pack)):
+            fd = os.open(self.__pack_path(pack), os.O_RDWR)
+            self.__packs[pack] = fd
+            end = os.fstat(fd).st_size
+            offset = 0
+            while offset + _HEADER_BYTES <= end:
+                header = os.pread(fd, _HEADER_BYTES, offset)
+                length = int.from_bytes(header[_DIGEST_BYTES:], "little")
+                digest = header[:_DIGEST_BYTES]
+                if digest == _INCOMPLETE[:_DIGEST_BYTES] or offset + _HEADER_BYTES + length > end:
+                    # Unfinished (streamed) or short record
+                    break
+                if digest not in self.__index:
+                    self.__index[digest] = (pack, offset, length)
+                    self.__stored_bytes += length
+                offset += _HEADER_BYTES + length
+            if offset < end:
+                # Written when the process died
+                os.ftruncate(fd, offset)
+            pack += 1
+        self.__current = pack - 1 if self.__packs else None
+    
+    def __load_catalog(self):
+        path = os.path.join(self.__directory, _CATALOG)
+        if os.path.exists(path):
+            with open(path, "rb") as catalog:
+                for line in catalog:
+                    fields = line.decode("utf-8").rstrip("\n").split("\t")
+                    if len(fields) != 5:
+                        # A line cut short by a crash
+                        continue
+                    animal_id, name, digest, size, media_type = fields
+                    if bytes.fromhex(digest) in self.__index:
+                        self.__record(animal_id, Attachment(name, digest, int(size), media_type or None))
+        self.__catalog = open(path, "ab")
+    
+    def __record(self, animal_id, attachment):
+        named = self.__attachments.setdefault(animal_id, {})
+        # A re-attached name moves to the end
+        named.pop(attachment.name, None)
+        named[attachment.name] = attachment
+    
+    def __reserve(self, length):
+        # Returns (fd, pack, offset) for a new record at the end of the current pack
+        fd = self.__packs.get(self.__current)
+        offset = os.fstat(fd).st_size if fd is not None else 0
+        if fd is None or (offset and offset + _HEADER_BYTES + length > self.__pack_size):
+            self.__current = (self.__current or 0) + 1
+            fd = os.open(self.__pack_path(self.__current), os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o644)
+            self.__packs[self.__current] = fd
+            offset = 0
+        return fd, self.__current, offset
+    
+    def __relocate(self, fd, offset, length):
+        # Move a record being streamed, header included, to the start of a new pack
+        new_fd, pack, _ = self.__reserve(self.__pack_size)
+        copied = 0
+        while copied < _HEADER_BYTES + length:
+            data = os.pread(fd, min(DEFAULT_CHUNK_SIZE, _HEADER_BYTES + length - copied), offset + copied)
+            self.__write_all(new_fd, memoryview(data), copied)
+            copied += len(data)
+        os.ftruncate(fd, offset)
+        return new_fd, pack, 0
+    
+    @staticmethod
+    def __write_all(fd, view, offset):
+        while view:
+            written = os.pwrite(fd, view, offset)
+            view = view[written:]
+            offset += written
+    
+    def __commit(self, digest, pack, offset, length):
+        self.__index[digest] = (pack, offset, length)
+        self.__stored_bytes += length
+        return digest.hex()
+    
+    def __map(self, pack):
+        mapped = mmap.mmap(self.__packs[pack], 0, access=mmap.ACCESS_READ)
+        # Older maps of a growing pack stay alive as long as views use them
+        self.__maps[pack] = mapped
+        return mapped
@@ -0,0 +1,201 @@
+"""
+Consistency auditing for the Wildlife Rehabilitation Management System.
+
+Placement is recorded twice: in Animal.assigned_enclosure and in each
+Enclosure's member list. ConsistencyAuditor checks that the two agree and
+that no enclosure is over capacity. Once attached it marks animals and
+enclosures dirty as they change (membership through enclosure listeners,
+intake and discharge through center events), and check() re-verifies
+only those: for a membership change, just the animal that moved and the
+enclosure's head count, so its cost follows the amount of change rather
+than the size of the center or of its enclosures. check(full=True)
+verifies everything, which also catches state changed behind the
+center's back (e.g. assigned_enclosure set directly). With repair=True,
+problems with an unambiguous fix are fixed; the rest are reported as
+unresolved.
+
+Repairs write to the Animal and Enclosure objects directly, so run check()
+from the thread that writes to the center.
+"""
+
+import time
+import weakref
+from collections import namedtuple
+
+from events import AnimalAdded, AnimalDischarged, EnclosureAdded
+
+Issue = namedtuple("Issue", "kind animal_id enclosure_id")
+AuditReport = namedtuple("AuditReport", "animals_checked enclosures_checked issues repaired unresolved seconds")
+
+# Issue kinds
+UNKNOWN_ANIMAL = "unknown_animal"              # enclosure lists an animal the center does not have
+STALE_MEMBER = "stale_member"                  # enclosure lists an animal assigned elsewhere
+OVER_CAPACITY = "over_capacity"                # enclosure holds more animals than its capacity
+MISSING_MEMBER = "missing_member"              # animal's enclosure does not list it
+UNKNOWN_ENCLOSURE = "unknown_enclosure"        # animal is assigned to an enclosure the center does not have
+DISCHARGED_ASSIGNED = "discharged_assigned"    # discharged animal still assigned to an enclosure
+
+
+class ConsistencyAuditor:
+    """Incremental cross-check of animal assignments against enclosure membership."""
+    
+    def __init__(self):
+        """Initialize an auditor; attach() it to a center before checking."""
+        self.__center = None
+        self.__dirty_animals = set()
+        self.__dirty_enclosures = set()
+        self.__dirty_members = set()
+        self.__checks = 0
+    
+    @property
+    def dirty_count(self):
+        return len(self.__dirty_animals) + len(self.__dirty_enclosures) + len(self.__dirty_members)
+    
+    @property
+    def check_count(self): return self.__checks
+    
+    def attach(self, center):
+        """Start tracking a center's changes; returns the event Subscription."""
+        self.__center = weakref.ref(center)
+        snapshot = center.snapshot()
+        for enclosure_id in snapshot.enclosure_ids():
+            snapshot.get_enclosure(enclosure_id).add_listener(self.__on_membership)
+        # No delay: a check right after a change must see it
+        return center.subscribe(self.record, (AnimalAdded, EnclosureAdded, AnimalDischarged), max_delay=0)
+    
+    def record(self, events):
+        """Mark the animals and enclosures touched by a batch of center events."""
+        center = self.__center() if self.__center else None
+        for event in events:
+            if isinstance(event, EnclosureAdded):
+                enclosure = center.get_enclosure(event.enclosure_id) if center else None
+                if enclosure:
+                    enclosure.add_listener(self.__on_membership)
+                self.__dirty_enclosures.add(event.enclosure_id)
+            else:
+                self.__dirty_animals.add(event.animal_id)
+    
+    def mark(self, animal_id=None, enclosure_id=None):
+        """Mark an animal and/or enclosure for the next check (e.g. after a direct edit)."""
+        if animal_id is not None:
+            self.__dirty_animals.add(animal_id)
+        if enclosure_id is not None:
+            self.__dirty_enclosures.add(enclosure_id)
+    
+    def __on_membership(self, enclosure, action, animal_id):
+        self.__dirty_members.add((enclosure.enclosure_id, animal_id))
+        self.__dirty_animals.add(animal_id)
+    
+    def check(self, full=False, repair=False):
+        """
+        Verify the animals and enclosures changed since the last check.
+        
+        Args:
+            full: Verify every animal and enclosure instead
+            repair: Fix issues that have an unambiguous fix
+        
+        Returns:
+            AuditReport: Issues found, and which were repaired or left unresolved
+        """
+        center = self.__center() if self.__center else None
+        if center is None:
+            raise ValueError("Auditor is not attached to a center")
+        
+        start = time.perf_counter()
+        # Swap the dirty sets out first; changes made while checking go to the next round
+        animal_ids, self.__dirty_animals = self.__dirty_animals, set()
+        enclosure_ids, self.__dirty_enclosures = self.__dirty_enclosures, set()
+        members, self.__dirty_members = self.__dirty_members, set()
+        if full:
+            snapshot = center.snapshot()
+            animal_ids = snapshot.animal_ids()
+            enclosure_ids = snapshot.enclosure_ids()
+            members = ()
+        
+        issues = []
+        checked = set()
+        for enclosure_id in enclosure_ids:
+            enclosure = center.get_enclosure(enclosure_id)
+            if enclosure:
+                checked.add(enclosure_id)
+                self.__check_capacity(enclosure, issues)
+                # A copy: the center may change this enclosure while it is checked
+                for animal_id in enclosure.animals:
+                    self.__check_member(center, enclosure_id, animal_id, issues)
+        # Whole enclosures checked above already covered their members
+        counted = set(checked)
+        for enclosure_id, animal_id in members:
+            if enclosure_id in checked:
+                continue
+            enclosure = center.get_enclosure(enclosure_id)
+            if enclosure is None:
+                continue
+            if enclosure_id not in counted:
+                counted.add(enclosure_id)
+                self.__check_capacity(enclosure, issues)
+            if enclosure.has_animal(animal_id):
+                self.__check_member(center, enclosure_id, animal_id, issues)
+        animals_checked = 0
+        for animal_id in animal_ids:
+            animal = center.get_animal(animal_id)
+            if animal:
+                animals_checked += 1
+                self.__check_animal(center, animal, issues)
+        
+        repaired, unresolved = self.__repair(center, issues) if repair else ([], list(issues))
+        self.__checks += 1
+        return AuditReport(animals_checked, len(counted), issues, repaired, unresolved,
+                           time.perf_counter() - start)
+    
+    @staticmethod
+    def __check_capacity(enclosure, issues):
+        if enclosure.available_capacity < 0:
+            issues.append(Issue(OVER_CAPACITY, None, enclosure.enclosure_id))
+    
+    @staticmethod
+    def __check_member(center, enclosure_id, animal_id, issues):
+        animal = center.get_animal(animal_id)
+        if animal is None:
+            issues.append(Issue(UNKNOWN_ANIMAL, animal_id, enclosure_id))
+        elif animal.assigned_enclosure != enclosure_id:
+            issues.append(Issue(STALE_MEMBER, animal_id, enclosure_id))
+    
+    @staticmethod
+    def __check_animal(center, animal, issues):
+        enclosure_id = animal.assigned_enclosure
+        if enclosure_id is None:
+            return
+        
+        animal_id = animal.animal_id
+        enclosure = center.get_enclosure(enclosure_id)
+        if animal.discharge_date is not None:
+            issues.append(Issue(DISCHARGED_ASSIGNED, animal_id, enclosure_id))
+        elif enclosure is None:
+            issues.append(Issue(UNKNOWN_ENCLOSURE, animal_id, enclosure_id))
+        elif not enclosure.has_animal(animal_id):
+            issues.append(Issue(MISSING_MEMBER, animal_id, enclosure_id))
+    
+    @staticmethod
+    def __repair(center, issues):
+        repaired = []
+        unresolved = []
+        # Capacity is judged after the membership fixes, which may bring it back under
+        ordered = sorted(issues, key=lambda issue: issue.kind == OVER_CAPACITY)
+        for issue in ordered:
+            enclosure = center.get_enclosure(issue.enclosure_id)
+            animal = center.get_animal(issue.animal_id) if issue.animal_id is not None else None
+            if issue.kind in (UNKNOWN_ANIMAL, STALE_MEMBER):
+                fixed = enclosure is not None and enclosure.remove_animal(issue.animal_id)
+            elif issue.kind in (UNKNOWN_ENCLOSURE, DISCHARGED_ASSIGNED):
+                if enclosure:
+                    enclosure.remove_animal(issue.animal_id)
+                animal.assigned_enclosure = None
+                fixed = True
+            elif issue.kind == MISSING_MEMBER:
+                # Fails if the enclosure is full; the animal keeps its claim
+                fixed = enclosure is not None and enclosure.add_animal(issue.animal_id)
+            else:
+                # Which animal should leave is a staff decision
+                fixed = enclosure is not None and enclosure.available_capacity >= 0
+            (repaired if fixed else unresolved).append(issue)
+        return repaired, unresolved
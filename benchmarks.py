@@ -0,0 +1,868 @@
+"""
+Benchmarks for the Wildlife Rehabilitation Management System.
+
+Run all benchmarks with `python benchmarks.py`, or name the ones to run,
+e.g. `python benchmarks.py animal_cache`.
+"""
+
+import itertools
+import random
+import sys
+import threading
+import time
+import tracemalloc
+
+from wildlife_rehabilitation_management_system import Animal, Enclosure, RehabilitationCenter
+
+
+def make_animals(count, prefix="A"):
+    """Create `count` animals with deterministic IDs."""
+    return [Animal(f"{prefix}{i:07d}", "Red Fox", "Injured leg", "2023-05-15") for i in range(count)]
+
+
+def zipf_sampler(count, exponent=1.1, seed=7):
+    """Return a function drawing indices in [0, count) with Zipf-skewed popularity."""
+    rng = random.Random(seed)
+    cum_weights = list(itertools.accumulate(1.0 / (rank ** exponent) for rank in range(1, count + 1)))
+    population = list(range(count))
+    rng.shuffle(population)
+    return lambda k: rng.choices(population, cum_weights=cum_weights, k=k)
+
+
+def report(name, **values):
+    """Print one benchmark result line."""
+    fields = " | ".join(f"{key}={value:.4g}" if isinstance(value, float) else f"{key}={value}"
+                        for key, value in values.items())
+    print(f"{name}: {fields}")
+
+
+def bench_animal_cache(population=50_000, operations=200_000, cache_entries=5_000):
+    """Zipf-skewed get_animal/assign traffic against a store-backed center."""
+    from animal_store import AnimalCache, AnimalStore
+    
+    store = AnimalStore()
+    store.put_many(animal.to_record() for animal in make_animals(population))
+    store.commit()
+    cache = AnimalCache(store, max_entries=cache_entries)
+    center = RehabilitationCenter("Bench Center", "Bench", animal_cache=cache)
+    for i in range(population // 4):
+        center.add_enclosure(Enclosure(f"E{i:05d}", "Mammal Habitat", 8))
+    
+    ids = [f"A{i:07d}" for i in range(population)]
+    draws = zipf_sampler(population)(operations)
+    start = time.perf_counter()
+    for n, index in enumerate(draws):
+        if n % 10 == 0:
+            center.assign_animal_to_enclosure(ids[index], f"E{index // 4:05d}")
+        else:
+            center.get_animal(ids[index])
+    elapsed = time.perf_counter() - start
+    cache.flush()
+    stats = cache.stats()
+    report("animal_cache", population=population, cache_entries=cache_entries,
+           ops_per_sec=operations / elapsed, hit_ratio=stats["hit_ratio"],
+           evictions=stats["evictions"], writebacks=stats["writebacks"])
+
+
+def bench_lazy_load(population=200_000):
+    """Load a center from a store with full animals versus LazyAnimal proxies."""
+    from animal_store import AnimalStore
+    
+    store = AnimalStore()
+    store.put_many((f"A{i:07d}", "Eastern Box Turtle", f"Shell fracture, case {i}", "2023-05-22",
+                    None, None, "In rehabilitation") for i in range(population))
+    store.commit()
+    for mode in ("full", "lazy"):
+        tracemalloc.start()
+        start = time.perf_counter()
+        center = RehabilitationCenter("Bench Center", "Bench")
+        if mode == "full":
+            animals = (Animal.from_record(store.get(animal_id)) for animal_id in store.ids())
+        else:
+            animals = store.load_lazy()
+        for animal in animals:
+            center.add_animal(animal)
+        elapsed = time.perf_counter() - start
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        report("lazy_load", mode=mode, population=population, seconds=elapsed,
+               mb=current / 1e6)
+        del center
+
+
+def bench_treatments(count=500_000, queries=1_000):
+    """Schedule many treatments and time narrow due-window queries."""
+    import datetime
+    from treatments import TreatmentScheduler
+    
+    rng = random.Random(11)
+    now = datetime.datetime(2023, 6, 1, 8, 0)
+    scheduler = TreatmentScheduler()
+    start = time.perf_counter()
+    for i in range(count):
+        due = now + datetime.timedelta(minutes=rng.randrange(7 * 24 * 60))
+        scheduler.schedule(f"A{i % (count // 4):07d}", "Medication", due, 240)
+    schedule_elapsed = time.perf_counter() - start
+    
+    found = 0
+    start = time.perf_counter()
+    for q in range(queries):
+        found += len(scheduler.due_within(15, now + datetime.timedelta(minutes=q)))
+    query_elapsed = time.perf_counter() - start
+    report("treatments", count=count, schedule_per_sec=count / schedule_elapsed,
+           query_ms=query_elapsed / queries * 1e3, avg_results=found / queries)
+
+
+def bench_care_tasks(timers=100_000, enclosures=20_000, minutes=24 * 60):
+    """Run 10^5 recurring enclosure timers through a simulated day."""
+    from care_tasks import CareTaskScheduler
+    
+    rng = random.Random(5)
+    scheduler = CareTaskScheduler()
+    pens = [Enclosure(f"E{i:06d}", "Mammal Habitat", 4) for i in range(enclosures)]
+    for pen in pens:
+        pen.add_animal("A0")
+    start = time.perf_counter()
+    for i in range(timers):
+        scheduler.add_task(pens[i % enclosures], "Feeding", rng.choice((15, 30, 60, 120, 240, 480)))
+    schedule_elapsed = time.perf_counter() - start
+    
+    # Empty a tenth of the pens halfway through so their timers pause
+    start = time.perf_counter()
+    fired = len(scheduler.advance(minutes // 2))
+    for pen in pens[::10]:
+        pen.remove_animal("A0")
+    fired += len(scheduler.advance(minutes - minutes // 2))
+    elapsed = time.perf_counter() - start
+    report("care_tasks", timers=timers, schedule_us=schedule_elapsed / timers * 1e6,
+           fired=fired, fire_us=elapsed / fired * 1e6, tick_us=elapsed / minutes * 1e6)
+
+
+def bench_events(intake=200_000, subscribers=5):
+    """Intake throughput with no subscribers, per-event delivery and batched delivery."""
+    for label, max_batch in (("none", None), ("per_event", 1), ("batched", 500)):
+        center = RehabilitationCenter("Bench Center", "Bench")
+        calls = [0]
+        
+        def listener(batch):
+            calls[0] += 1
+        
+        if max_batch:
+            for _ in range(subscribers):
+                center.subscribe(listener, max_batch=max_batch, max_delay=0.05)
+        animals = make_animals(intake)
+        start = time.perf_counter()
+        for animal in animals:
+            center.add_animal(animal)
+        center.flush_events()
+        elapsed = time.perf_counter() - start
+        report("events", mode=label, intake_per_sec=intake / elapsed, listener_calls=calls[0])
+
+
+def bench_snapshots(population=200_000, writes=200_000):
+    """Snapshot cost and writer slowdown while a reporter thread iterates snapshots."""
+    center = RehabilitationCenter("Bench Center", "Bench")
+    for i in range(population // 4):
+        center.add_enclosure(Enclosure(f"E{i:06d}", "Mammal Habitat", 8))
+    for animal in make_animals(population):
+        center.add_animal(animal)
+    
+    start = time.perf_counter()
+    for _ in range(1_000):
+        center.snapshot()
+    report("snapshots", population=population, snapshot_us=(time.perf_counter() - start) * 1e3)
+    
+    # Copy-on-write: while a snapshot is alive, the first intake copies the animal dict
+    intake = iter(make_animals(600, prefix="N"))
+    timings = {}
+    for case in ("first_write", "later_write"):
+        samples = []
+        for _ in range(200):
+            snapshot = center.snapshot()
+            if case == "later_write":
+                center.add_animal(next(intake))
+            start = time.perf_counter()
+            center.add_animal(next(intake))
+            samples.append(time.perf_counter() - start)
+            del snapshot
+        timings[case + "_us"] = sorted(samples)[len(samples) // 2] * 1e6
+    report("snapshots", population=population, **timings)
+    
+    rng = random.Random(3)
+    moves = [(f"A{rng.randrange(population):07d}", f"E{rng.randrange(population // 4):06d}")
+             for _ in range(writes)]
+    for mode in ("no_reader", "reporting"):
+        stop = threading.Event()
+        reports = [0]
+        
+        def reporter():
+            while not stop.is_set():
+                snapshot = center.snapshot()
+                sum(occupied for occupied, _ in snapshot.occupancy().values())
+                reports[0] += 1
+        
+        thread = threading.Thread(target=reporter) if mode == "reporting" else None
+        if thread:
+            thread.start()
+        start = time.perf_counter()
+        for animal_id, enclosure_id in moves:
+            center.assign_animal_to_enclosure(animal_id, enclosure_id)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        if thread:
+            thread.join()
+        report("snapshots", mode=mode, writes_per_sec=writes / elapsed, reports=reports[0])
+
+
+def bench_transactions(batches=2_000, batch_size=50, subscribers=3):
+    """Intake/assign/discharge batches applied one by one versus in transactions."""
+    for mode in ("one_by_one", "transaction"):
+        center = RehabilitationCenter("Bench Center", "Bench")
+        for _ in range(subscribers):
+            center.subscribe(lambda batch: None, max_batch=1)
+        for i in range(batches):
+            center.add_enclosure(Enclosure(f"E{i:06d}", "Mammal Habitat", batch_size))
+        animals = make_animals(batches * batch_size)
+        start = time.perf_counter()
+        for b in range(batches):
+            enclosure_id = f"E{b:06d}"
+            group = animals[b * batch_size:(b + 1) * batch_size]
+            if mode == "transaction":
+                with center.transaction() as tx:
+                    for animal in group:
+                        tx.add_animal(animal)
+                        tx.assign_animal_to_enclosure(animal.animal_id, enclosure_id)
+                    tx.discharge_animal(group[0].animal_id, "2023-06-01", "Transferred")
+            else:
+                for animal in group:
+                    center.add_animal(animal)
+                    center.assign_animal_to_enclosure(animal.animal_id, enclosure_id)
+                center.discharge_animal(group[0].animal_id, "2023-06-01", "Transferred")
+        elapsed = time.perf_counter() - start
+        operations = batches * (2 * batch_size + 1)
+        report("transactions", mode=mode, ops_per_sec=operations / elapsed)
+
+
+def bench_serialization(population=1_000_000):
+    """Size and encode/decode throughput of the binary format versus JSON and pickle."""
+    import json
+    import pickle
+    import serialization
+    
+    species = ["Red Fox", "Barn Owl", "Box Turtle", "Raccoon", "Bald Eagle"]
+    conditions = ["Injured leg", "Wing injury", "Shell damage", "Minor injuries"]
+    center = RehabilitationCenter("Bench Center", "Bench")
+    for i in range(population // 8):
+        center.add_enclosure(Enclosure(f"E{i:06d}", "Recovery Area", 8))
+    for i in range(population):
+        center.add_animal(Animal(f"A{i:07d}", species[i % 5], conditions[i % 4], f"2023-05-{i % 28 + 1:02d}"))
+        center.assign_animal_to_enclosure(f"A{i:07d}", f"E{i // 8:06d}")
+    records = [center.get_animal(f"A{i:07d}").to_record() for i in range(population)]
+    enclosures = [center.get_enclosure(f"E{i:06d}").to_record() for i in range(population // 8)]
+    
+    codecs = {
+        "binary": (lambda: serialization.dumps(center), serialization.loads),
+        "binary_records": (lambda: serialization.dumps(center), serialization.decode_records),
+        "json": (lambda: json.dumps([records, enclosures]).encode(), json.loads),
+        "pickle": (lambda: pickle.dumps([records, enclosures], protocol=5), pickle.loads),
+    }
+    for name, (encode, decode) in codecs.items():
+        start = time.perf_counter()
+        data = encode()
+        encode_elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        decoded = decode(data)
+        decode_elapsed = time.perf_counter() - start
+        del decoded
+        report("serialization", codec=name, population=population, mb=len(data) / 1e6,
+               encode_per_sec=population / encode_elapsed, decode_per_sec=population / decode_elapsed)
+
+
+def bench_search(population=1_000_000, queries=2_000):
+    """Index build time and query latency versus a linear substring scan."""
+    from search_index import AnimalTextIndex
+    
+    rng = random.Random(34)
+    adjectives = ["Red", "Great", "Eastern", "Barn", "Snowy", "Common", "Box", "Bald", "Little", "Northern"]
+    nouns = ["Fox", "Owl", "Turtle", "Raccoon", "Eagle", "Heron", "Hawk", "Opossum", "Squirrel", "Rabbit"]
+    parts = ["wing", "leg", "shell", "head", "eye", "tail", "jaw", "foot"]
+    problems = ["injury", "fracture", "infection", "laceration", "dehydration", "burn"]
+    rows = [(f"A{i:07d}", f"{rng.choice(adjectives)} {rng.choice(nouns)}",
+             f"{rng.choice(parts)} {rng.choice(problems)}") for i in range(population)]
+    
+    index = AnimalTextIndex()
+    start = time.perf_counter()
+    for animal_id, species, condition in rows:
+        index.add(animal_id, species, condition)
+    report("search", phase="build", population=population, tokens=index.token_count,
+           per_sec=population / (time.perf_counter() - start))
+    
+    words = [word.lower() for word in adjectives + nouns + parts + problems]
+    cases = {
+        "exact": lambda word: (word, dict(prefix=False)),
+        "prefix": lambda word: (word[:3], {}),
+        "two_terms": lambda word: (f"{word} {rng.choice(parts)}", {}),
+        "fuzzy": lambda word: (word[:-1] + "x", dict(prefix=False, max_edits=1)),
+    }
+    for name, make in cases.items():
+        batch = [make(rng.choice(words)) for _ in range(queries)]
+        start = time.perf_counter()
+        for query, options in batch:
+            index.search(query, **options)
+        report("search", phase=name, queries=queries,
+               ms_per_query=(time.perf_counter() - start) * 1000 / queries)
+    
+    # Baseline: what display-style filtering did before, on a slice
+    scan_queries = 20
+    start = time.perf_counter()
+    for query in rng.sample(words, scan_queries):
+        [animal_id for animal_id, species, condition in rows
+         if query in species.lower() or query in condition.lower()]
+    report("search", phase="linear_scan", queries=scan_queries,
+           ms_per_query=(time.perf_counter() - start) * 1000 / scan_queries)
+
+
+def bench_identifiers(population=1_000_000, capacity=8, lookups=2_000_000):
+    """ID allocation throughput, and membership memory/lookups for plain, interned and surrogate IDs."""
+    from array import array
+    from identifiers import IdAllocator, IdRegistry, intern_id
+    
+    allocator = IdAllocator("A", width=7)
+    start = time.perf_counter()
+    ids = allocator.allocate_many(population)
+    report("identifiers", phase="allocate_many", ids_per_sec=population / (time.perf_counter() - start))
+    start = time.perf_counter()
+    for _ in range(population // 10):
+        allocator.allocate()
+    report("identifiers", phase="allocate_one", ids_per_sec=population / 10 / (time.perf_counter() - start))
+    
+    # Each animal ID is referenced from the animal, the center's map and an
+    # enclosure's membership; every reference arrives as a fresh string, as
+    # IDs do when read from input or a store.
+    rng = random.Random(35)
+    for name in ("plain", "interned", "surrogates"):
+        registry = IdRegistry()
+        tracemalloc.start()
+        references = [[animal_id[:1] + animal_id[1:] for animal_id in ids] for _ in range(3)]
+        if name == "plain":
+            owners, keys, members = references
+            contains = lambda group, animal_id: animal_id in group
+        elif name == "interned":
+            owners, keys, members = ([intern_id(animal_id) for animal_id in column] for column in references)
+            contains = lambda group, animal_id: animal_id in group
+        else:
+            owners, keys = ([registry.external(registry.intern(animal_id)) for animal_id in column]
+                            for column in references[:2])
+            members = array("I", map(registry.intern, references[2]))
+            contains = lambda group, animal_id: registry.lookup(animal_id) in group
+        groups = [members[i:i + capacity] for i in range(0, population, capacity)]
+        del references, members
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        probes = [(groups[index // capacity], keys[index]) for index in
+                  (rng.randrange(population) for _ in range(lookups))]
+        start = time.perf_counter()
+        hits = sum(contains(group, animal_id) for group, animal_id in probes)
+        elapsed = time.perf_counter() - start
+        report("identifiers", phase=name, mb=memory / 1e6, lookups_per_sec=lookups / elapsed, hits=hits)
+        del owners, keys, groups, probes
+
+def bench_simulation(replicas=5_000, days=120):
+    """Monte Carlo replicas per second in one process versus a process pool."""
+    import os
+    from simulation import OccupancySimulator, SpeciesProfile
+    
+    center = RehabilitationCenter("Bench Center", "Bench")
+    for i in range(40):
+        center.add_enclosure(Enclosure(f"E{i:03d}", ["Aviary", "Mammal Habitat", "Reptile Habitat"][i % 3], 8))
+    profiles = [
+        SpeciesProfile("Barn Owl", "Aviary", 3.0, 12),
+        SpeciesProfile("Bald Eagle", "Aviary", 0.5, 30),
+        SpeciesProfile("Red Fox", "Mammal Habitat", 2.5, 18),
+        SpeciesProfile("Raccoon", "Mammal Habitat", 4.0, 10),
+        SpeciesProfile("Box Turtle", "Reptile Habitat", 1.5, 45),
+    ]
+    simulator = OccupancySimulator(center, profiles, days)
+    for processes in sorted({1, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        results = simulator.run(replicas, processes=processes, seed=36)
+        elapsed = time.perf_counter() - start
+        report("simulation", processes=processes, replicas=replicas, replicas_per_sec=replicas / elapsed,
+               **{f"p_overflow_{name.split()[0].lower()}": outcome.overflow_probability
+                  for name, outcome in results.items()})
+
+
+def bench_history(stays=1_000_000, enclosures=50, queries=2_000):
+    """Interval-tree occupancy and contact queries versus scanning every recorded stay."""
+    from history import AssignmentHistory
+    
+    rng = random.Random(37)
+    history = AssignmentHistory()
+    day = 86_400.0
+    moves = []
+    clock = 0.0
+    for i in range(stays):
+        # Intake is spread over time; each stay lasts 1-30 days
+        clock += rng.expovariate(1.0) * 600
+        moves.append((f"A{i % (stays // 3):07d}", f"E{rng.randrange(enclosures):03d}",
+                      clock, clock + rng.uniform(1, 30) * day))
+    start = time.perf_counter()
+    for animal_id, enclosure_id, entered, left in moves:
+        history.enter(animal_id, enclosure_id, entered)
+        history.leave(animal_id, left)
+    report("history", phase="record", stays=stays, per_sec=stays / (time.perf_counter() - start))
+    
+    moments = [(f"E{rng.randrange(enclosures):03d}", rng.uniform(0, clock)) for _ in range(queries)]
+    start = time.perf_counter()
+    found = sum(len(history.occupants(enclosure_id, moment)) for enclosure_id, moment in moments)
+    report("history", phase="occupants", ms_per_query=(time.perf_counter() - start) * 1000 / queries,
+           mean_hits=found / queries)
+    
+    animals = [f"A{rng.randrange(stays // 3):07d}" for _ in range(queries)]
+    start = time.perf_counter()
+    found = sum(len(history.contacts(animal_id)) for animal_id in animals)
+    report("history", phase="contacts", ms_per_query=(time.perf_counter() - start) * 1000 / queries,
+           mean_hits=found / queries)
+    
+    # Baseline: scan the flat list of every stay
+    scan_queries = 10
+    start = time.perf_counter()
+    for enclosure_id, moment in moments[:scan_queries]:
+        {animal_id for animal_id, stay_enclosure, entered, left in moves
+         if stay_enclosure == enclosure_id and entered <= moment < left}
+    report("history", phase="linear_scan", ms_per_query=(time.perf_counter() - start) * 1000 / scan_queries)
+
+def bench_memory_report(populations=(10_000, 100_000, 1_000_000)):
+    """memory_report() latency as the center grows, and its estimate versus tracemalloc."""
+    for population in populations:
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        center = RehabilitationCenter("Bench Center", "Bench")
+        for i in range(population // 8):
+            center.add_enclosure(Enclosure(f"E{i:07d}", "Mammal Habitat", 8))
+        for i, animal in enumerate(make_animals(population)):
+            center.add_animal(animal)
+            center.assign_animal_to_enclosure(animal.animal_id, f"E{i // 8:07d}")
+        traced = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        
+        start = time.perf_counter()
+        runs = 20
+        for _ in range(runs):
+            result = center.memory_report()
+        elapsed = (time.perf_counter() - start) / runs
+        report("memory_report", population=population, ms_per_report=elapsed * 1000,
+               estimated_mb=result["total_estimated_bytes"] / 1e6, traced_mb=traced / 1e6)
+        del center
+
+
+def _read_occupancy(name, seconds, results):
+    from occupancy_table import OccupancyReader
+    
+    reader = OccupancyReader(name)
+    reads = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        reader.enclosure(f"E{reads % 1000:04d}")
+        reads += 1
+    results.put(reads / seconds)
+    reader.close()
+
+
+def bench_occupancy_table(enclosures=1_000, animals=50_000, moves=200_000):
+    """Writer cost of publishing to shared memory, and reader throughput in another process."""
+    import multiprocessing
+    from occupancy_table import OccupancyTable
+    
+    rng = random.Random(39)
+    draws = [(f"A{rng.randrange(animals):07d}", f"E{rng.randrange(enclosures):04d}") for _ in range(moves)]
+    for mode in ("unpublished", "published", "published_with_reader"):
+        center = RehabilitationCenter("Bench Center", "Bench")
+        for i in range(enclosures):
+            center.add_enclosure(Enclosure(f"E{i:04d}", "Mammal Habitat", animals))
+        for animal in make_animals(animals):
+            center.add_animal(animal)
+        table = OccupancyTable(enclosures, animals) if mode != "unpublished" else None
+        if table:
+            table.attach(center)
+        if mode == "published_with_reader":
+            results = multiprocessing.Queue()
+            reader = multiprocessing.Process(target=_read_occupancy, args=(table.name, 2.0, results))
+            reader.start()
+        start = time.perf_counter()
+        for animal_id, enclosure_id in draws:
+            center.assign_animal_to_enclosure(animal_id, enclosure_id)
+        elapsed = time.perf_counter() - start
+        values = dict(mode=mode, moves_per_sec=moves / elapsed)
+        if mode == "published_with_reader":
+            reader.join()
+            values["reader_reads_per_sec"] = results.get()
+        if table:
+            table.close()
+        report("occupancy_table", **values)
+
+
+def bench_intake(animals=100_000, producers=8, maxsize=1_000, batch_sizes=(1, 10, 100, 1_000)):
+    """Surge intake with producers outpacing the drain: queue depth, wait and throughput per batch size."""
+    import asyncio
+    from intake import IntakeQueue
+    
+    async def surge(queue, center):
+        drain = asyncio.create_task(queue.run())
+        
+        async def produce(offset):
+            for i in range(offset, animals, producers):
+                await queue.submit(Animal(f"A{i:07d}", "Red Fox", "Injured leg", "2023-05-15"))
+        
+        await asyncio.gather(*(produce(offset) for offset in range(producers)))
+        await queue.close()
+        return await drain
+    
+    for batch_size in batch_sizes:
+        center = RehabilitationCenter("Bench Center", "Bench")
+        for i in range(animals // 16):
+            center.add_enclosure(Enclosure(f"E{i:06d}", "Mammal Habitat", 8))
+        queue = IntakeQueue(center, maxsize=maxsize, batch_size=batch_size)
+        start = time.perf_counter()
+        stats = asyncio.run(surge(queue, center))
+        elapsed = time.perf_counter() - start
+        report("intake", batch_size=batch_size, animals_per_sec=animals / elapsed,
+               drain_per_sec=stats["drain_per_second"], max_depth=stats["max_depth"],
+               mean_wait_ms=stats["mean_wait_seconds"] * 1000, max_wait_ms=stats["max_wait_seconds"] * 1000,
+               placed=stats["placed"], unplaced=stats["unplaced"])
+
+
+def bench_audit(population=1_000_000, changes=(1, 100, 10_000)):
+    """Incremental consistency check cost against a full scan at a given population."""
+    from audit import ConsistencyAuditor
+    
+    center = RehabilitationCenter("Bench Center", "Bench")
+    enclosures = population // 8
+    for i in range(enclosures):
+        center.add_enclosure(Enclosure(f"E{i:07d}", "Mammal Habitat", 16))
+    for i, animal in enumerate(make_animals(population)):
+        center.add_animal(animal)
+        center.assign_animal_to_enclosure(animal.animal_id, f"E{i // 8:07d}")
+    auditor = ConsistencyAuditor()
+    auditor.attach(center)
+    
+    full = auditor.check(full=True)
+    report("audit", mode="full", population=population, ms_per_check=full.seconds * 1000,
+           issues=len(full.issues))
+    
+    rng = random.Random(41)
+    for count in changes:
+        runs = max(1, 1_000 // count)
+        elapsed = 0.0
+        for _ in range(runs):
+            for _ in range(count):
+                center.assign_animal_to_enclosure(f"A{rng.randrange(population):07d}",
+                                                  f"E{rng.randrange(enclosures):07d}")
+            elapsed += auditor.check().seconds
+        report("audit", mode="incremental", changes=count, ms_per_check=elapsed * 1000 / runs,
+               us_per_change=elapsed * 1e6 / (runs * count))
+
+
+def bench_workload(animals=100_000, enclosures=10_000, lookups=200_000):
+    """Recording overhead on a mixed workload, trace size, and replay latency."""
+    import os
+    import tempfile
+    from workload import WorkloadRecorder, replay
+    
+    rng = random.Random(42)
+    moves = [(f"A{rng.randrange(animals):07d}", f"E{rng.randrange(enclosures):06d}") for _ in range(animals)]
+    reads = [f"A{rng.randrange(animals):07d}" for _ in range(lookups)]
+    
+    def run(center):
+        for i in range(enclosures):
+            center.add_enclosure(Enclosure(f"E{i:06d}", "Mammal Habitat", 32))
+        for animal in make_animals(animals):
+            center.add_animal(animal)
+        for animal_id, enclosure_id in moves:
+            center.assign_animal_to_enclosure(animal_id, enclosure_id)
+        for animal_id in reads:
+            center.get_animal(animal_id)
+        for i in range(0, animals, 10):
+            center.discharge_animal(f"A{i:07d}", "2023-06-01", "Released")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "trace.bin")
+        operations = enclosures + 2 * animals + lookups + animals // 10
+        for mode in ("unrecorded", "recorded"):
+            center = RehabilitationCenter("Bench Center", "Bench")
+            recorder = WorkloadRecorder(path) if mode == "recorded" else None
+            if recorder:
+                recorder.attach(center)
+            start = time.perf_counter()
+            run(center)
+            elapsed = time.perf_counter() - start
+            if recorder:
+                recorder.close()
+            values = dict(mode=mode, ops_per_sec=operations / elapsed)
+            if recorder:
+                values["trace_bytes_per_op"] = os.path.getsize(path) / operations
+            report("workload", **values)
+        
+        start = time.perf_counter()
+        stats = replay(path)
+        report("workload", mode="replay", ops_per_sec=operations / (time.perf_counter() - start))
+        for operation, values in sorted(stats.items()):
+            report("workload", operation=operation, **values)
+
+
+def bench_telemetry(enclosures=20, days=7, interval=1.0, batch_seconds=60):
+    """Telemetry ingest rate and window query cost from rollups versus a raw scan."""
+    from telemetry import EnclosureTelemetry
+    
+    telemetry = EnclosureTelemetry()
+    rng = random.Random(43)
+    base = 19_000 * 86400
+    total_seconds = int(days * 86400)
+    batch = int(batch_seconds / interval)
+    raw = []
+    elapsed = 0.0
+    readings = 0
+    for offset in range(0, total_seconds, batch_seconds):
+        times = [base + offset + i * interval for i in range(batch)]
+        for e in range(enclosures):
+            values = [20.0 + rng.random() for _ in times]
+            if e == 0:
+                raw.extend(zip(times, values))
+            start = time.perf_counter()
+            readings += telemetry.ingest(f"E{e:03d}", "temperature", times, values)
+            elapsed += time.perf_counter() - start
+    report("telemetry", phase="ingest", readings=readings, readings_per_sec=readings / elapsed)
+    
+    for span in (3600, 86400, days * 86400):
+        queries = 200
+        starts = [base + rng.randrange(0, total_seconds - span + 1) for _ in range(queries)]
+        start = time.perf_counter()
+        for window_start in starts:
+            telemetry.window("E000", "temperature", window_start, window_start + span)
+        rollup_us = (time.perf_counter() - start) * 1e6 / queries
+        
+        scans = 5
+        start = time.perf_counter()
+        for window_start in starts[:scans]:
+            [value for timestamp, value in raw if window_start <= timestamp < window_start + span]
+        scan_us = (time.perf_counter() - start) * 1e6 / scans
+        report("telemetry", phase="window", span_seconds=span, rollup_us=rollup_us, raw_scan_us=scan_us)
+
+
+def bench_species(enclosures=10_000, animals=200_000, lookups=2_000):
+    """Placement filtering through the species map versus a scan, and species string sharing."""
+    from species import CATALOG
+    
+    types = ("Aviary", "Mammal Habitat", "Reptile Habitat", "Recovery Area", "Aquatic Habitat")
+    center = RehabilitationCenter("Bench Center", "Bench")
+    for i in range(enclosures):
+        center.add_enclosure(Enclosure(f"E{i:06d}", types[i % len(types)], 8))
+    species = CATALOG.names()
+    
+    start = time.perf_counter()
+    for i in range(lookups):
+        center.compatible_enclosure_ids(species[i % len(species)])
+    mapped = (time.perf_counter() - start) * 1e6 / lookups
+    start = time.perf_counter()
+    for i in range(lookups):
+        name = species[i % len(species)]
+        [enclosure_id for enclosure_id in center.enclosure_ids()
+         if CATALOG.is_compatible(name, center.get_enclosure(enclosure_id).enclosure_type)]
+    scanned = (time.perf_counter() - start) * 1e6 / lookups
+    report("species", phase="placement_filter", mapped_us=mapped, scan_us=scanned)
+    
+    # Species names as they arrive from input: a new string object per record
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    herd = [Animal(f"A{i:07d}", "".join(["Red", " Fox"]), "Injured leg", "2023-05-15") for i in range(animals)]
+    interned = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    report("species", phase="species_strings", animals=animals,
+           distinct_species_objects=len({id(animal.species) for animal in herd}),
+           animal_bytes_each=interned / animals)
+
+
+def _follow_primary(address, results):
+    from replication import ReplicaFollower
+    
+    follower = ReplicaFollower.connect(address)
+    lags = []
+    reports = 0
+    while not follower.closed:
+        if follower.sync(timeout=0.01) and follower.stats()["operations_applied"]:
+            lags.append(follower.stats()["last_lag_seconds"])
+        if follower.center is None:
+            continue
+        # A reporting query against the replica between batches
+        snapshot = follower.snapshot()
+        sum(1 for animal_id in snapshot.animal_ids() if snapshot.animal_state(animal_id)[1] is not None)
+        reports += 1
+    lags.sort()
+    results.put((follower.stats(), lags, reports))
+
+
+def bench_replication(enclosures=10_000, animals=100_000, followers=(0, 1, 2)):
+    """Primary write throughput unreplicated and with follower processes attached, and their replication lag."""
+    import multiprocessing
+    from replication import ReplicationPrimary
+    
+    # None: no primary at all; 0: mutations captured but nobody follows
+    for count in (None, *followers):
+        center = RehabilitationCenter("Bench Center", "Bench")
+        for i in range(enclosures):
+            center.add_enclosure(Enclosure(f"E{i:06d}", "Mammal Habitat", animals))
+        primary = ReplicationPrimary(center) if count is not None else None
+        processes = []
+        if count:
+            address = primary.listen()
+            results = multiprocessing.Queue()
+            for _ in range(count):
+                process = multiprocessing.Process(target=_follow_primary, args=(address, results))
+                process.start()
+                processes.append(process)
+            while primary.follower_count < count:
+                time.sleep(0.01)
+        start = time.perf_counter()
+        for i, animal in enumerate(make_animals(animals)):
+            center.add_animal(animal)
+            center.assign_animal_to_enclosure(animal.animal_id, f"E{i % enclosures:06d}")
+        elapsed = time.perf_counter() - start
+        values = dict(followers="unreplicated" if count is None else count,
+                      primary_ops_per_sec=2 * animals / elapsed)
+        if primary:
+            primary.flush()
+            values["batches"] = primary.sequence
+            primary.close()
+        if processes:
+            for _ in processes:
+                stats, lags, reports = results.get()
+            for process in processes:
+                process.join()
+            values.update(applied=stats["operations_applied"], reports=reports,
+                          mean_lag_ms=stats["mean_lag_seconds"] * 1000,
+                          p50_batch_lag_ms=lags[len(lags) // 2] * 1000 if lags else 0.0,
+                          p99_batch_lag_ms=lags[int(len(lags) * 0.99)] * 1000 if lags else 0.0,
+                          max_lag_ms=stats["max_lag_seconds"] * 1000)
+        report("replication", **values)
+
+
+def bench_display(populations=(10_000, 100_000, 1_000_000), listings=5, changes=1_000):
+    """Repeated full animal listings: first render, cached re-renders, and re-renders after a few changes."""
+    for population in populations:
+        center = RehabilitationCenter("Bench Center", "Bench")
+        for i in range(population // 8):
+            center.add_enclosure(Enclosure(f"E{i:07d}", "Mammal Habitat", 8))
+        for animal in make_animals(population):
+            center.add_animal(animal)
+        
+        # What every listing cost before lines were cached
+        animals = [center.get_animal(f"A{i:07d}") for i in range(population)]
+        start = time.perf_counter()
+        "\n".join([f"{animal.animal_id} | {animal.species} | {animal.condition} | Status: {animal.status}"
+                   for animal in animals])
+        uncached = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        center.render_all()
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(listings):
+            center.render_all()
+        cached = (time.perf_counter() - start) / listings
+        rng = random.Random(46)
+        for _ in range(changes):
+            center.assign_animal_to_enclosure(f"A{rng.randrange(population):07d}",
+                                              f"E{rng.randrange(population // 8):07d}")
+        start = time.perf_counter()
+        center.render_all()
+        changed = time.perf_counter() - start
+        report("display", population=population, uncached_ms=uncached * 1000, first_ms=first * 1000,
+               cached_ms=cached * 1000, after_changes_ms=changed * 1000, changes=changes)
+
+
+def bench_attachments(animals=2_000, per_animal=3, sizes=(50_000, 200_000, 2_000_000), duplicate_share=0.2):
+    """Bulk attachment ingest (bytes and streamed) with duplicates, then verified streamed reads of everything."""
+    import hashlib
+    import io
+    import resource
+    import shutil
+    import tempfile
+    from attachments import AttachmentStore
+    
+    rng = random.Random(47)
+    pool = {size: [rng.randbytes(size) for _ in range(8)] for size in sizes}
+    
+    def uploads():
+        # Distinct contents are pool entries with their first bytes changed;
+        # made on the fly so the benchmark itself does not hold gigabytes
+        draws = random.Random(48)
+        for i in range(animals * per_animal):
+            size = sizes[i % per_animal % len(sizes)]
+            data = pool[size][draws.randrange(8)]
+            if draws.random() >= duplicate_share:
+                data = i.to_bytes(8, "little") + data[8:]
+            yield f"A{i // per_animal:07d}", f"file-{i % per_animal}", data
+    
+    for mode in ("bytes", "stream"):
+        directory = tempfile.mkdtemp(prefix="wrms-attachments-")
+        store = AttachmentStore(directory)
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        ingested = 0
+        start = time.perf_counter()
+        for animal_id, name, data in uploads():
+            store.attach(animal_id, io.BytesIO(data) if mode == "stream" else data, name)
+            ingested += len(data)
+        store.flush(sync=True)
+        elapsed = time.perf_counter() - start
+        rss_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss
+        
+        # Hash what is read so every byte is actually touched
+        start = time.perf_counter()
+        read = 0
+        for i in range(animals):
+            for attachment in store.attachments(f"A{i:07d}"):
+                hasher = hashlib.sha256()
+                for chunk in store.stream(attachment.digest):
+                    hasher.update(chunk)
+                    read += len(chunk)
+        read_elapsed = time.perf_counter() - start
+        report("attachments", mode=mode, attachments=animals * per_animal,
+               ingest_mb_per_sec=ingested / elapsed / 1e6, verified_read_mb_per_sec=read / read_elapsed / 1e6,
+               ingested_mb=ingested / 1e6, stored_mb=store.stored_bytes / 1e6,
+               duplicates=store.duplicate_count, packs=store.pack_count, max_rss_growth_mb=rss_growth / 1024)
+        store.close()
+        shutil.rmtree(directory)
+
+BENCHMARKS = {
+    "animal_cache": bench_animal_cache,
+    "lazy_load": bench_lazy_load,
+    "treatments": bench_treatments,
+    "care_tasks": bench_care_tasks,
+    "events": bench_events,
+    "snapshots": bench_snapshots,
+    "transactions": bench_transactions,
+    "serialization": bench_serialization,
+    "search": bench_search,
+    "identifiers": bench_identifiers,
+    "simulation": bench_simulation,
+    "history": bench_history,
+    "memory_report": bench_memory_report,
+    "occupancy_table": bench_occupancy_table,
+    "intake": bench_intake,
+    "audit": bench_audit,
+    "workload": bench_workload,
+    "telemetry": bench_telemetry,
+    "species": bench_species,
+    "replication": bench_replication,
+    "display": bench_display,
+    "attachments": bench_attachments,
+}
+
+
+def main(names):
+    for name in names or BENCHMARKS:
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,294 @@
+"""
+Recurring enclosure care tasks for the Wildlife Rehabilitation Management System.
+
+Feeding, cleaning and enrichment recur per enclosure at fixed intervals.
+CareTaskScheduler keeps them in a hierarchical timing wheel so that
+scheduling, cancelling and firing a task are O(1) amortized, no matter how
+many enclosures are tracked. Tasks pause while their enclosure is empty.
+"""
+
+import datetime
+import weakref
+
+
+class TimingWheel:
+    """
+    Hierarchical timing wheel counting time in integer ticks.
+    
+    Level 0 has one bucket per tick; each higher level has buckets covering
+    `slots` times as many ticks. Timers in a higher-level bucket are cascaded
+    down when the lower level wraps around.
+    """
+    
+    def __init__(self, slots=64, levels=4):
+        """
+        Initialize the wheel.
+        
+        Args:
+            slots: Buckets per level (power of two)
+            levels: Number of levels; the wheel spans slots ** levels ticks
+        """
+        if not isinstance(slots, int) or slots < 2 or slots & (slots - 1):
+            raise ValueError("Slots must be a power of two greater than one")
+        if not isinstance(levels, int) or levels <= 0:
+            raise ValueError("Levels must be a positive integer")
+        
+        self.__slots = slots
+        self.__bits = slots.bit_length() - 1
+        self.__mask = slots - 1
+        self.__span = slots ** levels
+        self.__wheels = [[[] for _ in range(slots)] for _ in range(levels)]
+        self.__now = 0
+        self.__count = 0
+    
+    @property
+    def now(self): return self.__now
+    
+    def __len__(self):
+        return self.__count
+    
+    def schedule(self, expires, item):
+        """Place `item` so it is returned by advance() at tick `expires`."""
+        self.__place(max(expires, self.__now + 1), item)
+        self.__count += 1
+    
+    def advance(self, ticks=1):
+        """Move the clock forward and return (expires, item) pairs that fell due, in order."""
+        fired = []
+        for _ in range(ticks):
+            self.__now += 1
+            now = self.__now
+            # Cascade higher levels whose lower level just wrapped around
+            level = 1
+            while level < len(self.__wheels) and not (now >> (self.__bits * level - self.__bits)) & self.__mask:
+                bucket_index = (now >> (self.__bits * level)) & self.__mask
+                bucket = self.__wheels[level][bucket_index]
+                self.__wheels[level][bucket_index] = []
+                for expires, item in bucket:
+                    self.__place(expires, item)
+                level += 1
+            bucket = self.__wheels[0][now & self.__mask]
+            if bucket:
+                self.__wheels[0][now & self.__mask] = []
+                for expires, item in bucket:
+                    if expires > now:
+                        # Beyond the wheel's span when first placed
+                        self.__place(expires, item)
+                    else:
+                        fired.append((expires, item))
+                        self.__count -= 1
+        return fired
+    
+    def __place(self, expires, item):
+        delta = min(expires - self.__now, self.__span - 1)
+        level = 0
+        while delta >= self.__slots ** (level + 1):
+            level += 1
+        target = self.__now + delta
+        self.__wheels[level][(target >> (self.__bits * level)) & self.__mask].append((expires, item))
+
+
+class CareTask:
+    """A recurring care task (feeding, cleaning, enrichment) for one enclosure."""
+    
+    __slots__ = ("__enclosure_id", "__name", "__interval", "__callback", "__generation", "__paused",
+                 "__active", "__next_tick")
+    
+    def __init__(self, enclosure_id, name, interval_ticks, callback=None):
+        """
+        Initialize a CareTask.
+        
+        Args:
+            enclosure_id: ID of the enclosure the task belongs to
+            name: Description of the task (e.g. "Feeding")
+            interval_ticks: Interval between runs, in scheduler ticks
+            callback: Optional callable(task, when) run each time the task fires
+        """
+        # Validate parameters
+        if not isinstance(name, str) or not name:
+            raise ValueError("Task name must be a non-empty string")
+        if not isinstance(interval_ticks, int) or interval_ticks <= 0:
+            raise ValueError("Task interval must be a positive integer")
+        
+        self.__enclosure_id = enclosure_id
+        self.__name = name
+        self.__interval = interval_ticks
+        self.__callback = callback
+        self.__generation = 0
+        self.__paused = False
+        self.__active = True
+        self.__next_tick = None
+    
+    @property
+    def enclosure_id(self): return self.__enclosure_id
+    
+    @property
+    def name(self): return self.__name
+    
+    @property
+    def interval_ticks(self): return self.__interval
+    
+    @property
+    def callback(self): return self.__callback
+    
+    @property
+    def is_paused(self): return self.__paused
+    
+    @property
+    def is_active(self): return self.__active
+    
+    @property
+    def next_tick(self): return self.__next_tick
+    
+    # Scheduler bookkeeping. Wheel entries carry the generation they were
+    # scheduled under, so pausing or cancelling just bumps the generation.
+    def _arm(self, tick):
+        self.__generation += 1
+        self.__paused = False
+        self.__next_tick = tick
+        return self.__generation
+    
+    def _is_current(self, generation):
+        return self.__active and not self.__paused and self.__generation == generation
+    
+    def _pause(self):
+        self.__paused = True
+        self.__next_tick = None
+    
+    def _deactivate(self):
+        self.__active = False
+        self.__next_tick = None
+
+
+class CareTaskScheduler:
+    """Timing-wheel scheduler of recurring per-enclosure care tasks."""
+    
+    def __init__(self, start=None, tick_minutes=1, slots=64, levels=4):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            start: datetime corresponding to tick 0 (defaults to now)
+            tick_minutes: Minutes per wheel tick
+            slots: Buckets per wheel level
+            levels: Number of wheel levels
+        """
+        if not isinstance(tick_minutes, int) or tick_minutes <= 0:
+            raise ValueError("Tick length must be a positive integer")
+        
+        self.__start = start or datetime.datetime.now()
+        self.__tick = datetime.timedelta(minutes=tick_minutes)
+        self.__tick_minutes = tick_minutes
+        # Minutes advanced past the last whole tick, counted toward the next one
+        self.__leftover = 0
+        self.__wheel = TimingWheel(slots, levels)
+        self.__tasks = {}
+        # Enclosures this scheduler listens to, so clear() can unregister from them
+        self.__enclosures = weakref.WeakValueDictionary()
+        self.__fired = 0
+    
+    @property
+    def now(self):
+        return self.__start + self.__tick * self.__wheel.now + datetime.timedelta(minutes=self.__leftover)
+    
+    @property
+    def fired_count(self): return self.__fired
+    
+    @property
+    def active_count(self): return sum(1 for tasks in self.__tasks.values() for task in tasks if not task.is_paused)
+    
+    @property
+    def paused_count(self): return sum(1 for tasks in self.__tasks.values() for task in tasks if task.is_paused)
+    
+    def add_task(self, enclosure, name, interval_minutes, callback=None):
+        """Schedule a recurring task for an enclosure and return it."""
+        if not isinstance(interval_minutes, int) or interval_minutes < self.__tick_minutes:
+            raise ValueError("Task interval must be an integer of at least one tick")
+        if interval_minutes % self.__tick_minutes:
+            raise ValueError("Task interval must be a whole number of ticks")
+        
+        task = CareTask(enclosure.enclosure_id, name, interval_minutes // self.__tick_minutes, callback)
+        tasks = self.__tasks.get(enclosure.enclosure_id)
+        if tasks is None:
+            tasks = self.__tasks[enclosure.enclosure_id] = []
+            enclosure.add_listener(self.__on_membership_change)
+            self.__enclosures[enclosure.enclosure_id] = enclosure
+        tasks.append(task)
+        
+        if enclosure.available_capacity == enclosure.capacity:
+            task._pause()
+        else:
+            self.__arm(task)
+        return task
+    
+    def tasks_for(self, enclosure_id):
+        """Return the tasks registered for an enclosure."""
+        return list(self.__tasks.get(enclosure_id, ()))
+    
+    def cancel(self, task):
+        """Stop a task permanently."""
+        tasks = self.__tasks.get(task.enclosure_id)
+        if not tasks or task not in tasks:
+            return False
+        
+        task._deactivate()
+        tasks.remove(task)
+        return True
+    
+    def pause_enclosure(self, enclosure_id):
+        """Pause every task of an enclosure."""
+        for task in self.__tasks.get(enclosure_id, ()):
+            task._pause()
+    
+    def resume_enclosure(self, enclosure_id):
+        """Resume paused tasks of an enclosure, each due one interval from now."""
+        for task in self.__tasks.get(enclosure_id, ()):
+            if task.is_paused:
+                self.__arm(task)
+    
+    def advance(self, minutes):
+        """
+        Advance the clock and run due tasks. Returns a list of (task, when) that fired.
+        
+        Minutes short of a whole tick are kept and count toward the next call.
+        """
+        fired = []
+        if minutes <= 0:
+            return fired
+        ticks, self.__leftover = divmod(self.__leftover + minutes, self.__tick_minutes)
+        for _ in range(ticks):
+            for tick, (generation, task) in self.__wheel.advance():
+                if not task._is_current(generation):
+                    continue
+                when = self.__start + self.__tick * tick
+                self.__arm(task)
+                self.__fired += 1
+                fired.append((task, when))
+                if task.callback:
+                    task.callback(task, when)
+        return fired
+    
+    def advance_to(self, when):
+        """Advance the clock up to the given datetime."""
+        minutes = int((when - self.now).total_seconds() // 60)
+        return self.advance(minutes) if minutes > 0 else []
+    
+    def clear(self):
+        """Cancel every task and stop listening to their enclosures."""
+        for tasks in self.__tasks.values():
+            for task in tasks:
+                task._deactivate()
+        self.__tasks.clear()
+        for enclosure in list(self.__enclosures.values()):
+            enclosure.remove_listener(self.__on_membership_change)
+        self.__enclosures.clear()
+    
+    def __arm(self, task):
+        tick = self.__wheel.now + task.interval_ticks
+        self.__wheel.schedule(tick, (task._arm(tick), task))
+    
+    def __on_membership_change(self, enclosure, action, animal_id):
+        if action == "remove" and enclosure.available_capacity == enclosure.capacity:
+            self.pause_enclosure(enclosure.enclosure_id)
+        elif action == "add" and enclosure.available_capacity == enclosure.capacity - 1:
+            self.resume_enclosure(enclosure.enclosure_id)
@@ -0,0 +1,164 @@
+"""
+Change events for the Wildlife Rehabilitation Management System.
+
+RehabilitationCenter publishes a typed event for every intake, new
+enclosure, assignment and discharge. Subscribers receive them in batches,
+flushed when a batch reaches its size limit or its time window elapses,
+so bursts of intake do not call every listener once per event.
+"""
+
+import time
+from collections import namedtuple
+
+
+AnimalAdded = namedtuple("AnimalAdded", "animal_id species timestamp")
+EnclosureAdded = namedtuple("EnclosureAdded", "enclosure_id enclosure_type capacity timestamp")
+AnimalAssigned = namedtuple("AnimalAssigned", "animal_id enclosure_id previous_enclosure_id timestamp")
+AnimalDischarged = namedtuple("AnimalDischarged", "animal_id discharge_date status enclosure_id timestamp")
+
+EVENT_TYPES = (AnimalAdded, EnclosureAdded, AnimalAssigned, AnimalDischarged)
+
+
+class Subscription:
+    """A subscriber callback together with its pending batch."""
+    
+    def __init__(self, callback, event_types, max_batch, max_delay):
+        """
+        Initialize a Subscription.
+        
+        Args:
+            callback: Callable receiving a list of events
+            event_types: Event classes to receive, or None for all
+            max_batch: Deliver as soon as this many events are pending
+            max_delay: Deliver once the oldest pending event is this many seconds old
+        """
+        # Validate parameters
+        if not callable(callback):
+            raise ValueError("Callback must be callable")
+        if not isinstance(max_batch, int) or max_batch <= 0:
+            raise ValueError("Batch size must be a positive integer")
+        if not isinstance(max_delay, (int, float)) or max_delay < 0:
+            raise ValueError("Delay must be a non-negative number")
+        
+        self.__callback = callback
+        self.__event_types = tuple(event_types) if event_types else None
+        self.__max_batch = max_batch
+        self.__max_delay = max_delay
+        self.__pending = []
+        self.__first_pending_at = None
+        self.__delivered = 0
+        self.__batches = 0
+        self.__error_count = 0
+        self.__last_error = None
+    
+    @property
+    def pending_count(self): return len(self.__pending)
+    
+    @property
+    def delivered_count(self): return self.__delivered
+    
+    @property
+    def batch_count(self): return self.__batches
+    
+    @property
+    def error_count(self): return self.__error_count
+    
+    @property
+    def last_error(self): return self.__last_error
+    
+    def wants(self, event):
+        """Check whether this subscription receives the given event."""
+        return self.__event_types is None or isinstance(event, self.__event_types)
+    
+    def offer(self, event, now):
+        """Queue an event, delivering the batch if a limit is reached."""
+        if not self.__pending:
+            self.__first_pending_at = now
+        self.__pending.append(event)
+        if len(self.__pending) >= self.__max_batch or now - self.__first_pending_at >= self.__max_delay:
+            self.deliver()
+    
+    def offer_many(self, events, now):
+        """Queue several events at once, delivering at most one batch for them."""
+        wanted = [event for event in events if self.wants(event)]
+        if not wanted:
+            return
+        if not self.__pending:
+            self.__first_pending_at = now
+        self.__pending.extend(wanted)
+        if len(self.__pending) >= self.__max_batch or now - self.__first_pending_at >= self.__max_delay:
+            self.deliver()
+    
+    def poll(self, now):
+        """Deliver the pending batch if its time window has elapsed."""
+        if self.__pending and now - self.__first_pending_at >= self.__max_delay:
+            self.deliver()
+    
+    def deliver(self):
+        """Hand every pending event to the callback as one batch."""
+        if not self.__pending:
+            return
+        batch, self.__pending = self.__pending, []
+        self.__first_pending_at = None
+        self.__batches += 1
+        self.__delivered += len(batch)
+        try:
+            self.__callback(batch)
+        except Exception as e:
+            # A failing subscriber must not break the mutation that emitted the event
+            self.__error_count += 1
+            self.__last_error = e
+
+
+class EventBus:
+    """Fan-out of center events to batched subscriptions."""
+    
+    def __init__(self, clock=time.monotonic):
+        """Initialize an EventBus using `clock` for batch time windows."""
+        self.__clock = clock
+        self.__subscriptions = []
+    
+    @property
+    def has_subscribers(self): return bool(self.__subscriptions)
+    
+    @property
+    def subscriptions(self): return self.__subscriptions.copy()
+    
+    def subscribe(self, callback, event_types=None, max_batch=100, max_delay=1.0):
+        """Register a callback receiving lists of events. Returns the Subscription."""
+        subscription = Subscription(callback, event_types, max_batch, max_delay)
+        self.__subscriptions.append(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription):
+        """Deliver what is pending for a subscription and remove it."""
+        if subscription not in self.__subscriptions:
+            return False
+        
+        subscription.deliver()
+        self.__subscriptions.remove(subscription)
+        return True
+    
+    def publish(self, event):
+        """Queue an event for every interested subscriber."""
+        now = self.__clock()
+        for subscription in self.__subscriptions:
+            if subscription.wants(event):
+                subscription.offer(event, now)
+    
+    def publish_many(self, events):
+        """Queue a group of events (e.g. one transaction) so each subscriber sees them together."""
+        now = self.__clock()
+        for subscription in self.__subscriptions:
+            subscription.offer_many(events, now)
+    
+    def poll(self):
+        """Deliver batches whose time window has elapsed; call this when idle."""
+        now = self.__clock()
+        for subscription in self.__subscriptions:
+            subscription.poll(now)
+    
+    def flush(self):
+        """Deliver every pending batch immediately."""
+        for subscription in self.__subscriptions:
+            subscription.deliver()
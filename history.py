@@ -0,0 +1,288 @@
+"""
+Assignment history for the Wildlife Rehabilitation Management System.
+
+AssignmentHistory subscribes to a center's AnimalAssigned and
+AnimalDischarged events and records each enclosure stay as a time
+interval. Finished stays go into a per-enclosure IntervalTree (an AVL tree
+ordered by start time, with each node holding the latest end time in its
+subtree), so "who was in E002 on date X" and "which animals overlapped
+with A003" visit only the O(log n + k) nodes that can match. Stays still
+in progress are kept in a small per-enclosure dict and checked directly.
+"""
+
+import datetime
+import math
+from collections import namedtuple
+
+from events import AnimalAssigned, AnimalDischarged
+
+Stay = namedtuple("Stay", "animal_id enclosure_id start end")
+
+
+def _timestamp(value):
+    """Convert a timestamp, datetime, date or "YYYY-MM-DD" string to epoch seconds."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.date.fromisoformat(value)
+    if not isinstance(value, datetime.datetime):
+        value = datetime.datetime.combine(value, datetime.time())
+    return value.timestamp()
+
+
+def _window(at, until):
+    """Return the half-open [start, end) window a query covers."""
+    if until is not None:
+        return _timestamp(at), _timestamp(until)
+    if isinstance(at, str) or (isinstance(at, datetime.date) and not isinstance(at, datetime.datetime)):
+        # A bare date means the whole day
+        start = _timestamp(at)
+        return start, _timestamp(datetime.datetime.fromtimestamp(start) + datetime.timedelta(days=1))
+    start = _timestamp(at)
+    return start, math.nextafter(start, math.inf)
+
+
+class _Node:
+    __slots__ = ("start", "end", "stay", "left", "right", "height", "max_end")
+    
+    def __init__(self, stay):
+        self.start = stay.start
+        self.end = stay.end
+        self.stay = stay
+        self.left = None
+        self.right = None
+        self.height = 1
+        self.max_end = stay.end
+
+
+def _height(node):
+    return node.height if node else 0
+
+
+def _update(node):
+    left, right = node.left, node.right
+    max_end = node.end
+    height = 0
+    if left:
+        height = left.height
+        if left.max_end > max_end:
+            max_end = left.max_end
+    if right:
+        if right.height > height:
+            height = right.height
+        if right.max_end > max_end:
+            max_end = right.max_end
+    node.height = height + 1
+    node.max_end = max_end
+
+
+def _rotate_left(node):
+    pivot = node.right
+    node.right, pivot.left = pivot.left, node
+    _update(node)
+    _update(pivot)
+    return pivot
+
+
+def _rotate_right(node):
+    pivot = node.left
+    node.left, pivot.right = pivot.right, node
+    _update(node)
+    _update(pivot)
+    return pivot
+
+
+def _rebalance(node):
+    _update(node)
+    balance = _height(node.left) - _height(node.right)
+    if balance > 1:
+        if _height(node.left.right) > _height(node.left.left):
+            node.left = _rotate_left(node.left)
+        return _rotate_right(node)
+    if balance < -1:
+        if _height(node.right.left) > _height(node.right.right):
+            node.right = _rotate_right(node.right)
+        return _rotate_left(node)
+    return node
+
+
+class IntervalTree:
+    """Balanced interval tree of finished stays."""
+    
+    def __init__(self):
+        """Initialize an empty tree."""
+        self.__root = None
+        self.__size = 0
+    
+    def __len__(self):
+        return self.__size
+    
+    def insert(self, stay):
+        """Add a finished stay (start < end)."""
+        new = _Node(stay)
+        self.__size += 1
+        if self.__root is None:
+            self.__root = new
+            return
+        
+        # Walk down to the insertion point, then rebalance back up the path
+        path = []
+        node = self.__root
+        while node:
+            path.append(node)
+            node = node.left if new.start < node.start else node.right
+        parent = path[-1]
+        if new.start < parent.start:
+            parent.left = new
+        else:
+            parent.right = new
+        for depth in range(len(path) - 1, -1, -1):
+            node = path[depth]
+            height, max_end = node.height, node.max_end
+            balanced = _rebalance(node)
+            if depth == 0:
+                self.__root = balanced
+            elif balanced is not node:
+                above = path[depth - 1]
+                if above.left is node:
+                    above.left = balanced
+                else:
+                    above.right = balanced
+            elif balanced.height == height and balanced.max_end == max_end:
+                # Nothing above this node can change any more
+                break
+    
+    def overlapping(self, start, end):
+        """Return stays overlapping the half-open window [start, end)."""
+        found = []
+        stack = [self.__root]
+        while stack:
+            node = stack.pop()
+            # Nothing in this subtree ends after the window starts
+            if node is None or node.max_end <= start:
+                continue
+            stack.append(node.left)
+            # Right subtree starts no earlier than this node
+            if node.start < end:
+                if node.end > start:
+                    found.append(node.stay)
+                stack.append(node.right)
+        return found
+
+
+class AssignmentHistory:
+    """Time-travel record of which animal was in which enclosure when."""
+    
+    def __init__(self):
+        """Initialize an empty history."""
+        self.__trees = {}
+        self.__open = {}
+        self.__open_by_enclosure = {}
+        self.__by_animal = {}
+    
+    @property
+    def stay_count(self): return sum(map(len, self.__trees.values())) + len(self.__open)
+    
+    def attach(self, center):
+        """
+        Start recording a center's assignments; returns the event Subscription.
+        
+        Animals already in enclosures are recorded as entering now, since
+        their earlier assignment times were never captured.
+        """
+        now = datetime.datetime.now().timestamp()
+        snapshot = center.snapshot()
+        for enclosure_id in snapshot.enclosure_ids():
+            for animal_id in snapshot.members(enclosure_id):
+                if animal_id not in self.__open:
+                    self.enter(animal_id, enclosure_id, now)
+        # No delay: contact-tracing queries should see assignments right away
+        return center.subscribe(self.record, (AnimalAssigned, AnimalDischarged), max_delay=0)
+    
+    def record(self, events):
+        """Apply a batch of AnimalAssigned / AnimalDischarged events."""
+        for event in events:
+            if isinstance(event, AnimalAssigned):
+                if self.__open.get(event.animal_id, (None,))[0] != event.enclosure_id:
+                    self.enter(event.animal_id, event.enclosure_id, event.timestamp)
+            elif isinstance(event, AnimalDischarged):
+                self.leave(event.animal_id, event.timestamp)
+    
+    def enter(self, animal_id, enclosure_id, at):
+        """Record an animal entering an enclosure, closing any stay it had open."""
+        start = _timestamp(at)
+        self.leave(animal_id, start)
+        self.__open[animal_id] = (enclosure_id, start)
+        self.__open_by_enclosure.setdefault(enclosure_id, {})[animal_id] = start
+    
+    def leave(self, animal_id, at):
+        """Close an animal's open stay. Returns False if it had none."""
+        current = self.__open.pop(animal_id, None)
+        if current is None:
+            return False
+        
+        enclosure_id, start = current
+        residents = self.__open_by_enclosure[enclosure_id]
+        del residents[animal_id]
+        if not residents:
+            del self.__open_by_enclosure[enclosure_id]
+        
+        end = _timestamp(at)
+        if end > start:
+            stay = Stay(animal_id, enclosure_id, start, end)
+            tree = self.__trees.get(enclosure_id)
+            if tree is None:
+                tree = self.__trees[enclosure_id] = IntervalTree()
+            tree.insert(stay)
+            self.__by_animal.setdefault(animal_id, []).append(stay)
+        return True
+    
+    def stays(self, animal_id):
+        """Return every stay of an animal, oldest first; an open stay has end None."""
+        stays = list(self.__by_animal.get(animal_id, ()))
+        current = self.__open.get(animal_id)
+        if current:
+            stays.append(Stay(animal_id, current[0], current[1], None))
+        return stays
+    
+    def stays_in(self, enclosure_id, at, until=None):
+        """
+        Return the stays in an enclosure overlapping a moment or period.
+        
+        Args:
+            enclosure_id: Enclosure to query
+            at: Moment (timestamp or datetime), or a date / "YYYY-MM-DD" meaning that whole day
+            until: End of the period starting at `at` (exclusive)
+        """
+        start, end = _window(at, until)
+        tree = self.__trees.get(enclosure_id)
+        found = tree.overlapping(start, end) if tree else []
+        for animal_id, opened in self.__open_by_enclosure.get(enclosure_id, {}).items():
+            if opened < end:
+                found.append(Stay(animal_id, enclosure_id, opened, None))
+        return found
+    
+    def occupants(self, enclosure_id, at, until=None):
+        """Return the IDs of animals in an enclosure at a moment, on a date or during a period."""
+        return {stay.animal_id for stay in self.stays_in(enclosure_id, at, until)}
+    
+    def contacts(self, animal_id):
+        """
+        Return the animals that shared an enclosure with `animal_id`.
+        
+        Returns:
+            dict: {other_animal_id: [(enclosure_id, overlap_start, overlap_end), ...]}
+                  where overlap_end is None while both are still together
+        """
+        contacts = {}
+        for stay in self.stays(animal_id):
+            end = stay.end if stay.end is not None else math.inf
+            for other in self.stays_in(stay.enclosure_id, stay.start, end):
+                if other.animal_id == animal_id:
+                    continue
+                other_end = other.end if other.end is not None else math.inf
+                overlap_end = min(end, other_end)
+                contacts.setdefault(other.animal_id, []).append(
+                    (stay.enclosure_id, max(stay.start, other.start),
+                     None if overlap_end == math.inf else overlap_end))
+        return contacts
@@ -0,0 +1,134 @@
+"""
+Identifier handling for the Wildlife Rehabilitation Management System.
+
+Animal and enclosure IDs are interned with intern_id(), so the center's
+maps, enclosure membership lists and Animal.assigned_enclosure all point
+at one string per ID, and membership tests succeed on the identity check
+before comparing characters. IdRegistry maps external IDs to dense integer
+surrogates for structures indexed by position (columns, arrays, shared
+memory). IdAllocator issues new IDs in the center's "A001" / "E001" style; each
+call reserves its whole range of numbers under one lock acquisition, so
+bulk and concurrent intake neither collide nor contend per ID.
+"""
+
+import re
+import sys
+import threading
+
+
+def intern_id(external_id):
+    """Return the shared copy of a string ID; other values pass through unchanged."""
+    return sys.intern(external_id) if type(external_id) is str else external_id
+
+
+class IdRegistry:
+    """Two-way map between external string IDs and dense integer surrogates."""
+    
+    def __init__(self):
+        """Initialize an empty registry; surrogates are assigned from 0 upwards."""
+        self.__surrogates = {}
+        self.__external = []
+        self.__lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self.__external)
+    
+    def __contains__(self, external_id):
+        return external_id in self.__surrogates
+    
+    def intern(self, external_id):
+        """Return the surrogate for an ID, assigning the next integer if it is new."""
+        surrogate = self.__surrogates.get(external_id)
+        if surrogate is not None:
+            return surrogate
+        
+        if not isinstance(external_id, str) or not external_id:
+            raise ValueError("ID must be a non-empty string")
+        
+        with self.__lock:
+            surrogate = self.__surrogates.get(external_id)
+            if surrogate is None:
+                external_id = intern_id(external_id)
+                surrogate = len(self.__external)
+                self.__external.append(external_id)
+                self.__surrogates[external_id] = surrogate
+            return surrogate
+    
+    def lookup(self, external_id):
+        """Return the surrogate for an ID, or None if it was never interned."""
+        return self.__surrogates.get(external_id)
+    
+    def external(self, surrogate):
+        """Return the external ID for a surrogate."""
+        return self.__external[surrogate]
+    
+    def externals(self, surrogates):
+        """Return the external IDs for an iterable of surrogates, as a list."""
+        return list(map(self.__external.__getitem__, surrogates))
+
+
+class IdAllocator:
+    """Issues unused IDs of the form <prefix><zero-padded number>."""
+    
+    def __init__(self, prefix, width=3, start=1):
+        """
+        Initialize an IdAllocator.
+        
+        Args:
+            prefix: Letters every issued ID starts with, e.g. "A"
+            width: Minimum number of digits (numbers past it simply grow longer)
+            start: First number to issue
+        """
+        # Validate parameters
+        if not isinstance(prefix, str) or not prefix.isalpha():
+            raise ValueError("Prefix must be a non-empty alphabetic string")
+        if not isinstance(width, int) or width <= 0:
+            raise ValueError("Width must be a positive integer")
+        if not isinstance(start, int) or start < 0:
+            raise ValueError("Start must be a non-negative integer")
+        
+        self.__prefix = prefix
+        self.__width = width
+        self.__pattern = re.compile(rf"{prefix}(\d{{{width},}})")
+        self.__next = start
+        self.__lock = threading.Lock()
+    
+    @property
+    def prefix(self): return self.__prefix
+    
+    @property
+    def width(self): return self.__width
+    
+    def validate(self, external_id):
+        """Check whether an ID has the format this allocator issues."""
+        return isinstance(external_id, str) and self.__pattern.fullmatch(external_id) is not None
+    
+    def observe(self, external_id):
+        """Note an ID issued elsewhere so it is never handed out again."""
+        match = self.__pattern.fullmatch(external_id) if isinstance(external_id, str) else None
+        if match:
+            with self.__lock:
+                self.__next = max(self.__next, int(match.group(1)) + 1)
+    
+    def allocate(self, in_use=()):
+        """Issue one ID that is not in `in_use` (any container of existing IDs)."""
+        return self.allocate_many(1, in_use)[0]
+    
+    def allocate_many(self, count, in_use=()):
+        """Issue `count` distinct IDs, skipping any that are in `in_use`."""
+        if not isinstance(count, int) or count < 0:
+            raise ValueError("Count must be a non-negative integer")
+        
+        prefix, width = self.__prefix, self.__width
+        issued = []
+        while len(issued) < count:
+            # Reserve the numbers still needed, then format them outside the lock
+            needed = count - len(issued)
+            with self.__lock:
+                first = self.__next
+                self.__next += needed
+            for number in range(first, first + needed):
+                external_id = f"{prefix}{number:0{width}d}"
+                if external_id not in in_use:
+                    issued.append(external_id)
+        return issued
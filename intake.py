@@ -0,0 +1,252 @@
+"""
+Surge intake pipeline for the Wildlife Rehabilitation Management System.
+
+IntakeQueue puts a bounded asyncio.Queue in front of a RehabilitationCenter.
+Producers await submit(), which blocks while the queue is full, so a burst
+of intake slows its sources down instead of growing memory without limit.
+A single drain task takes animals off the queue in batches, places each in
+an enclosure with free capacity of a type its species may be housed in
+and applies the whole batch as one center transaction, so events and
+maintenance run once per batch rather than once per animal. Enclosures with
+free capacity are cached between batches and re-checked on use; the center
+is only rescanned when the cache runs dry and enclosures were added or
+RESCAN_SECONDS have passed, so placement does not cost a full scan per batch.
+
+close() stops new submissions, but producers already waiting on a full
+queue still get their animals in: run() keeps draining until the queue is
+empty and no submit() is in progress. A batch that fails with anything
+other than a rejected transaction is counted as failed and the drain
+carries on.
+"""
+
+import asyncio
+import time
+
+from transactions import TransactionError
+
+# Shortest time between rescans of the center for capacity freed elsewhere
+RESCAN_SECONDS = 1.0
+
+
+class IntakeQueue:
+    """Bounded, batched intake of animals into a center."""
+    
+    def __init__(self, center, maxsize=1000, batch_size=100, enclosure_types=None):
+        """
+        Initialize an IntakeQueue.
+        
+        Args:
+            center: RehabilitationCenter receiving the animals
+            maxsize: Queued animals at which submit() starts waiting
+            batch_size: Largest number of animals applied in one transaction
+            enclosure_types: Optional {species: enclosure_type} used for placement
+                instead of the types the center's species catalog allows
+        """
+        # Validate parameters
+        if not isinstance(maxsize, int) or maxsize <= 0:
+            raise ValueError("Queue size must be a positive integer")
+        if not isinstance(batch_size, int) or batch_size <= 0:
+            raise ValueError("Batch size must be a positive integer")
+        
+        self.__center = center
+        self.__queue = asyncio.Queue(maxsize)
+        self.__batch_size = batch_size
+        self.__enclosure_types = dict(enclosure_types or {})
+        self.__closed = False
+        self.__closing = asyncio.Event()
+        self.__putting = 0
+        self.__free = {}
+        self.__scanned = None
+        self.__submitted = 0
+        self.__placed = 0
+        self.__unplaced = 0
+        self.__rejected = 0
+        self.__failed = 0
+        self.__last_error = None
+        self.__batches = 0
+        self.__max_depth = 0
+        self.__total_wait = 0.0
+        self.__max_wait = 0.0
+        self.__drain_time = 0.0
+    
+    @property
+    def depth(self): return self.__queue.qsize()
+    
+    @property
+    def closed(self): return self.__closed
+    
+    async def submit(self, animal):
+        """Queue an animal, waiting while the queue is full. Returns False once closed."""
+        if self.__closed:
+            return False
+        
+        # Counted while waiting, so run() does not return before this animal is queued
+        self.__putting += 1
+        try:
+            await self.__queue.put((animal, time.perf_counter()))
+        finally:
+            self.__putting -= 1
+        self.__accepted()
+        return True
+    
+    def submit_nowait(self, animal):
+        """Queue an animal without waiting. Returns False if the queue is full or closed."""
+        if self.__closed or self.__queue.full():
+            return False
+        
+        self.__queue.put_nowait((animal, time.perf_counter()))
+        self.__accepted()
+        return True
+    
+    async def close(self):
+        """Stop accepting animals; run() returns once everything submitted is applied."""
+        self.__closed = True
+        self.__closing.set()
+    
+    async def run(self):
+        """Drain the queue in batches until close() is called and every submitted animal is applied."""
+        while True:
+            if self.__queue.empty():
+                if self.__closed and not self.__putting:
+                    return self.stats()
+                item = await self.__next()
+                if item is None:
+                    continue
+                batch = [item]
+            else:
+                batch = [self.__queue.get_nowait()]
+            while len(batch) < self.__batch_size and not self.__queue.empty():
+                batch.append(self.__queue.get_nowait())
+            
+            try:
+                self.__apply(batch)
+            except Exception as error:
+                # Keep draining; the producers of these animals are not told
+                self.__failed += len(batch)
+                self.__last_error = error
+            # Let producers refill the queue between batches
+            await asyncio.sleep(0)
+    
+    async def __next(self):
+        # Wait for an animal, or return None when close() is called first
+        if self.__closed:
+            # Submissions still waiting will fill the queue shortly
+            return await self.__queue.get()
+        getter = asyncio.ensure_future(self.__queue.get())
+        closer = asyncio.ensure_future(self.__closing.wait())
+        done, _ = await asyncio.wait((getter, closer), return_when=asyncio.FIRST_COMPLETED)
+        closer.cancel()
+        if getter in done:
+            return getter.result()
+        # A cancelled get() leaves any item it was woken for in the queue
+        getter.cancel()
+        return None
+    
+    def stats(self):
+        """
+        Return queue depth, wait time and drain throughput figures as a dict.
+        
+        Waits run from the submit() call to the batch being applied, so they
+        include any time the producer spent blocked on a full queue.
+        """
+        processed = self.__placed + self.__unplaced + self.__rejected + self.__failed
+        return {
+            "depth": self.__queue.qsize(),
+            "max_depth": self.__max_depth,
+            "submitted": self.__submitted,
+            "placed": self.__placed,
+            "unplaced": self.__unplaced,
+            "rejected": self.__rejected,
+            "failed": self.__failed,
+            "last_error": self.__last_error,
+            "batches": self.__batches,
+            "mean_wait_seconds": self.__total_wait / processed if processed else 0.0,
+            "max_wait_seconds": self.__max_wait,
+            "drain_per_second": processed / self.__drain_time if self.__drain_time else 0.0,
+        }
+    
+    def __accepted(self):
+        self.__submitted += 1
+        depth = self.__queue.qsize()
+        if depth > self.__max_depth:
+            self.__max_depth = depth
+    
+    def __apply(self, batch):
+        start = time.perf_counter()
+        self.__batches += 1
+        for _, queued_at in batch:
+            wait = start - queued_at
+            self.__total_wait += wait
+            if wait > self.__max_wait:
+                self.__max_wait = wait
+        
+        animals = [animal for animal, _ in batch]
+        placements = self.__place(animals)
+        try:
+            with self.__center.transaction() as tx:
+                for animal, enclosure_id in zip(animals, placements):
+                    tx.add_animal(animal)
+                    if enclosure_id:
+                        tx.assign_animal_to_enclosure(animal.animal_id, enclosure_id)
+            placed = sum(1 for enclosure_id in placements if enclosure_id)
+            self.__placed += placed
+            self.__unplaced += len(animals) - placed
+        except TransactionError:
+            # Something in the batch was rejected (e.g. a duplicate ID):
+            # apply animal by animal so the rest still gets in
+            for animal, enclosure_id in zip(animals, placements):
+                if not self.__center.add_animal(animal):
+                    self.__rejected += 1
+                elif enclosure_id and self.__center.assign_animal_to_enclosure(animal.animal_id, enclosure_id):
+                    self.__placed += 1
+                else:
+                    self.__unplaced += 1
+        
+        self.__drain_time += time.perf_counter() - start
+    
+    def __rescan(self):
+        center = self.__center
+        self.__free = {}
+        for enclosure_id in center.enclosure_ids():
+            enclosure = center.get_enclosure(enclosure_id)
+            if enclosure and enclosure.available_capacity > 0:
+                self.__free.setdefault(enclosure.enclosure_type, []).append(enclosure_id)
+        self.__scanned = (center.enclosure_count, time.perf_counter())
+    
+    def __take(self, pools, pending):
+        # Pop cached enclosures until one still has room after this batch's earlier placements
+        center = self.__center
+        for pool in pools:
+            while pool:
+                enclosure_id = pool[-1]
+                enclosure = center.get_enclosure(enclosure_id)
+                if enclosure and enclosure.available_capacity > pending.get(enclosure_id, 0):
+                    pending[enclosure_id] = pending.get(enclosure_id, 0) + 1
+                    return enclosure_id
+                pool.pop()
+        return None
+    
+    def __place(self, animals):
+        catalog = self.__center.species_catalog
+        placements = []
+        pending = {}
+        rescanned = False
+        for animal in animals:
+            wanted = self.__enclosure_types.get(animal.species)
+            types = (wanted,) if wanted else catalog.compatible_types(animal.species)
+            enclosure_id = None
+            while True:
+                pools = [self.__free.get(t, []) for t in types] if types else list(self.__free.values())
+                enclosure_id = self.__take(pools, pending)
+                if enclosure_id or rescanned or not self.__rescan_due():
+                    break
+                self.__rescan()
+                rescanned = True
+            placements.append(enclosure_id)
+        return placements
+    
+    def __rescan_due(self):
+        if self.__scanned is None:
+            return True
+        count, scanned_at = self.__scanned
+        return count != self.__center.enclosure_count or time.perf_counter() - scanned_at >= RESCAN_SECONDS
@@ -0,0 +1,111 @@
+"""
+Memory accounting helpers for the Wildlife Rehabilitation Management System.
+
+estimate_size() walks an object graph the way sys.getsizeof cannot: it
+follows containers, instance __dict__s and __slots__, counts each object
+once, and for large containers sizes only an evenly spaced, fixed-size
+sample of the items and scales the result. Lists and tuples are strided
+directly; dicts and sets are stepped through by itertools.islice, which
+skips the unsampled items in C. Only the sample is sized in Python, which
+keeps RehabilitationCenter.memory_report() cheap enough to run
+periodically on a center with millions of animals.
+Components can share objects (interned IDs, for instance); pass their types
+as `shared` to leave them out of a component that does not own them. The
+tracemalloc figures, when tracing is enabled, are the authoritative total.
+"""
+
+import itertools
+import sys
+import tracemalloc
+import types
+from collections import deque
+
+# Never followed: code, classes and callables lead back into the whole program
+_OPAQUE = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+           types.MethodType, types.CodeType, types.FrameType)
+_ATOMIC = (str, bytes, bytearray, int, float, complex, bool, type(None))
+_MAX_DEPTH = 64
+
+
+def sample(values, count, size):
+    """Return about `size` evenly spaced items from `values` (of length `count`)."""
+    step = max(1, count // size)
+    if isinstance(values, (list, tuple)):
+        # Sequences can be strided without visiting the skipped items
+        return list(values[::step])
+    # Other iterables (dict views, sets) are stepped through in C; taking the
+    # first items instead would size only the oldest entries of a dict
+    return list(itertools.islice(values, 0, None, step))
+
+
+def estimate_size(obj, sample_size=100, shared=()):
+    """Estimate the bytes retained by `obj` and everything it references, except `shared` types."""
+    return int(_estimate(obj, sample_size, set(), 0, shared))
+
+
+def sampled_size(values, count, sample_size=100, shared=()):
+    """Estimate the total size of `count` objects from a sample of `values`."""
+    if not count:
+        return 0
+    seen = set()
+    items = sample(values, count, sample_size)
+    return int(sum(_estimate(item, sample_size, seen, 0, shared) for item in items) * count / len(items))
+
+
+def _estimate(obj, sample_size, seen, depth, shared):
+    if id(obj) in seen or isinstance(obj, _OPAQUE) or isinstance(obj, shared):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, _ATOMIC) or depth >= _MAX_DEPTH:
+        return size
+    
+    if isinstance(obj, dict):
+        # Sampling the keys skips the others without building their item tuples
+        keys = sample(obj, len(obj), sample_size) if obj else []
+        child_size = sum(_estimate(key, sample_size, seen, depth + 1, shared) +
+                         _estimate(obj[key], sample_size, seen, depth + 1, shared) for key in keys)
+        return size + (child_size * len(obj) / len(keys) if keys else 0)
+    if isinstance(obj, (list, tuple, set, frozenset, deque)):
+        items = sample(obj, len(obj), sample_size) if obj else []
+        child_size = sum(_estimate(item, sample_size, seen, depth + 1, shared) for item in items)
+        return size + (child_size * len(obj) / len(items) if items else 0)
+    
+    attributes = getattr(obj, "__dict__", None)
+    if isinstance(attributes, dict):
+        size += _estimate(attributes, sample_size, seen, depth + 1, shared)
+    for name in _slot_names(type(obj)):
+        if hasattr(obj, name):
+            size += _estimate(getattr(obj, name), sample_size, seen, depth + 1, shared)
+    return size
+
+
+def _slot_names(cls):
+    names = []
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get("__slots__", ())
+        for slot in (slots,) if isinstance(slots, str) else slots:
+            # Private slots are stored under their mangled name
+            if slot.startswith("__") and not slot.endswith("__"):
+                slot = f"_{klass.__name__.lstrip('_')}{slot}"
+            names.append(slot)
+    return names
+
+
+def tracemalloc_stats(top=0):
+    """
+    Return tracemalloc figures as a flat dict (empty when tracing is off).
+    
+    Args:
+        top: Also report the `top` source files holding the most memory;
+            this takes a tracemalloc snapshot, so it costs more
+    """
+    if not tracemalloc.is_tracing():
+        return {}
+    
+    current, peak = tracemalloc.get_traced_memory()
+    stats = {"tracemalloc.current_bytes": current, "tracemalloc.peak_bytes": peak}
+    if top:
+        for stat in tracemalloc.take_snapshot().statistics("filename")[:top]:
+            stats[f"tracemalloc.file.{stat.traceback[0].filename}"] = stat.size
+    return stats
@@ -0,0 +1,389 @@
+"""
+Shared-memory occupancy table for the Wildlife Rehabilitation Management System.
+
+The process that owns a RehabilitationCenter publishes enclosure capacity
+and occupancy, and each animal's status and enclosure, into a fixed-layout
+multiprocessing.shared_memory block. Other processes open it by name with
+OccupancyReader and read rows in place, without a copy of the center.
+
+Consistency uses a seqlock: the single writer makes the sequence number odd
+before changing rows and even again afterwards; a reader notes the number,
+reads, and retries if it was odd or has changed, so it never sees a torn
+row. Each enclosure add/remove is one write, so a move between enclosures
+is visible as two steps, exactly as on the Enclosure objects themselves.
+Rows are only appended, and a row's ID never changes once written.
+
+Layout (little-endian):
+    header: magic b"WROT", flags (bit 0: rows were dropped, table too small
+            or ID longer than its 24-byte column),
+            sequence (u64), enclosure slots, animal slots, enclosure count,
+            animal count (u32 each)
+    enclosure rows: id (24 bytes UTF-8), capacity (u32), occupancy (u32)
+    animal rows: id (24 bytes UTF-8), enclosure row (i32, -1 for none),
+                 status (28 bytes UTF-8, truncated)
+"""
+
+import struct
+import sys
+import weakref
+from multiprocessing import resource_tracker, shared_memory
+
+from events import AnimalAdded, AnimalDischarged, EnclosureAdded
+from identifiers import IdRegistry
+
+MAGIC = b"WROT"
+_HEADER = struct.Struct("<4sIQIIII")
+_SEQUENCE = struct.Struct("<Q")
+_SEQUENCE_OFFSET = 8
+_COUNTS = struct.Struct("<II")
+_COUNTS_OFFSET = 24
+_ENCLOSURE_ROW = struct.Struct("<24sII")
+_ANIMAL_ROW = struct.Struct("<24si28s")
+_FIELD = struct.Struct("<i")
+_OCCUPANCY_OFFSET = 28
+_ENCLOSURE_OFFSET = 24
+_TRUNCATED = 1
+_ID_WIDTH = 24
+
+
+def _encode(text, width):
+    return text.encode("utf-8")[:width]
+
+
+def _fits(identifier):
+    # IDs are row keys and are never shortened: two IDs sharing a 24-byte
+    # prefix would otherwise alias the same row
+    return len(identifier.encode("utf-8")) <= _ID_WIDTH
+
+
+def _decode(raw):
+    return raw.rstrip(b"\0").decode("utf-8", "replace")
+
+
+class OccupancyTable:
+    """Writer side of the shared table, owned by the process holding the center."""
+    
+    def __init__(self, max_enclosures=1024, max_animals=65536, name=None):
+        """
+        Create the shared memory block.
+        
+        Args:
+            max_enclosures: Enclosure rows to reserve
+            max_animals: Animal rows to reserve
+            name: Shared memory name (generated if omitted)
+        """
+        # Validate parameters
+        if not isinstance(max_enclosures, int) or max_enclosures <= 0:
+            raise ValueError("Enclosure slots must be a positive integer")
+        if not isinstance(max_animals, int) or max_animals <= 0:
+            raise ValueError("Animal slots must be a positive integer")
+        
+        size = _HEADER.size + max_enclosures * _ENCLOSURE_ROW.size + max_animals * _ANIMAL_ROW.size
+        self.__memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.__buffer = self.__memory.buf
+        self.__max_enclosures = max_enclosures
+        self.__max_animals = max_animals
+        self.__animal_base = _HEADER.size + max_enclosures * _ENCLOSURE_ROW.size
+        self.__enclosure_rows = IdRegistry()
+        self.__animal_rows = IdRegistry()
+        self.__sequence = 0
+        self.__flags = 0
+        self.__watched = weakref.WeakSet()
+        self.__center = None
+        self.__subscription = None
+        _HEADER.pack_into(self.__buffer, 0, MAGIC, 0, 0, max_enclosures, max_animals, 0, 0)
+    
+    def __del__(self):
+        """Release the shared memory block."""
+        self.close()
+    
+    @property
+    def name(self): return self.__memory.name
+    
+    @property
+    def enclosure_count(self): return len(self.__enclosure_rows)
+    
+    @property
+    def animal_count(self): return len(self.__animal_rows)
+    
+    @property
+    def truncated(self): return bool(self.__flags & _TRUNCATED)
+    
+    def attach(self, center):
+        """
+        Publish a center's current state and keep the table updated.
+        
+        Enclosure membership (and so each animal's enclosure) is followed
+        through enclosure listeners as it changes; intake, new enclosures
+        and discharge status through an event subscription, which is returned.
+        IDs added later that do not fit the 24-byte ID column are left out
+        and flagged like rows beyond the reserved slots (see truncated).
+        
+        Raises:
+            ValueError: If a current animal or enclosure ID is longer than 24 bytes
+        """
+        snapshot = center.snapshot()
+        # Validate parameters
+        for identifier in (*snapshot.enclosure_ids(), *snapshot.animal_ids()):
+            if not _fits(identifier):
+                raise ValueError(f"ID {identifier!r} is longer than {_ID_WIDTH} bytes")
+        
+        self.__center = weakref.ref(center)
+        self.__begin()
+        try:
+            for enclosure_id in snapshot.enclosure_ids():
+                self.__watch(snapshot.get_enclosure(enclosure_id))
+            for animal_id in snapshot.animal_ids():
+                status, enclosure_id, _ = snapshot.animal_state(animal_id)
+                self.__write_animal(animal_id, status, enclosure_id)
+        finally:
+            self.__end()
+        self.__subscription = center.subscribe(self.record, (AnimalAdded, EnclosureAdded, AnimalDischarged),
+                                               max_delay=0)
+        return self.__subscription
+    
+    def record(self, events):
+        """Apply a batch of center events."""
+        self.__begin()
+        try:
+            for event in events:
+                if isinstance(event, AnimalDischarged):
+                    self.__write_status(event.animal_id, event.status)
+                elif isinstance(event, AnimalAdded):
+                    center = self.__center() if self.__center else None
+                    animal = center.get_animal(event.animal_id) if center else None
+                    self.__write_status(event.animal_id, animal.status if animal else "In rehabilitation")
+                elif isinstance(event, EnclosureAdded):
+                    center = self.__center() if self.__center else None
+                    enclosure = center.get_enclosure(event.enclosure_id) if center else None
+                    if enclosure:
+                        self.__watch(enclosure)
+        finally:
+            self.__end()
+    
+    def watch(self, enclosure):
+        """Publish an enclosure and follow its membership changes."""
+        # Validate parameters
+        if not _fits(enclosure.enclosure_id):
+            raise ValueError(f"ID {enclosure.enclosure_id!r} is longer than {_ID_WIDTH} bytes")
+        
+        self.__begin()
+        try:
+            self.__watch(enclosure)
+        finally:
+            self.__end()
+    
+    def close(self):
+        """Stop following the center and remove the shared memory block."""
+        if self.__buffer is None:
+            return
+        
+        center = self.__center() if self.__center else None
+        if center is not None and self.__subscription is not None:
+            center.unsubscribe(self.__subscription)
+        self.__subscription = None
+        for enclosure in list(self.__watched):
+            enclosure.remove_listener(self.__on_membership)
+        self.__watched.clear()
+        self.__buffer = None
+        self.__memory.close()
+        # Readers forked from this process share its resource tracker and may
+        # have unregistered the name; register again so unlink() finds it
+        resource_tracker.register(self.__memory._name, "shared_memory")
+        self.__memory.unlink()
+    
+    def __on_membership(self, enclosure, action, animal_id):
+        enclosure_row = self.__enclosure_rows.lookup(enclosure.enclosure_id)
+        row = self.__animal_rows.lookup(animal_id)
+        if enclosure_row is None or row is None:
+            # First sight of either ID: take the general path that appends rows
+            self.__begin()
+            try:
+                self.__watch_members(enclosure)
+            finally:
+                self.__end()
+            return
+        
+        # Hot path: two fixed-offset integer writes inside one seqlock section
+        buffer = self.__buffer
+        occupied = enclosure.capacity - enclosure.available_capacity
+        field = self.__animal_base + row * _ANIMAL_ROW.size + _ENCLOSURE_OFFSET
+        self.__sequence += 1
+        _SEQUENCE.pack_into(buffer, _SEQUENCE_OFFSET, self.__sequence)
+        _FIELD.pack_into(buffer, _HEADER.size + enclosure_row * _ENCLOSURE_ROW.size + _OCCUPANCY_OFFSET, occupied)
+        if action == "add":
+            _FIELD.pack_into(buffer, field, enclosure_row)
+        elif _FIELD.unpack_from(buffer, field)[0] == enclosure_row:
+            _FIELD.pack_into(buffer, field, -1)
+        self.__sequence += 1
+        _SEQUENCE.pack_into(buffer, _SEQUENCE_OFFSET, self.__sequence)
+    
+    def __watch(self, enclosure):
+        if enclosure not in self.__watched:
+            enclosure.add_listener(self.__on_membership)
+            self.__watched.add(enclosure)
+        self.__watch_members(enclosure)
+    
+    def __watch_members(self, enclosure):
+        # Write the enclosure row and point each member's row at it
+        self.__write_enclosure_row(enclosure.enclosure_id, enclosure.capacity,
+                                   enclosure.capacity - enclosure.available_capacity)
+        enclosure_row = self.__enclosure_rows.lookup(enclosure.enclosure_id)
+        for animal_id in enclosure.animals if enclosure_row is not None else ():
+            row = self.__animal_row(animal_id)
+            if row is not None:
+                _FIELD.pack_into(self.__buffer, self.__animal_base + row * _ANIMAL_ROW.size + _ENCLOSURE_OFFSET,
+                                 enclosure_row)
+    
+    def __begin(self):
+        # Odd sequence: a write is in progress
+        self.__sequence += 1
+        _SEQUENCE.pack_into(self.__buffer, _SEQUENCE_OFFSET, self.__sequence)
+    
+    def __end(self):
+        _COUNTS.pack_into(self.__buffer, _COUNTS_OFFSET, len(self.__enclosure_rows), len(self.__animal_rows))
+        struct.pack_into("<I", self.__buffer, 4, self.__flags)
+        self.__sequence += 1
+        _SEQUENCE.pack_into(self.__buffer, _SEQUENCE_OFFSET, self.__sequence)
+    
+    def __write_enclosure_row(self, enclosure_id, capacity, occupancy):
+        row = self.__enclosure_rows.lookup(enclosure_id)
+        if row is None:
+            if len(self.__enclosure_rows) >= self.__max_enclosures or not _fits(enclosure_id):
+                self.__flags |= _TRUNCATED
+                return
+            row = self.__enclosure_rows.intern(enclosure_id)
+        _ENCLOSURE_ROW.pack_into(self.__buffer, _HEADER.size + row * _ENCLOSURE_ROW.size,
+                                 _encode(enclosure_id, _ID_WIDTH), capacity, occupancy)
+    
+    def __animal_row(self, animal_id):
+        row = self.__animal_rows.lookup(animal_id)
+        if row is None:
+            if len(self.__animal_rows) >= self.__max_animals or not _fits(animal_id):
+                self.__flags |= _TRUNCATED
+                return None
+            row = self.__animal_rows.intern(animal_id)
+            _ANIMAL_ROW.pack_into(self.__buffer, self.__animal_base + row * _ANIMAL_ROW.size,
+                                  _encode(animal_id, _ID_WIDTH), -1, b"")
+        return row
+    
+    def __write_animal(self, animal_id, status, enclosure_id):
+        row = self.__animal_row(animal_id)
+        if row is None:
+            return
+        enclosure_row = self.__enclosure_rows.lookup(enclosure_id) if enclosure_id else None
+        _ANIMAL_ROW.pack_into(self.__buffer, self.__animal_base + row * _ANIMAL_ROW.size,
+                              _encode(animal_id, _ID_WIDTH), -1 if enclosure_row is None else enclosure_row,
+                              _encode(status or "", 28))
+    
+    def __write_status(self, animal_id, status):
+        # The enclosure column is left to the membership listener
+        row = self.__animal_row(animal_id)
+        if row is not None:
+            struct.pack_into("28s", self.__buffer, self.__animal_base + row * _ANIMAL_ROW.size + 28,
+                             _encode(status or "", 28))
+
+
+class OccupancyReader:
+    """Read-only view of an OccupancyTable, usable from any process."""
+    
+    def __init__(self, name):
+        """
+        Open a table published by another process.
+        
+        Args:
+            name: OccupancyTable.name of the writer
+        """
+        # The writer owns the block; keep this process from unlinking it at exit
+        if sys.version_info >= (3, 13):
+            self.__memory = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            self.__memory = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(self.__memory._name, "shared_memory")
+        self.__buffer = self.__memory.buf
+        magic, _, _, max_enclosures, _, _, _ = _HEADER.unpack_from(self.__buffer, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{name} is not an occupancy table")
+        
+        self.__animal_base = _HEADER.size + max_enclosures * _ENCLOSURE_ROW.size
+        self.__enclosure_ids = []
+        self.__enclosure_rows = {}
+        self.__animal_ids = []
+        self.__animal_rows = {}
+    
+    def __del__(self):
+        """Detach from the shared memory block."""
+        self.close()
+    
+    def close(self):
+        """Detach from the shared memory block (the writer removes it)."""
+        if self.__buffer is not None:
+            self.__buffer = None
+            self.__memory.close()
+    
+    @property
+    def truncated(self): return bool(_HEADER.unpack_from(self.__buffer, 0)[1] & _TRUNCATED)
+    
+    def enclosure(self, enclosure_id):
+        """Return (occupied, capacity) for an enclosure, or None if it is not published."""
+        def read():
+            row = self.__enclosure_rows.get(enclosure_id)
+            if row is None:
+                return None
+            _, capacity, occupancy = _ENCLOSURE_ROW.unpack_from(self.__buffer, _HEADER.size + row * _ENCLOSURE_ROW.size)
+            return occupancy, capacity
+        return self.__consistent(read)
+    
+    def animal(self, animal_id):
+        """Return (status, enclosure_id) for an animal, or None if it is not published."""
+        def read():
+            row = self.__animal_rows.get(animal_id)
+            if row is None:
+                return None
+            _, enclosure_row, status = _ANIMAL_ROW.unpack_from(self.__buffer,
+                                                               self.__animal_base + row * _ANIMAL_ROW.size)
+            return _decode(status), None if enclosure_row < 0 else self.__enclosure_ids[enclosure_row]
+        return self.__consistent(read)
+    
+    def occupancy(self):
+        """Return {enclosure_id: (occupied, capacity)} as of one consistent moment."""
+        def read():
+            table = {}
+            for row, enclosure_id in enumerate(self.__enclosure_ids):
+                _, capacity, occupancy = _ENCLOSURE_ROW.unpack_from(self.__buffer,
+                                                                    _HEADER.size + row * _ENCLOSURE_ROW.size)
+                table[enclosure_id] = (occupancy, capacity)
+            return table
+        return self.__consistent(read)
+    
+    def __consistent(self, read):
+        # Seqlock read: retry while a write is in progress or happened meanwhile
+        buffer = self.__buffer
+        while True:
+            before = _SEQUENCE.unpack_from(buffer, _SEQUENCE_OFFSET)[0]
+            if before & 1:
+                continue
+            counts = _COUNTS.unpack_from(buffer, _COUNTS_OFFSET)
+            if _SEQUENCE.unpack_from(buffer, _SEQUENCE_OFFSET)[0] != before:
+                continue
+            self.__refresh_rows(*counts)
+            try:
+                value = read()
+            except IndexError:
+                continue
+            if _SEQUENCE.unpack_from(buffer, _SEQUENCE_OFFSET)[0] == before:
+                return value
+    
+    def __refresh_rows(self, enclosure_count, animal_count):
+        # Rows below a published count are never rewritten with a different ID,
+        # so they can be scanned outside the seqlock; only new rows are visited
+        for row in range(len(self.__enclosure_ids), enclosure_count):
+            enclosure_id = _decode(_ENCLOSURE_ROW.unpack_from(self.__buffer,
+                                                              _HEADER.size + row * _ENCLOSURE_ROW.size)[0])
+            self.__enclosure_ids.append(enclosure_id)
+            self.__enclosure_rows[enclosure_id] = row
+        for row in range(len(self.__animal_ids), animal_count):
+            animal_id = _decode(_ANIMAL_ROW.unpack_from(self.__buffer, self.__animal_base + row * _ANIMAL_ROW.size)[0])
+            self.__animal_ids.append(animal_id)
+            self.__animal_rows[animal_id] = row
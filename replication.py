@@ -0,0 +1,373 @@
+"""
+Read replicas for the Wildlife Rehabilitation Management System.
+
+ReplicationPrimary streams a center's mutations (intake, new enclosures,
+assignments and discharges, taken from its change events) to follower
+processes over multiprocessing connections: a Unix socket it listens on,
+or any Connection such as one end of a multiprocessing.Pipe(). A follower
+first receives the whole center in the compact serialization format, then
+batches of operations, and applies them to its own RehabilitationCenter.
+Reporting code in the follower process queries that replica, so it no
+longer competes with intake on the primary.
+
+The primary's event callback only records each operation in a queue; a
+sender thread drains everything queued since its last send into one
+message, so the batch size grows with the write rate and a slow follower
+never blocks the writer. The snapshot a new follower starts from may
+already include some operations that are streamed to it afterwards;
+operations are idempotent (adds of existing IDs are ignored, assignment
+and discharge set absolute state), so replaying them is harmless.
+
+Every operation carries the primary's event timestamp, so followers can
+report replication lag as the time from the mutation to its application.
+
+A primary whose center uses its own species catalog sends the catalog's
+records with the initial copy, so followers make the same placement
+decisions; species registered after a follower joined are not sent.
+Centers whose animals live in an AnimalCache cannot be snapshotted, so
+followers trying to join one are dropped and last_error says why.
+"""
+
+import os
+import pickle
+import queue
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+import serialization
+from events import AnimalAdded, AnimalAssigned, AnimalDischarged, EnclosureAdded
+from species import CATALOG, SpeciesCatalog
+from wildlife_rehabilitation_management_system import Animal, Enclosure
+
+_STOP = object()
+_JOIN = object()
+_FLUSH = object()
+
+
+class ReplicationPrimary:
+    """Streams a center's mutations to follower processes."""
+    
+    def __init__(self, center):
+        """
+        Initialize a ReplicationPrimary and start capturing mutations.
+        
+        Args:
+            center: RehabilitationCenter to replicate
+        """
+        self.__center = center
+        self.__queue = queue.SimpleQueue()
+        self.__followers = []
+        self.__listener = None
+        self.__address = None
+        self.__sequence = 0
+        self.__operations_sent = 0
+        self.__last_error = None
+        self.__closed = False
+        self.__sender = threading.Thread(target=self.__send_loop, name="replication-sender", daemon=True)
+        self.__sender.start()
+        # Immediate delivery: the callback only enqueues, the sender thread batches
+        self.__subscription = center.subscribe(
+            self.__record, (AnimalAdded, EnclosureAdded, AnimalAssigned, AnimalDischarged), max_delay=0)
+    
+    @property
+    def address(self): return self.__address
+    
+    @property
+    def follower_count(self): return len(self.__followers)
+    
+    @property
+    def sequence(self): return self.__sequence
+    
+    @property
+    def operations_sent(self): return self.__operations_sent
+    
+    @property
+    def last_error(self): return self.__last_error
+    
+    def listen(self, address=None):
+        """
+        Accept followers on a Unix socket; returns its address.
+        
+        Args:
+            address: Socket path (default: a new path in the temp directory)
+        """
+        if self.__listener is not None:
+            raise ValueError("Primary is already listening")
+        
+        if address is None:
+            address = os.path.join(tempfile.mkdtemp(prefix="wrms-"), "replication.sock")
+        self.__listener = Listener(address, family="AF_UNIX")
+        self.__address = address
+        threading.Thread(target=self.__accept_loop, name="replication-accept", daemon=True).start()
+        return address
+    
+    def add_follower(self, connection):
+        """Stream to an already open Connection (e.g. one end of multiprocessing.Pipe())."""
+        if self.__closed:
+            return False
+        
+        self.__queue.put((_JOIN, connection))
+        return True
+    
+    def flush(self, timeout=None):
+        """
+        Wait until every mutation made so far has been sent to the followers.
+        
+        Returns:
+            int: The sequence number of the last batch sent, or None on timeout
+        
+        Raises:
+            RuntimeError: If the sender thread has stopped (e.g. after close())
+        """
+        sent = threading.Event()
+        self.__queue.put((_FLUSH, sent))
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not sent.wait(0.05):
+            if not self.__sender.is_alive():
+                raise RuntimeError("Replication sender has stopped")
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+        return self.__sequence
+    
+    def close(self):
+        """Stop replicating; followers see the stream end."""
+        if self.__closed:
+            return False
+        
+        self.__closed = True
+        self.__center.unsubscribe(self.__subscription)
+        self.__queue.put(_STOP)
+        self.__sender.join()
+        if self.__listener is not None:
+            self.__listener.close()
+            try:
+                os.unlink(self.__address)
+                os.rmdir(os.path.dirname(self.__address))
+            except OSError:
+                pass
+        for connection in self.__followers:
+            connection.close()
+        self.__followers = []
+        return True
+    
+    def __record(self, events):
+        # Runs in the writer's thread: capture what each event needs, nothing more
+        center = self.__center
+        put = self.__queue.put
+        for event in events:
+            if isinstance(event, AnimalAssigned):
+                put(("S", event.animal_id, event.enclosure_id, event.timestamp))
+            elif isinstance(event, AnimalAdded):
+                animal = center.get_animal(event.animal_id)
+                if animal is not None:
+                    put(("A", animal.to_record(), event.timestamp))
+            elif isinstance(event, AnimalDischarged):
+                put(("D", event.animal_id, event.discharge_date, event.status, event.timestamp))
+            else:
+                put(("E", event.enclosure_id, event.enclosure_type, event.capacity, event.timestamp))
+    
+    def __accept_loop(self):
+        while not self.__closed:
+            try:
+                connection = self.__listener.accept()
+            except OSError:
+                return
+            self.add_follower(connection)
+    
+    def __send_loop(self):
+        while True:
+            item = self.__queue.get()
+            batch = []
+            while True:
+                if item is _STOP:
+                    self.__send(batch)
+                    return
+                if item[0] is _JOIN:
+                    # Everything queued so far goes to the existing followers only
+                    self.__send(batch)
+                    batch = []
+                    self.__join(item[1])
+                elif item[0] is _FLUSH:
+                    self.__send(batch)
+                    batch = []
+                    item[1].set()
+                else:
+                    batch.append(item)
+                try:
+                    item = self.__queue.get_nowait()
+                except queue.Empty:
+                    break
+            self.__send(batch)
+    
+    def __join(self, connection):
+        # Counted as a follower before it can see its snapshot arrive
+        self.__followers.append(connection)
+        center = self.__center
+        catalog = center.species_catalog
+        species = None if catalog is CATALOG else [catalog.get(name) for name in catalog.names()]
+        try:
+            data = serialization.dumps(center)
+            connection.send_bytes(pickle.dumps(("snapshot", self.__sequence, (data, species)),
+                                               pickle.HIGHEST_PROTOCOL))
+        except Exception as error:
+            # The follower went away, or the center cannot be copied; drop only this follower
+            self.__last_error = error
+            self.__followers.remove(connection)
+            connection.close()
+    
+    def __send(self, batch):
+        if not batch:
+            return
+        self.__sequence += 1
+        self.__operations_sent += len(batch)
+        if not self.__followers:
+            return
+        data = pickle.dumps(("ops", self.__sequence, batch), pickle.HIGHEST_PROTOCOL)
+        for connection in list(self.__followers):
+            try:
+                connection.send_bytes(data)
+            except (OSError, ValueError) as error:
+                # The follower went away
+                self.__last_error = error
+                self.__followers.remove(connection)
+                connection.close()
+
+
+class ReplicaFollower:
+    """Read-only replica of a primary's center, kept current from its stream."""
+    
+    def __init__(self, connection):
+        """
+        Initialize a ReplicaFollower.
+        
+        Args:
+            connection: Connection the primary streams to (see connect())
+        """
+        self.__connection = connection
+        self.__center = None
+        self.__ready = threading.Event()
+        self.__closed = False
+        self.__thread = None
+        self.__sequence = 0
+        self.__applied = 0
+        self.__total_lag = 0.0
+        self.__max_lag = 0.0
+        self.__last_lag = 0.0
+    
+    @classmethod
+    def connect(cls, address):
+        """Connect to a primary listening on a Unix socket."""
+        return cls(Client(address, family="AF_UNIX"))
+    
+    @property
+    def center(self): return self.__center
+    
+    @property
+    def sequence(self): return self.__sequence
+    
+    @property
+    def closed(self): return self.__closed
+    
+    def snapshot(self):
+        """Return a consistent read-only view of the replica."""
+        if self.__center is None:
+            raise ValueError("Replica has not received the primary's state yet")
+        return self.__center.snapshot()
+    
+    def start(self):
+        """Apply the stream in a background thread; returns once the initial copy is loaded."""
+        self.__thread = threading.Thread(target=self.__apply_loop, name="replica-apply", daemon=True)
+        self.__thread.start()
+        self.__ready.wait()
+        return self
+    
+    def sync(self, timeout=0.0):
+        """
+        Apply the messages that have arrived, in the calling thread.
+        
+        Args:
+            timeout: Seconds to wait for the first message
+        
+        Returns:
+            int: Number of messages applied
+        """
+        applied = 0
+        while not self.__closed and self.__connection.poll(timeout if not applied else 0):
+            if not self.__receive():
+                break
+            applied += 1
+        return applied
+    
+    def wait_for(self, sequence, timeout=None):
+        """Wait until the primary's batch `sequence` is applied. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.__sequence < sequence and not self.__closed:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            if self.__thread is None:
+                self.sync(0.01)
+            else:
+                time.sleep(0.001)
+        return self.__sequence >= sequence
+    
+    def stats(self):
+        """Return the applied operation count and replication lag figures as a dict."""
+        return {
+            "sequence": self.__sequence,
+            "operations_applied": self.__applied,
+            "mean_lag_seconds": self.__total_lag / self.__applied if self.__applied else 0.0,
+            "max_lag_seconds": self.__max_lag,
+            "last_lag_seconds": self.__last_lag,
+        }
+    
+    def close(self):
+        """Stop following and close the connection."""
+        self.__closed = True
+        self.__connection.close()
+        self.__ready.set()
+    
+    def __apply_loop(self):
+        while not self.__closed and self.__receive():
+            pass
+    
+    def __receive(self):
+        try:
+            kind, sequence, payload = pickle.loads(self.__connection.recv_bytes())
+        except (EOFError, OSError):
+            # The primary closed the stream
+            self.__closed = True
+            self.__ready.set()
+            return False
+        
+        if kind == "snapshot":
+            data, species = payload
+            catalog = None if species is None else SpeciesCatalog(species)
+            self.__center = serialization.loads(data, species_catalog=catalog)
+            self.__ready.set()
+        else:
+            self.__apply(payload)
+        self.__sequence = sequence
+        return True
+    
+    def __apply(self, operations):
+        center = self.__center
+        for operation in operations:
+            kind = operation[0]
+            if kind == "S":
+                center.assign_animal_to_enclosure(operation[1], operation[2])
+            elif kind == "A":
+                center.add_animal(Animal.from_record(operation[1]))
+            elif kind == "D":
+                center.discharge_animal(operation[1], operation[2], operation[3])
+            else:
+                center.add_enclosure(Enclosure(operation[1], operation[2], operation[3]))
+        now = time.time()
+        for operation in operations:
+            lag = now - operation[-1]
+            self.__total_lag += lag
+            if lag > self.__max_lag:
+                self.__max_lag = lag
+        self.__last_lag = now - operations[-1][-1]
+        self.__applied += len(operations)
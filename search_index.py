@@ -0,0 +1,181 @@
+"""
+Text search over animal species and condition for the Wildlife
+Rehabilitation Management System.
+
+AnimalTextIndex keeps an inverted index from lower-cased tokens to animal
+IDs plus a character trie over the distinct tokens. Prefix queries walk
+the trie to the prefix node, fuzzy queries walk it with a Levenshtein row
+so only branches within the edit budget are explored, and multi-term
+queries intersect posting sets smallest first. Attach an index to a
+center with RehabilitationCenter.attach_index() to keep it current.
+"""
+
+import re
+import sys
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Split text into lower-case alphanumeric tokens."""
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+class AnimalTextIndex:
+    """Inverted index and prefix trie over animal species and condition."""
+    
+    def __init__(self, fields=("species", "condition")):
+        """
+        Initialize an empty index.
+        
+        Args:
+            fields: Animal properties whose text is indexed
+        """
+        if not fields:
+            raise ValueError("At least one field must be indexed")
+        
+        self.__fields = tuple(fields)
+        self.__postings = {}
+        self.__documents = {}
+        self.__trie = {}
+    
+    @property
+    def fields(self): return self.__fields
+    
+    @property
+    def document_count(self): return len(self.__documents)
+    
+    @property
+    def token_count(self): return len(self.__postings)
+    
+    def __contains__(self, animal_id):
+        return animal_id in self.__documents
+    
+    def add_animal(self, animal):
+        """Index (or re-index) an animal's text fields."""
+        self.add(animal.animal_id, *(getattr(animal, field) for field in self.__fields))
+    
+    def add(self, animal_id, *texts):
+        """Index raw text for an animal ID, replacing what was indexed for it before."""
+        if animal_id in self.__documents:
+            self.remove(animal_id)
+        
+        tokens = []
+        for text in texts:
+            for token in tokenize(text):
+                # Keep one shared copy of each token string
+                token = sys.intern(token)
+                postings = self.__postings.get(token)
+                if postings is None:
+                    postings = self.__postings[token] = set()
+                    self.__insert_token(token)
+                postings.add(animal_id)
+                tokens.append(token)
+        self.__documents[animal_id] = tuple(set(tokens))
+    
+    def remove(self, animal_id):
+        """Drop an animal from the index. Returns False if it was not indexed."""
+        tokens = self.__documents.pop(animal_id, None)
+        if tokens is None:
+            return False
+        
+        for token in tokens:
+            postings = self.__postings[token]
+            postings.discard(animal_id)
+            if not postings:
+                del self.__postings[token]
+                self.__delete_token(token)
+        return True
+    
+    def search(self, query, prefix=True, max_edits=0):
+        """
+        Return the set of animal IDs matching every term in `query`.
+        
+        Args:
+            query: Free text, e.g. "owl wing"
+            prefix: Treat each term as a prefix ("ow" matches "owl")
+            max_edits: Allow this many typos per term (whole-token matching)
+        """
+        terms = tokenize(query)
+        if not terms:
+            return set()
+        
+        matches = []
+        for term in terms:
+            tokens = self.matching_tokens(term, prefix, max_edits)
+            if not tokens:
+                return set()
+            if len(tokens) == 1:
+                matches.append(self.__postings[tokens[0]])
+            else:
+                matches.append(set().union(*(self.__postings[token] for token in tokens)))
+        
+        matches.sort(key=len)
+        result = set(matches[0])
+        for postings in matches[1:]:
+            result.intersection_update(postings)
+            if not result:
+                break
+        return result
+    
+    def matching_tokens(self, term, prefix=True, max_edits=0):
+        """Return the indexed tokens a single query term matches."""
+        if max_edits:
+            found = self.__fuzzy_tokens(term, max_edits)
+            if prefix:
+                found.update(self.__prefix_tokens(term))
+            return list(found)
+        if prefix:
+            return self.__prefix_tokens(term)
+        return [term] if term in self.__postings else []
+    
+    def __insert_token(self, token):
+        node = self.__trie
+        for char in token:
+            node = node.setdefault(char, {})
+        node[None] = token
+    
+    def __delete_token(self, token):
+        path = [self.__trie]
+        for char in token:
+            path.append(path[-1][char])
+        del path[-1][None]
+        # Prune branches that no longer lead to any token
+        for depth in range(len(token), 0, -1):
+            if path[depth]:
+                break
+            del path[depth - 1][token[depth - 1]]
+    
+    def __prefix_tokens(self, prefix):
+        node = self.__trie
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        found = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for key, child in node.items():
+                if key is None:
+                    found.append(child)
+                else:
+                    stack.append(child)
+        return found
+    
+    def __fuzzy_tokens(self, term, max_edits):
+        # Depth-first walk carrying one Levenshtein DP row per trie level
+        found = set()
+        first_row = list(range(len(term) + 1))
+        stack = [(child, char, first_row) for char, child in self.__trie.items() if char is not None]
+        while stack:
+            node, char, previous = stack.pop()
+            row = [previous[0] + 1]
+            for column in range(1, len(term) + 1):
+                cost = 0 if term[column - 1] == char else 1
+                row.append(min(row[column - 1] + 1, previous[column] + 1, previous[column - 1] + cost))
+            if row[-1] <= max_edits and None in node:
+                found.add(node[None])
+            if min(row) <= max_edits:
+                stack.extend((child, key, row) for key, child in node.items() if key is not None)
+        return found
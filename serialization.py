@@ -0,0 +1,221 @@
+"""
+Compact binary serialization for the Wildlife Rehabilitation Management System.
+
+Animals, enclosures and whole centers are encoded column by column: every
+distinct string is stored once in a string table and records refer to it
+by index, with each column written as a packed array of unsigned ints.
+Species, conditions, dates and statuses repeat heavily across a center,
+so the encoding is much smaller than JSON or pickle and decodes without
+per-field parsing.
+
+Layout (all integers little-endian):
+    magic b"WRMS", version (1 byte), kind (1 byte: A, E or C)
+    string table: count, code-point lengths[count], UTF-8 text length, UTF-8 text
+    center: name index, location index
+    animals: count, then 7 columns of string indices (see Animal.to_record)
+    enclosures: count, id indices, type indices, capacities, member counts,
+                member animal_id indices
+
+Every field other than capacity must be a string or None; dumps() raises
+ValueError naming the field otherwise (e.g. a datetime.date intake date).
+Centers whose animals are held in an AnimalCache cannot be snapshotted
+and so cannot be encoded; dumps() raises TypeError for them.
+"""
+
+import struct
+import sys
+from array import array
+from itertools import accumulate, islice
+
+from wildlife_rehabilitation_management_system import Animal, Enclosure, RehabilitationCenter
+
+MAGIC = b"WRMS"
+VERSION = 1
+NONE_INDEX = 0xFFFFFFFF
+_HEADER = struct.Struct("<4sBc")
+_COUNT = struct.Struct("<I")
+
+# Field names of Animal.to_record(), for error messages
+_ANIMAL_FIELDS = ("animal_id", "species", "condition", "intake_date", "discharge_date",
+                  "assigned_enclosure", "status")
+
+
+def _uint_array(values=()):
+    column = array("I", values)
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column
+
+
+class _Writer:
+    """Accumulates the string table and columns for one encoding."""
+    
+    def __init__(self):
+        # None is pre-seeded so it maps to NONE_INDEX and never enters the table
+        self.strings = {None: NONE_INDEX}
+        self.parts = []
+    
+    def indexes(self, values, field):
+        strings = self.strings
+        setdefault = strings.setdefault
+        start = len(strings)
+        try:
+            result = [setdefault(value, len(strings) - 1) for value in values]
+        except TypeError:
+            raise ValueError(f"Cannot serialize {field}: expected a string") from None
+        # Only values new to the table need their type checked
+        for value in islice(strings, start, None) if len(strings) > start else ():
+            if not isinstance(value, str):
+                raise ValueError(f"Cannot serialize {field} {value!r}: expected a string, "
+                                 f"got {type(value).__name__}")
+        return result
+    
+    def count(self, value):
+        self.parts.append(_COUNT.pack(value))
+    
+    def column(self, values):
+        self.parts.append(_uint_array(values).tobytes())
+    
+    def finish(self, kind):
+        table = list(self.strings)[1:]
+        text = "".join(table).encode("utf-8")
+        header = [_HEADER.pack(MAGIC, VERSION, kind), _COUNT.pack(len(table)),
+                  _uint_array(map(len, table)).tobytes(), _COUNT.pack(len(text)), text]
+        return b"".join(header + self.parts)
+
+
+class _Reader:
+    """Reads counts and columns back out of a buffer without copying it."""
+    
+    def __init__(self, data):
+        self.view = memoryview(data).cast("B")
+        self.offset = 0
+    
+    def count(self):
+        value = _COUNT.unpack_from(self.view, self.offset)[0]
+        self.offset += 4
+        return value
+    
+    def column(self, length):
+        end = self.offset + 4 * length
+        values = array("I")
+        values.frombytes(self.view[self.offset:end])
+        if sys.byteorder != "little":
+            values.byteswap()
+        self.offset = end
+        return values
+    
+    def text(self, length):
+        end = self.offset + length
+        value = str(self.view[self.offset:end], "utf-8")
+        self.offset = end
+        return value
+
+
+def _encode(kind, center_fields, animal_records, enclosure_rows):
+    writer = _Writer()
+    writer.column(writer.indexes(center_fields, "center name or location"))
+    
+    writer.count(len(animal_records))
+    columns = zip(*animal_records) if animal_records else [()] * 7
+    for field, column in zip(_ANIMAL_FIELDS, columns):
+        writer.column(writer.indexes(column, field))
+    
+    writer.count(len(enclosure_rows))
+    ids, types, capacities, members = zip(*enclosure_rows) if enclosure_rows else [()] * 4
+    writer.column(writer.indexes(ids, "enclosure_id"))
+    writer.column(writer.indexes(types, "enclosure_type"))
+    writer.column(capacities)
+    writer.column(map(len, members))
+    writer.column(writer.indexes((animal_id for group in members for animal_id in group), "member animal_id"))
+    return writer.finish(kind)
+
+
+def decode_records(data):
+    """Decode to (kind, center fields, animal records, enclosure records) without building objects."""
+    reader = _Reader(data)
+    magic, version, kind = _HEADER.unpack_from(reader.view, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Data is not in the wildlife binary format")
+    reader.offset = _HEADER.size
+    
+    string_count = reader.count()
+    lengths = reader.column(string_count)
+    text = reader.text(reader.count())
+    bounds = list(accumulate(lengths, initial=0))
+    strings = [text[bounds[i]:bounds[i + 1]] for i in range(string_count)]
+    lookup = lambda index: None if index == NONE_INDEX else strings[index]
+    
+    center_fields = [lookup(index) for index in reader.column(2)]
+    
+    animal_count = reader.count()
+    columns = [[lookup(index) for index in reader.column(animal_count)] for _ in range(7)]
+    animal_records = list(zip(*columns))
+    
+    enclosure_count = reader.count()
+    ids = [lookup(index) for index in reader.column(enclosure_count)]
+    types = [lookup(index) for index in reader.column(enclosure_count)]
+    capacities = reader.column(enclosure_count)
+    member_counts = reader.column(enclosure_count)
+    members = [lookup(index) for index in reader.column(sum(member_counts))]
+    enclosure_rows = []
+    start = 0
+    for i in range(enclosure_count):
+        enclosure_rows.append((ids[i], types[i], capacities[i], members[start:start + member_counts[i]]))
+        start += member_counts[i]
+    return kind, center_fields, animal_records, enclosure_rows
+
+
+def dumps(obj):
+    """
+    Encode an Animal, Enclosure or RehabilitationCenter to bytes.
+    
+    Raises:
+        ValueError: If a field that must be a string is not
+        TypeError: For other objects, and for centers backed by an AnimalCache
+    """
+    if isinstance(obj, Animal):
+        return _encode(b"A", (None, None), [obj.to_record()], [])
+    if isinstance(obj, Enclosure):
+        return _encode(b"E", (None, None), [], [obj.to_record()])
+    if isinstance(obj, RehabilitationCenter):
+        try:
+            snapshot = obj.snapshot()
+        except TypeError:
+            raise TypeError("Cannot serialize a center whose animals are held in an AnimalCache; "
+                            "the cache's AnimalStore already holds them") from None
+        animal_records = []
+        for animal_id in snapshot.animal_ids():
+            animal = snapshot.get_animal(animal_id)
+            status, assigned_enclosure, discharge_date = snapshot.animal_state(animal_id)
+            animal_records.append((animal_id, animal.species, animal.condition, animal.intake_date,
+                                   discharge_date, assigned_enclosure, status))
+        enclosure_rows = []
+        for enclosure_id in snapshot.enclosure_ids():
+            enclosure = snapshot.get_enclosure(enclosure_id)
+            enclosure_rows.append((enclosure_id, enclosure.enclosure_type, enclosure.capacity,
+                                   snapshot.members(enclosure_id)))
+        return _encode(b"C", (obj.name, obj.location), animal_records, enclosure_rows)
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+
+def loads(data, species_catalog=None):
+    """
+    Decode bytes (or any buffer) produced by dumps().
+    
+    Args:
+        data: Encoded Animal, Enclosure or RehabilitationCenter
+        species_catalog: Species catalog for a decoded center (default: species.CATALOG)
+    """
+    kind, center_fields, animal_records, enclosure_rows = decode_records(data)
+    if kind == b"A":
+        return Animal.from_record(animal_records[0])
+    if kind == b"E":
+        return Enclosure.from_record(enclosure_rows[0])
+    
+    center = RehabilitationCenter(*center_fields, species_catalog=species_catalog)
+    for row in enclosure_rows:
+        center.add_enclosure(Enclosure.from_record(row))
+    for record in animal_records:
+        center.add_animal(Animal.from_record(record))
+    return center
@@ -0,0 +1,174 @@
+"""
+Monte Carlo occupancy simulation for capacity planning.
+
+OccupancySimulator clones a center's enclosure capacities and current
+residents into plain per-type counters, then replays a projected intake
+season many times: arrivals per species follow a Poisson process, lengths
+of stay a gamma distribution, and an arrival that finds every enclosure of
+its type full is counted as overflow. Each enclosure type is an independent
+discrete-event queue, so a replica is a merge of two sorted streams
+(arrivals and a heap of discharge times) per type. Replicas are split into
+chunks that run in parallel worker processes.
+"""
+
+import heapq
+import math
+import os
+import random
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+SpeciesProfile = namedtuple("SpeciesProfile", "species enclosure_type daily_intake mean_stay_days stay_shape")
+SpeciesProfile.__new__.__defaults__ = (2.0,)
+
+# Replicas per work unit; fixed so a seed gives the same result for any process count
+CHUNK_REPLICAS = 64
+
+TypeOutcome = namedtuple("TypeOutcome", "capacity overflow_probability mean_overflow mean_peak p95_peak")
+
+
+def _simulate_type(rng, capacity, residents, profiles, days):
+    """Run one replica for one enclosure type; return (overflow count, peak occupancy)."""
+    # Discharge times of the current residents, drawn from their profile
+    departures = [rng.gammavariate(shape, mean / shape) for mean, shape in residents]
+    heapq.heapify(departures)
+    
+    # Poisson arrivals per species, merged into one time-ordered stream
+    arrivals = []
+    for daily_intake, mean, shape in profiles:
+        if daily_intake <= 0:
+            continue
+        time = rng.expovariate(daily_intake)
+        while time < days:
+            arrivals.append((time, mean, shape))
+            time += rng.expovariate(daily_intake)
+    arrivals.sort()
+    
+    occupied = len(departures)
+    peak = occupied
+    overflow = max(0, occupied - capacity)
+    for time, mean, shape in arrivals:
+        while departures and departures[0] <= time:
+            heapq.heappop(departures)
+            occupied -= 1
+        if occupied >= capacity:
+            overflow += 1
+            continue
+        heapq.heappush(departures, time + rng.gammavariate(shape, mean / shape))
+        occupied += 1
+        if occupied > peak:
+            peak = occupied
+    return overflow, peak
+
+
+def _run_chunk(plan, days, replicas, seed):
+    """Worker entry point: run `replicas` replicas of every type in `plan`."""
+    rng = random.Random(seed)
+    results = {enclosure_type: [] for enclosure_type in plan}
+    for _ in range(replicas):
+        for enclosure_type, (capacity, residents, profiles) in plan.items():
+            results[enclosure_type].append(_simulate_type(rng, capacity, residents, profiles, days))
+    return results
+
+
+class OccupancySimulator:
+    """Projects enclosure overflow risk for a center under a stochastic intake season."""
+    
+    def __init__(self, center, profiles, days):
+        """
+        Initialize an OccupancySimulator from the center's current state.
+        
+        Args:
+            center: RehabilitationCenter whose enclosures and residents are cloned
+            profiles: Iterable of SpeciesProfile (daily intake rate, mean stay in days)
+            days: Length of the simulated season in days
+        """
+        # Validate parameters
+        if not isinstance(days, (int, float)) or days <= 0:
+            raise ValueError("Days must be a positive number")
+        
+        profiles = list(profiles)
+        if not profiles:
+            raise ValueError("At least one species profile is required")
+        for profile in profiles:
+            if profile.daily_intake < 0 or profile.mean_stay_days <= 0 or profile.stay_shape <= 0:
+                raise ValueError(f"Invalid rates in profile for {profile.species}")
+        
+        self.__days = days
+        self.__plan = self.__build_plan(center.snapshot(), profiles)
+    
+    @property
+    def days(self): return self.__days
+    
+    @property
+    def enclosure_types(self): return list(self.__plan)
+    
+    @staticmethod
+    def __build_plan(snapshot, profiles):
+        # Collapse the center into {enclosure_type: (capacity, resident stays, arrival profiles)}
+        by_species = {profile.species: profile for profile in profiles}
+        by_type = {}
+        for profile in profiles:
+            by_type.setdefault(profile.enclosure_type, []).append(profile)
+        
+        capacities = {}
+        residents = {}
+        for enclosure_id in snapshot.enclosure_ids():
+            enclosure = snapshot.get_enclosure(enclosure_id)
+            enclosure_type = enclosure.enclosure_type
+            capacities[enclosure_type] = capacities.get(enclosure_type, 0) + enclosure.capacity
+            stays = residents.setdefault(enclosure_type, [])
+            for animal_id in snapshot.members(enclosure_id):
+                profile = by_species.get(snapshot.get_animal(animal_id).species)
+                if profile is None and enclosure_type in by_type:
+                    # Unknown species stay as long as the type's longest-staying profile
+                    profile = max(by_type[enclosure_type], key=lambda p: p.mean_stay_days)
+                stays.append((profile.mean_stay_days, profile.stay_shape) if profile else (math.inf, 1.0))
+        
+        # Types with intake but no enclosures get capacity 0: every arrival overflows
+        return {enclosure_type: (capacities.get(enclosure_type, 0),
+                                 tuple(residents.get(enclosure_type, ())),
+                                 tuple((p.daily_intake, p.mean_stay_days, p.stay_shape)
+                                       for p in by_type.get(enclosure_type, ())))
+                for enclosure_type in dict.fromkeys([*capacities, *by_type])}
+    
+    def run(self, replicas=1000, processes=None, seed=None):
+        """
+        Run Monte Carlo replicas and summarize overflow risk per enclosure type.
+        
+        Args:
+            replicas: Number of simulated seasons
+            processes: Worker processes (default: CPU count; 1 runs in this process)
+            seed: Base seed for reproducible results
+        
+        Returns:
+            dict: {enclosure_type: TypeOutcome}
+        """
+        if not isinstance(replicas, int) or replicas <= 0:
+            raise ValueError("Replicas must be a positive integer")
+        
+        base_seed = seed if seed is not None else random.SystemRandom().getrandbits(64)
+        sizes = [min(CHUNK_REPLICAS, replicas - start) for start in range(0, replicas, CHUNK_REPLICAS)]
+        seeds = [base_seed * 1_000_003 + i for i in range(len(sizes))]
+        processes = min(processes or os.cpu_count() or 1, len(sizes))
+        
+        if processes == 1:
+            chunks = [_run_chunk(self.__plan, self.__days, size, chunk_seed)
+                      for size, chunk_seed in zip(sizes, seeds)]
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                chunks = list(pool.map(_run_chunk, [self.__plan] * len(sizes), [self.__days] * len(sizes),
+                                       sizes, seeds, chunksize=max(1, len(sizes) // (4 * processes))))
+        
+        summary = {}
+        for enclosure_type, (capacity, _, _) in self.__plan.items():
+            outcomes = [outcome for chunk in chunks for outcome in chunk[enclosure_type]]
+            peaks = sorted(peak for _, peak in outcomes)
+            summary[enclosure_type] = TypeOutcome(
+                capacity=capacity,
+                overflow_probability=sum(1 for overflow, _ in outcomes if overflow) / replicas,
+                mean_overflow=sum(overflow for overflow, _ in outcomes) / replicas,
+                mean_peak=sum(peaks) / replicas,
+                p95_peak=peaks[min(replicas - 1, math.ceil(0.95 * replicas) - 1)],
+            )
+        return summary
@@ -0,0 +1,95 @@
+"""
+Point-in-time snapshots of a RehabilitationCenter.
+
+A CenterSnapshot shares the center's animal and enclosure dicts instead of
+copying them; the center copies a dict only on the first insert into it
+after a snapshot is taken, an O(n) cost paid once per snapshot (see
+bench_snapshots). Animal state and enclosure membership changed after
+the snapshot are preserved in the snapshot just before the center
+overwrites them, so readers see a consistent view while writers continue.
+"""
+
+import datetime
+
+
+class CenterSnapshot:
+    """Read-only view of a center as of the moment snapshot() was called."""
+    
+    def __init__(self, animals, enclosures):
+        """
+        Initialize a CenterSnapshot.
+        
+        Args:
+            animals: The center's animal dict, which the center will no longer mutate
+            enclosures: The center's enclosure dict, which the center will no longer mutate
+        """
+        self.__animals = animals
+        self.__enclosures = enclosures
+        self.__animal_states = {}
+        self.__members = {}
+        self.__taken_at = datetime.datetime.now()
+    
+    @property
+    def taken_at(self): return self.__taken_at
+    
+    @property
+    def animal_count(self): return len(self.__animals)
+    
+    @property
+    def enclosure_count(self): return len(self.__enclosures)
+    
+    def animal_ids(self):
+        """Return an iterator over the animal IDs in the snapshot."""
+        return iter(self.__animals)
+    
+    def enclosure_ids(self):
+        """Return an iterator over the enclosure IDs in the snapshot."""
+        return iter(self.__enclosures)
+    
+    def get_animal(self, animal_id):
+        """Get the Animal object by ID (its mutable state may be newer; see animal_state)."""
+        return self.__animals.get(animal_id)
+    
+    def get_enclosure(self, enclosure_id):
+        """Get the Enclosure object by ID (its membership may be newer; see members)."""
+        return self.__enclosures.get(enclosure_id)
+    
+    def animal_state(self, animal_id):
+        """Return (status, assigned_enclosure, discharge_date) as of the snapshot, or None."""
+        animal = self.__animals.get(animal_id)
+        if animal is None:
+            return None
+        # Read the live object first: if a writer preserves the old state in
+        # between, the preserved copy below takes precedence.
+        state = (animal.status, animal.assigned_enclosure, animal.discharge_date)
+        return self.__animal_states.get(animal_id, state)
+    
+    def members(self, enclosure_id):
+        """Return the animal IDs in an enclosure as of the snapshot."""
+        enclosure = self.__enclosures.get(enclosure_id)
+        if enclosure is None:
+            return ()
+        members = tuple(enclosure.animals)
+        return self.__members.get(enclosure_id, members)
+    
+    def occupancy(self):
+        """Return {enclosure_id: (occupied, capacity)} as of the snapshot."""
+        return {enclosure_id: (len(self.members(enclosure_id)), enclosure.capacity)
+                for enclosure_id, enclosure in self.__enclosures.items()}
+    
+    def animal_lines(self):
+        """Yield display lines for every animal using snapshot state."""
+        for animal_id, animal in self.__animals.items():
+            status = self.animal_state(animal_id)[0]
+            yield f"{animal_id} | {animal.species} | {animal.condition} | Status: {status}"
+    
+    # Called by the center just before it overwrites state the snapshot can see
+    def _preserve_animal(self, animal):
+        animal_id = animal.animal_id
+        if animal_id not in self.__animal_states and self.__animals.get(animal_id) is animal:
+            self.__animal_states[animal_id] = (animal.status, animal.assigned_enclosure, animal.discharge_date)
+    
+    def _preserve_members(self, enclosure):
+        enclosure_id = enclosure.enclosure_id
+        if enclosure_id not in self.__members and self.__enclosures.get(enclosure_id) is enclosure:
+            self.__members[enclosure_id] = tuple(enclosure.animals)
@@ -0,0 +1,109 @@
+"""
+Species catalog for the Wildlife Rehabilitation Management System.
+
+A SpeciesCatalog holds one immutable SpeciesRecord per species (taxonomy,
+compatible enclosure types, typical length of stay), shared by every
+animal of that species instead of being repeated per animal. Animals
+intern their species name, and the catalog keeps a precomputed
+{species: frozenset of enclosure types} map, so checking whether an
+animal may go into an enclosure is two dict/set lookups. Species missing
+from the catalog are unconstrained and may go into any enclosure.
+
+CATALOG is the default catalog used by RehabilitationCenter; it is seeded
+with the species the center sees most often.
+"""
+
+import threading
+from collections import namedtuple
+
+from identifiers import intern_id
+
+SpeciesRecord = namedtuple("SpeciesRecord", "name taxon_class family enclosure_types typical_stay_days")
+
+DEFAULT_SPECIES = (
+    SpeciesRecord("Red Fox", "Mammalia", "Canidae", ("Mammal Habitat", "Recovery Area"), 30),
+    SpeciesRecord("Raccoon", "Mammalia", "Procyonidae", ("Mammal Habitat", "Recovery Area"), 30),
+    SpeciesRecord("Barn Owl", "Aves", "Tytonidae", ("Aviary", "Recovery Area"), 45),
+    SpeciesRecord("Snowy Owl", "Aves", "Strigidae", ("Aviary", "Recovery Area"), 45),
+    SpeciesRecord("Great Horned Owl", "Aves", "Strigidae", ("Aviary", "Recovery Area"), 45),
+    SpeciesRecord("Bald Eagle", "Aves", "Accipitridae", ("Aviary", "Recovery Area"), 60),
+    SpeciesRecord("Red-winged Blackbird", "Aves", "Icteridae", ("Aviary", "Recovery Area"), 21),
+    SpeciesRecord("Box Turtle", "Reptilia", "Emydidae", ("Reptile Habitat", "Recovery Area"), 90),
+)
+
+
+class SpeciesCatalog:
+    """Shared species records and their compatible enclosure types."""
+    
+    def __init__(self, records=()):
+        """
+        Initialize a SpeciesCatalog.
+        
+        Args:
+            records: SpeciesRecords (or equivalent tuples) to register
+        """
+        self.__records = {}
+        self.__enclosure_types = {}
+        self.__lock = threading.Lock()
+        for record in records:
+            self.register(*record)
+    
+    def __len__(self):
+        return len(self.__records)
+    
+    def __contains__(self, species):
+        return species in self.__records
+    
+    def __reduce__(self):
+        # The lock is process-local; the records are enough to rebuild the catalog
+        return (SpeciesCatalog, (tuple(self.__records.values()),))
+    
+    def register(self, name, taxon_class=None, family=None, enclosure_types=None, typical_stay_days=None):
+        """
+        Add or replace a species; returns its SpeciesRecord.
+        
+        Args:
+            name: Species name as used in Animal.species
+            taxon_class: Taxonomic class, e.g. "Aves"
+            family: Taxonomic family, e.g. "Strigidae"
+            enclosure_types: Enclosure types the species may be housed in
+                (None: any type)
+            typical_stay_days: Typical length of stay in days
+        """
+        # Validate parameters
+        if not isinstance(name, str) or not name:
+            raise ValueError("Species name must be a non-empty string")
+        if typical_stay_days is not None and (not isinstance(typical_stay_days, (int, float))
+                                              or typical_stay_days <= 0):
+            raise ValueError("Typical stay must be a positive number of days")
+        
+        name = intern_id(name)
+        types = None if enclosure_types is None else frozenset(map(intern_id, enclosure_types))
+        record = SpeciesRecord(name, taxon_class, family, types, typical_stay_days)
+        with self.__lock:
+            self.__records[name] = record
+            if types is None:
+                self.__enclosure_types.pop(name, None)
+            else:
+                self.__enclosure_types[name] = types
+        return record
+    
+    def get(self, species):
+        """Return the SpeciesRecord for a species, or None if it is not cataloged."""
+        return self.__records.get(species)
+    
+    def names(self):
+        """Return the cataloged species names."""
+        return list(self.__records)
+    
+    def compatible_types(self, species):
+        """Return the frozenset of enclosure types for a species, or None if any type will do."""
+        return self.__enclosure_types.get(species)
+    
+    def is_compatible(self, species, enclosure_type):
+        """Check whether a species may be housed in an enclosure type."""
+        types = self.__enclosure_types.get(species)
+        return types is None or enclosure_type in types
+
+
+CATALOG = SpeciesCatalog(DEFAULT_SPECIES)
@@ -0,0 +1,274 @@
+"""
+Enclosure sensor telemetry for the Wildlife Rehabilitation Management System.
+
+Each (enclosure, metric) pair, e.g. ("E001", "temperature"), gets a
+SensorSeries: a fixed-size ring of the latest raw readings plus rollup
+rings at 1 minute, 1 hour and 1 day resolution. Every ring is a set of
+array.array columns allocated once, so memory does not grow with the
+ingest rate and old data is overwritten in place.
+
+Rollups are kept incrementally. A batch of readings is folded into
+per-minute partial aggregates (count, sum, min, max) in one pass, and each
+partial is then merged into every rollup, so the coarser rings are updated
+once per minute of data rather than once per reading. A rollup slot
+remembers which bucket it holds, so late readings still land in the right
+bucket as long as it has not been overwritten.
+
+Window queries are answered from the rollups alone: the window is cut
+into the fewest whole day, hour and minute buckets that cover it, so a
+one-month query touches about 30 day buckets instead of millions of raw
+readings. Window edges are widened to whole minutes.
+"""
+
+import math
+from array import array
+from collections import namedtuple
+
+WindowStats = namedtuple("WindowStats", "count mean minimum maximum")
+
+# (resolution in seconds, slots kept), finest first
+DEFAULT_ROLLUPS = ((60, 1440), (3600, 24 * 30), (86400, 365))
+DEFAULT_RAW_CAPACITY = 1024
+
+
+class Rollup:
+    """Ring of fixed-width time buckets holding count, sum, min and max."""
+    
+    def __init__(self, resolution, slots):
+        """
+        Initialize a Rollup.
+        
+        Args:
+            resolution: Bucket width in seconds
+            slots: Number of most recent buckets kept
+        """
+        # Validate parameters
+        if not isinstance(resolution, int) or resolution <= 0:
+            raise ValueError("Resolution must be a positive integer number of seconds")
+        if not isinstance(slots, int) or slots <= 0:
+            raise ValueError("Slots must be a positive integer")
+        
+        self.__resolution = resolution
+        self.__slots = slots
+        self.__buckets = array("q", [-1]) * slots
+        self.__counts = array("q", [0]) * slots
+        self.__totals = array("d", [0.0]) * slots
+        self.__minimums = array("d", [0.0]) * slots
+        self.__maximums = array("d", [0.0]) * slots
+        self.__latest = -1
+    
+    @property
+    def resolution(self): return self.__resolution
+    
+    @property
+    def slots(self): return self.__slots
+    
+    def merge(self, timestamp, count, total, minimum, maximum):
+        """Fold a partial aggregate for the bucket containing `timestamp` into the ring."""
+        bucket = int(timestamp // self.__resolution)
+        if bucket <= self.__latest - self.__slots:
+            # Older than anything the ring still holds
+            return False
+        
+        slot = bucket % self.__slots
+        if self.__buckets[slot] != bucket:
+            self.__buckets[slot] = bucket
+            self.__counts[slot] = count
+            self.__totals[slot] = total
+            self.__minimums[slot] = minimum
+            self.__maximums[slot] = maximum
+        else:
+            self.__counts[slot] += count
+            self.__totals[slot] += total
+            if minimum < self.__minimums[slot]:
+                self.__minimums[slot] = minimum
+            if maximum > self.__maximums[slot]:
+                self.__maximums[slot] = maximum
+        if bucket > self.__latest:
+            self.__latest = bucket
+        return True
+    
+    def bucket(self, bucket):
+        """Return (count, total, minimum, maximum) for a bucket number, or None if it is not held."""
+        slot = bucket % self.__slots
+        if self.__buckets[slot] != bucket:
+            return None
+        return self.__counts[slot], self.__totals[slot], self.__minimums[slot], self.__maximums[slot]
+
+
+class SensorSeries:
+    """Raw reading ring plus multi-resolution rollups for one sensor metric."""
+    
+    def __init__(self, raw_capacity=DEFAULT_RAW_CAPACITY, rollups=DEFAULT_ROLLUPS):
+        """
+        Initialize a SensorSeries.
+        
+        Args:
+            raw_capacity: Number of latest raw readings kept
+            rollups: (resolution seconds, slots) pairs, finest first; each
+                resolution must be a multiple of the previous one and cover
+                at least as much time
+        """
+        # Validate parameters
+        if not isinstance(raw_capacity, int) or raw_capacity <= 0:
+            raise ValueError("Raw capacity must be a positive integer")
+        if not rollups:
+            raise ValueError("At least one rollup is required")
+        for (finer, finer_slots), (coarser, coarser_slots) in zip(rollups, rollups[1:]):
+            if coarser % finer:
+                raise ValueError("Each rollup resolution must be a multiple of the previous one")
+            if coarser * coarser_slots < finer * finer_slots:
+                raise ValueError("Each rollup must cover at least as much time as the previous one")
+        
+        self.__capacity = raw_capacity
+        self.__times = array("d", [0.0]) * raw_capacity
+        self.__values = array("d", [0.0]) * raw_capacity
+        self.__next = 0
+        self.__total_readings = 0
+        self.__rollups = [Rollup(resolution, slots) for resolution, slots in rollups]
+    
+    @property
+    def reading_count(self): return self.__total_readings
+    
+    @property
+    def rollups(self): return list(self.__rollups)
+    
+    def ingest(self, timestamps, values):
+        """
+        Add a batch of readings (epoch seconds, value); returns the number added.
+        
+        Readings in time order are cheapest: consecutive readings in the same
+        minute are aggregated before touching the rollups.
+        """
+        times, samples, capacity = self.__times, self.__values, self.__capacity
+        position = self.__next
+        width = self.__rollups[0].resolution
+        added = 0
+        current = None
+        count, total, minimum, maximum = 0, 0.0, math.inf, -math.inf
+        for timestamp, value in zip(timestamps, values):
+            times[position] = timestamp
+            samples[position] = value
+            position += 1
+            if position == capacity:
+                position = 0
+            added += 1
+            
+            bucket = timestamp // width
+            if bucket != current:
+                if count:
+                    self.__merge(current * width, count, total, minimum, maximum)
+                current = bucket
+                count, total, minimum, maximum = 0, 0.0, value, value
+            count += 1
+            total += value
+            if value < minimum:
+                minimum = value
+            elif value > maximum:
+                maximum = value
+        if count:
+            self.__merge(current * width, count, total, minimum, maximum)
+        
+        self.__next = position
+        self.__total_readings += added
+        return added
+    
+    def __merge(self, timestamp, count, total, minimum, maximum):
+        for rollup in self.__rollups:
+            rollup.merge(timestamp, count, total, minimum, maximum)
+    
+    def recent(self, count=None):
+        """Return up to `count` of the latest raw readings as (timestamp, value), oldest first."""
+        held = min(self.__total_readings, self.__capacity)
+        count = held if count is None else min(count, held)
+        start = (self.__next - count) % self.__capacity
+        return [(self.__times[(start + i) % self.__capacity], self.__values[(start + i) % self.__capacity])
+                for i in range(count)]
+    
+    def window(self, start, end):
+        """
+        Summarize the readings in [start, end) from the rollups.
+        
+        The window is widened to whole buckets of the finest rollup. Buckets
+        already overwritten at every resolution are missing from the result.
+        
+        Returns:
+            WindowStats: count, mean, minimum and maximum (None values if empty)
+        """
+        finest = self.__rollups[0].resolution
+        position = math.floor(start / finest) * finest
+        end = math.ceil(end / finest) * finest
+        
+        count, total, minimum, maximum = 0, 0.0, math.inf, -math.inf
+        while position < end:
+            # Take the coarsest bucket that starts here and fits in the window. Coarser
+            # rings reach further back, so if it is not held no finer ring holds its data
+            for rollup in reversed(self.__rollups):
+                resolution = rollup.resolution
+                if not position % resolution and position + resolution <= end:
+                    break
+            bucket = rollup.bucket(position // resolution)
+            if bucket is not None:
+                count += bucket[0]
+                total += bucket[1]
+                minimum = min(minimum, bucket[2])
+                maximum = max(maximum, bucket[3])
+            position += resolution
+        
+        if not count:
+            return WindowStats(0, None, None, None)
+        return WindowStats(count, total / count, minimum, maximum)
+
+
+class EnclosureTelemetry:
+    """Sensor series for a center's enclosures, keyed by (enclosure_id, metric)."""
+    
+    def __init__(self, center=None, raw_capacity=DEFAULT_RAW_CAPACITY, rollups=DEFAULT_ROLLUPS):
+        """
+        Initialize EnclosureTelemetry.
+        
+        Args:
+            center: Optional RehabilitationCenter; readings for enclosures it
+                does not have are rejected
+            raw_capacity: Raw readings kept per series
+            rollups: (resolution seconds, slots) pairs, finest first
+        """
+        self.__center = center
+        self.__raw_capacity = raw_capacity
+        self.__rollups = tuple(rollups)
+        self.__series = {}
+        # Validate the configuration once, before any series exists
+        SensorSeries(raw_capacity, self.__rollups)
+    
+    @property
+    def series_count(self): return len(self.__series)
+    
+    def series(self, enclosure_id, metric):
+        """Return the SensorSeries for an enclosure metric, or None if it has no readings."""
+        return self.__series.get((enclosure_id, metric))
+    
+    def ingest(self, enclosure_id, metric, timestamps, values):
+        """Add a batch of readings for one enclosure metric; returns the number added."""
+        series = self.__series.get((enclosure_id, metric))
+        if series is None:
+            if self.__center is not None and self.__center.get_enclosure(enclosure_id) is None:
+                return 0
+            series = self.__series[(enclosure_id, metric)] = SensorSeries(self.__raw_capacity, self.__rollups)
+        return series.ingest(timestamps, values)
+    
+    def ingest_batch(self, readings):
+        """Add (enclosure_id, metric, timestamp, value) readings in any mix; returns the number added."""
+        grouped = {}
+        for enclosure_id, metric, timestamp, value in readings:
+            columns = grouped.get((enclosure_id, metric))
+            if columns is None:
+                columns = grouped[(enclosure_id, metric)] = ([], [])
+            columns[0].append(timestamp)
+            columns[1].append(value)
+        return sum(self.ingest(enclosure_id, metric, timestamps, values)
+                   for (enclosure_id, metric), (timestamps, values) in grouped.items())
+    
+    def window(self, enclosure_id, metric, start, end):
+        """Summarize an enclosure metric over [start, end); None if the series does not exist."""
+        series = self.__series.get((enclosure_id, metric))
+        return series.window(start, end) if series else None
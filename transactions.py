@@ -0,0 +1,72 @@
+"""
+Transactional batches for the Wildlife Rehabilitation Management System.
+
+A Transaction buffers center mutations and hands them to the center when
+the `with` block exits. The center applies them under its write lock,
+rolls every one of them back if any fails, and runs event publication and
+treatment cancellation once for the whole batch after it commits.
+"""
+
+
+class TransactionError(Exception):
+    """Raised when a buffered operation fails and the transaction is rolled back."""
+
+
+class Transaction:
+    """Buffer of center operations applied atomically on exit."""
+    
+    def __init__(self, center):
+        """
+        Initialize a Transaction.
+        
+        Args:
+            center: RehabilitationCenter the operations will be applied to
+        """
+        self.__center = center
+        self.__operations = []
+        self.__state = "open"
+    
+    @property
+    def operation_count(self): return len(self.__operations)
+    
+    @property
+    def state(self): return self.__state
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            # Nothing has been applied yet, so discarding the buffer is the rollback
+            self.__operations.clear()
+            self.__state = "rolled back"
+            return False
+        
+        try:
+            self.__center._apply_operations(self.__operations)
+        except Exception:
+            self.__state = "rolled back"
+            raise
+        self.__state = "committed"
+        return False
+    
+    def add_animal(self, animal):
+        """Buffer RehabilitationCenter.add_animal."""
+        self.__buffer("add_animal", animal)
+    
+    def add_enclosure(self, enclosure):
+        """Buffer RehabilitationCenter.add_enclosure."""
+        self.__buffer("add_enclosure", enclosure)
+    
+    def assign_animal_to_enclosure(self, animal_id, enclosure_id):
+        """Buffer RehabilitationCenter.assign_animal_to_enclosure."""
+        self.__buffer("assign_animal_to_enclosure", animal_id, enclosure_id)
+    
+    def discharge_animal(self, animal_id, discharge_date, status):
+        """Buffer RehabilitationCenter.discharge_animal."""
+        self.__buffer("discharge_animal", animal_id, discharge_date, status)
+    
+    def __buffer(self, name, *args):
+        if self.__state != "open":
+            raise TransactionError("Transaction is no longer open")
+        self.__operations.append((name, args))
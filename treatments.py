@@ -0,0 +1,212 @@
+"""
+Treatment plan tracking for the Wildlife Rehabilitation Management System.
+
+Treatment records are slot-based so a center can hold many of them cheaply.
+TreatmentScheduler keeps every pending treatment in a single binary heap
+ordered by due time and answers "what is due in the next N minutes" by
+walking only the part of the heap that falls inside the window.
+"""
+
+import datetime
+import heapq
+
+
+class Treatment:
+    """A scheduled treatment (medication, dressing change, ...) for one animal."""
+    
+    __slots__ = ("__treatment_id", "__animal_id", "__kind", "__due", "__interval", "__seq", "__active")
+    
+    def __init__(self, treatment_id, animal_id, kind, due, interval_minutes=None):
+        """
+        Initialize a Treatment.
+        
+        Args:
+            treatment_id: Integer identifier issued by the scheduler
+            animal_id: ID of the animal being treated
+            kind: Description of the treatment (e.g. "Medication")
+            due: datetime when the treatment is first due
+            interval_minutes: Repeat interval in minutes, or None for a one-off
+        """
+        # Validate parameters
+        if not isinstance(kind, str) or not kind:
+            raise ValueError("Treatment kind must be a non-empty string")
+        if not isinstance(due, datetime.datetime):
+            raise ValueError("Treatment due time must be a datetime")
+        if interval_minutes is not None and (not isinstance(interval_minutes, int) or interval_minutes <= 0):
+            raise ValueError("Treatment interval must be a positive integer")
+        
+        self.__treatment_id = treatment_id
+        self.__animal_id = animal_id
+        self.__kind = kind
+        self.__due = due.timestamp()
+        self.__interval = interval_minutes * 60 if interval_minutes else 0
+        self.__seq = 0
+        self.__active = True
+    
+    @property
+    def treatment_id(self): return self.__treatment_id
+    
+    @property
+    def animal_id(self): return self.__animal_id
+    
+    @property
+    def kind(self): return self.__kind
+    
+    @property
+    def due(self): return datetime.datetime.fromtimestamp(self.__due)
+    
+    @property
+    def due_timestamp(self): return self.__due
+    
+    @property
+    def interval_minutes(self): return self.__interval // 60 if self.__interval else None
+    
+    @property
+    def is_active(self): return self.__active
+    
+    def display_info(self):
+        """Display treatment information."""
+        return f"{self.__animal_id} | {self.__kind} | Due: {self.due:%Y-%m-%d %H:%M}"
+    
+    # Scheduler bookkeeping. A heap entry is current only while its sequence
+    # number matches the treatment's, so rescheduling never searches the heap.
+    def _entry(self, seq):
+        self.__seq = seq
+        return (self.__due, seq, self)
+    
+    def _is_current(self, seq):
+        return self.__active and self.__seq == seq
+    
+    def _advance(self):
+        self.__due += self.__interval
+    
+    def _deactivate(self):
+        self.__active = False
+
+
+class TreatmentScheduler:
+    """Center-wide priority queue of pending treatments."""
+    
+    def __init__(self):
+        """Initialize an empty scheduler."""
+        self.__heap = []
+        self.__by_animal = {}
+        self.__next_id = 1
+        self.__next_seq = 0
+        self.__stale = 0
+    
+    def __len__(self):
+        return len(self.__heap) - self.__stale
+    
+    def schedule(self, animal_id, kind, due, interval_minutes=None):
+        """Schedule a treatment and return it."""
+        treatment = Treatment(self.__next_id, animal_id, kind, due, interval_minutes)
+        self.__next_id += 1
+        self.__by_animal.setdefault(animal_id, []).append(treatment)
+        self.__push(treatment)
+        return treatment
+    
+    def for_animal(self, animal_id):
+        """Return an animal's pending treatments, earliest first."""
+        return sorted(self.__by_animal.get(animal_id, ()), key=lambda t: t.due_timestamp)
+    
+    def next_due(self):
+        """Return the earliest pending treatment, or None."""
+        heap = self.__heap
+        while heap and not heap[0][2]._is_current(heap[0][1]):
+            heapq.heappop(heap)
+            self.__stale -= 1
+        return heap[0][2] if heap else None
+    
+    def due_within(self, minutes, now=None):
+        """
+        Return pending treatments due within the next `minutes`, earliest first.
+        
+        Overdue treatments are included. Only heap nodes inside the window are
+        visited, so the cost is O(k log k) for k results rather than O(n).
+        """
+        if not isinstance(minutes, (int, float)) or minutes < 0:
+            raise ValueError("Minutes must be a non-negative number")
+        
+        now = now or datetime.datetime.now()
+        horizon = now.timestamp() + minutes * 60
+        heap = self.__heap
+        found = []
+        stack = [0] if heap else []
+        while stack:
+            i = stack.pop()
+            due, seq, treatment = heap[i]
+            if due > horizon:
+                continue
+            if treatment._is_current(seq):
+                found.append(heap[i])
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    stack.append(child)
+        found.sort()
+        return [treatment for _, _, treatment in found]
+    
+    def complete(self, treatment):
+        """
+        Record a treatment as administered.
+        
+        Recurring treatments are rescheduled one interval later; one-off
+        treatments are removed. Returns False if the treatment is not pending.
+        """
+        if not treatment.is_active:
+            return False
+        
+        self.__stale += 1
+        if treatment.interval_minutes:
+            treatment._advance()
+            self.__push(treatment)
+        else:
+            self.__remove(treatment)
+        return True
+    
+    def cancel(self, treatment):
+        """Cancel a single pending treatment."""
+        if not treatment.is_active:
+            return False
+        
+        self.__stale += 1
+        self.__remove(treatment)
+        return True
+    
+    def cancel_animal(self, animal_id):
+        """Cancel every pending treatment for an animal. Returns the count cancelled."""
+        treatments = self.__by_animal.pop(animal_id, [])
+        for treatment in treatments:
+            treatment._deactivate()
+        self.__stale += len(treatments)
+        self.__compact_if_needed()
+        return len(treatments)
+    
+    def clear(self):
+        """Cancel everything."""
+        for treatments in self.__by_animal.values():
+            for treatment in treatments:
+                treatment._deactivate()
+        self.__heap.clear()
+        self.__by_animal.clear()
+        self.__stale = 0
+    
+    def __push(self, treatment):
+        heapq.heappush(self.__heap, treatment._entry(self.__next_seq))
+        self.__next_seq += 1
+    
+    def __remove(self, treatment):
+        treatment._deactivate()
+        treatments = self.__by_animal.get(treatment.animal_id)
+        if treatments:
+            treatments.remove(treatment)
+            if not treatments:
+                del self.__by_animal[treatment.animal_id]
+        self.__compact_if_needed()
+    
+    def __compact_if_needed(self):
+        # Drop cancelled/superseded entries once they make up half the heap
+        if self.__stale > 64 and self.__stale * 2 > len(self.__heap):
+            self.__heap = [entry for entry in self.__heap if entry[2]._is_current(entry[1])]
+            heapq.heapify(self.__heap)
+            self.__stale = 0
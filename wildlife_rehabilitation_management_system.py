@@ -1,338 +1,861 @@
-"""
-Wildlife Rehabilitation Management System
-
-This module implements a wildlife rehabilitation center management system
-focusing on constructors and destructors for resource management.
-"""
-
-import datetime
-
-
-class Animal:
-    """Class representing a wildlife patient."""
-    
-    animal_count = 0
-    
-    def __init__(self, animal_id, species, condition, intake_date):
-        """Initialize an Animal object with required tracking information."""
-        # Validate parameters
-        if not isinstance(animal_id, str) or not animal_id:
-            raise ValueError("Animal ID must be a non-empty string")
-        
-        # Initialize attributes
-        self.__animal_id = animal_id
-        self.__species = species
-        self.__condition = condition
-        self.__intake_date = intake_date
-        self.__discharge_date = None
-        self.__assigned_enclosure = None
-        self.__status = "In rehabilitation"
-        
-        # Increment animal count
-        Animal.animal_count += 1
-    
-    def __del__(self):
-        """Clean up animal resources when the object is destroyed."""
-        # Check if animal was properly discharged
-        if self.__discharge_date is None:
-            self.__discharge_date = datetime.datetime.now().strftime("%Y-%m-%d")
-        
-        # Decrement animal count
-        Animal.animal_count -= 1
-    
-    @property
-    def animal_id(self): return self.__animal_id
-    
-    @property
-    def species(self): return self.__species
-    
-    @property
-    def condition(self): return self.__condition
-    
-    @property
-    def status(self): return self.__status
-    
-    @property
-    def assigned_enclosure(self): return self.__assigned_enclosure
-    
-    @assigned_enclosure.setter
-    def assigned_enclosure(self, enclosure_id): 
-        self.__assigned_enclosure = enclosure_id
-    
-    def discharge(self, discharge_date, status):
-        """Discharge the animal from rehabilitation."""
-        self.__discharge_date = discharge_date
-        self.__status = status
-        return True
-    
-    def display_info(self):
-        """Display animal information."""
-        return f"{self.__animal_id} | {self.__species} | {self.__condition} | Status: {self.__status}"
-
-
-class Enclosure:
-    """Class representing an animal enclosure at the rehabilitation center."""
-    
-    enclosure_count = 0
-    
-    def __init__(self, enclosure_id, enclosure_type, capacity):
-        """Initialize an Enclosure object with required attributes."""
-        # Validate parameters
-        if not isinstance(capacity, int) or capacity <= 0:
-            raise ValueError("Capacity must be a positive integer")
-        
-        # Initialize attributes
-        self.__enclosure_id = enclosure_id
-        self.__enclosure_type = enclosure_type
-        self.__capacity = capacity
-        self.__animals = []
-        self.__is_active = True
-        
-        # Increment enclosure count
-        Enclosure.enclosure_count += 1
-    
-    def __del__(self):
-        """Clean up enclosure resources when the object is destroyed."""
-        # Clear animals and release resources
-        self.__animals.clear()
-        self.__is_active = False
-        
-        # Decrement enclosure count
-        Enclosure.enclosure_count -= 1
-    
-    @property
-    def enclosure_id(self): return self.__enclosure_id
-    
-    @property
-    def enclosure_type(self): return self.__enclosure_type
-    
-    @property
-    def capacity(self): return self.__capacity
-    
-    @property
-    def animals(self): return self.__animals.copy()
-    
-    @property
-    def available_capacity(self): return self.__capacity - len(self.__animals)
-    
-    def add_animal(self, animal_id):
-        """Add an animal to this enclosure if space is available."""
-        if len(self.__animals) >= self.__capacity:
-            return False
-        
-        if animal_id not in self.__animals:
-            self.__animals.append(animal_id)
-            return True
-        
-        return False
-    
-    def remove_animal(self, animal_id):
-        """Remove an animal from this enclosure."""
-        if animal_id in self.__animals:
-            self.__animals.remove(animal_id)
-            return True
-        
-        return False
-    
-    def display_info(self):
-        """Display enclosure information."""
-        return f"{self.__enclosure_id} | {self.__enclosure_type} | Capacity: {len(self.__animals)}/{self.__capacity}"
-
-
-class RehabilitationCenter:
-    """Class representing the wildlife rehabilitation center."""
-    
-    def __init__(self, name, location):
-        """Initialize a RehabilitationCenter object with required attributes."""
-        # Validate parameters
-        if not isinstance(name, str) or not name:
-            raise ValueError("Center name must be a non-empty string")
-            
-        # Initialize attributes
-        self.__name = name
-        self.__location = location
-        self.__animals = {}
-        self.__enclosures = {}
-        self.__system_start_time = datetime.datetime.now()
-    
-    def __del__(self):
-        """Clean up center resources when the object is destroyed."""
-        # Clear all collections
-        self.__animals.clear()
-        self.__enclosures.clear()
-    
-    @property
-    def name(self): return self.__name
-    
-    @property
-    def location(self): return self.__location
-    
-    @property
-    def animal_count(self): return len(self.__animals)
-    
-    @property
-    def enclosure_count(self): return len(self.__enclosures)
-    
-    # Animal management methods
-    def add_animal(self, animal):
-        """Add an animal to the center."""
-        if animal.animal_id in self.__animals:
-            return False
-        
-        self.__animals[animal.animal_id] = animal
-        return True
-    
-    def get_animal(self, animal_id):
-        """Get an animal by ID."""
-        return self.__animals.get(animal_id)
-    
-    def discharge_animal(self, animal_id, discharge_date, status):
-        """Discharge an animal from the center."""
-        animal = self.__animals.get(animal_id)
-        if not animal:
-            return False
-        
-        # Store the enclosure ID before updating animal status
-        enclosure_id = animal.assigned_enclosure
-        
-        # Remove from enclosure if assigned
-        if enclosure_id:
-            enclosure = self.__enclosures.get(enclosure_id)
-            if enclosure:
-                enclosure.remove_animal(animal_id)
-        
-        # Update animal status after removing from enclosure
-        animal.discharge(discharge_date, status)
-        
-        # Set assigned_enclosure to None after discharge and removal
-        animal.assigned_enclosure = None
-        
-        return True
-    
-    # Enclosure management methods
-    def add_enclosure(self, enclosure):
-        """Add an enclosure to the center."""
-        if enclosure.enclosure_id in self.__enclosures:
-            return False
-        
-        self.__enclosures[enclosure.enclosure_id] = enclosure
-        return True
-    
-    def get_enclosure(self, enclosure_id):
-        """Get an enclosure by ID."""
-        return self.__enclosures.get(enclosure_id)
-    
-    def assign_animal_to_enclosure(self, animal_id, enclosure_id):
-        """Assign an animal to an enclosure."""
-        animal = self.__animals.get(animal_id)
-        enclosure = self.__enclosures.get(enclosure_id)
-        
-        if not animal or not enclosure:
-            return False
-        
-        # Check if animal is already in another enclosure
-        if animal.assigned_enclosure:
-            old_enclosure = self.__enclosures.get(animal.assigned_enclosure)
-            if old_enclosure:
-                old_enclosure.remove_animal(animal_id)
-        
-        # Assign to new enclosure
-        if enclosure.add_animal(animal_id):
-            animal.assigned_enclosure = enclosure_id
-            return True
-        
-        return False
-
-
-def main():
-    # Create the rehabilitation center
-    center = RehabilitationCenter("WRA Wildlife Center", "123 Forest Road, Greenville")
-    today = datetime.datetime.now().strftime("%Y-%m-%d")
-    
-    # Create enclosures
-    enclosures = [
-        Enclosure("E001", "Aviary", 5),
-        Enclosure("E002", "Mammal Habitat", 3),
-        Enclosure("E003", "Reptile Habitat", 8)
-    ]
-    for enclosure in enclosures:
-        center.add_enclosure(enclosure)
-    
-    # Create animals
-    animals = [
-        Animal("A001", "Red Fox", "Injured leg", "2023-05-15"),
-        Animal("A002", "Barn Owl", "Wing injury", "2023-05-20"),
-        Animal("A003", "Box Turtle", "Shell damage", "2023-05-22")
-    ]
-    for animal in animals:
-        center.add_animal(animal)
-    
-    # Assign animals to enclosures
-    center.assign_animal_to_enclosure("A001", "E002")
-    center.assign_animal_to_enclosure("A002", "E001")
-    center.assign_animal_to_enclosure("A003", "E003")
-    
-    # Discharge an animal
-    center.discharge_animal("A001", today, "Transferred to long-term care facility")
-    
-    # Menu-based interaction
-    while True:
-        print("\n===== WILDLIFE REHABILITATION MANAGEMENT SYSTEM =====")
-        print(f"Center Name: {center.name}")
-        print(f"Location: {center.location}")
-        print(f"Animals: {center.animal_count} | Enclosures: {center.enclosure_count}")
-        print("\nMenu:")
-        print("1. View Animals")
-        print("2. View Enclosures")
-        print("3. Add New Animal")
-        print("4. Discharge Animal")
-        print("0. Exit")
-        
-        try:
-            choice = int(input("\nEnter your choice (0-4): "))
-            
-            if choice == 1:
-                print("\nCurrent Animals:")
-                for animal_id, animal in center._RehabilitationCenter__animals.items():
-                    print(animal.display_info())
-            
-            elif choice == 2:
-                print("\nEnclosures:")
-                for enclosure_id, enclosure in center._RehabilitationCenter__enclosures.items():
-                    print(enclosure.display_info())
-            
-            elif choice == 3:
-                animal_id = input("Enter animal ID: ")
-                species = input("Enter species: ")
-                condition = input("Enter condition: ")
-                intake_date = datetime.datetime.now().strftime("%Y-%m-%d")
-                
-                animal = Animal(animal_id, species, condition, intake_date)
-                if center.add_animal(animal):
-                    print(f"Animal {animal_id} added successfully.")
-                else:
-                    print(f"Animal with ID {animal_id} already exists.")
-            
-            elif choice == 4:
-                animal_id = input("Enter animal ID: ")
-                status = input("Enter release status: ")
-                discharge_date = datetime.datetime.now().strftime("%Y-%m-%d")
-                
-                if center.discharge_animal(animal_id, discharge_date, status):
-                    print(f"Animal {animal_id} discharged successfully.")
-                else:
-                    print(f"Animal with ID {animal_id} not found or already discharged.")
-            
-            elif choice == 0:
-                print("Thank you for using the Wildlife Rehabilitation Management System.")
-                break
-            
-            else:
-                print("Invalid choice. Please enter a number between 0 and 4.")
-        
-        except Exception as e:
-            print(f"An error occurred: {e}")
-
-
-if __name__ == "__main__":
+"""
+Wildlife Rehabilitation Management System
+
+This module implements a wildlife rehabilitation center management system
+focusing on constructors and destructors for resource management.
+"""
+
+import datetime
+import pickle
+import sys
+import threading
+import time
+import weakref
+
+from attachments import DEFAULT_CHUNK_SIZE
+from care_tasks import CareTaskScheduler
+from events import AnimalAdded, AnimalAssigned, AnimalDischarged, EnclosureAdded, EventBus
+from identifiers import IdAllocator, intern_id
+from memory import estimate_size, sample, sampled_size, tracemalloc_stats
+from snapshots import CenterSnapshot
+from species import CATALOG
+from transactions import Transaction, TransactionError
+from treatments import TreatmentScheduler
+
+
+class Animal:
+    """Class representing a wildlife patient."""
+    
+    animal_count = 0
+    
+    def __init__(self, animal_id, species, condition, intake_date):
+        """Initialize an Animal object with required tracking information."""
+        # Validate parameters
+        if not isinstance(animal_id, str) or not animal_id:
+            raise ValueError("Animal ID must be a non-empty string")
+        
+        # Initialize attributes (IDs and species are interned so every reference shares one string)
+        self.__animal_id = intern_id(animal_id)
+        self.__species = intern_id(species)
+        self.__condition = condition
+        self.__intake_date = intake_date
+        self.__discharge_date = None
+        self.__assigned_enclosure = None
+        self.__status = "In rehabilitation"
+        self.__display = None
+        
+        # Increment animal count
+        Animal.animal_count += 1
+    
+    def __del__(self):
+        """Clean up animal resources when the object is destroyed."""
+        # Check if animal was properly discharged
+        if self.__discharge_date is None:
+            self.__discharge_date = datetime.datetime.now().strftime("%Y-%m-%d")
+        
+        # Decrement animal count
+        Animal.animal_count -= 1
+    
+    @property
+    def animal_id(self): return self.__animal_id
+    
+    @property
+    def species(self): return self.__species
+    
+    @property
+    def condition(self): return self.__condition
+    
+    @property
+    def intake_date(self): return self.__intake_date
+    
+    @property
+    def discharge_date(self): return self.__discharge_date
+    
+    @property
+    def status(self): return self.__status
+    
+    @property
+    def assigned_enclosure(self): return self.__assigned_enclosure
+    
+    @assigned_enclosure.setter
+    def assigned_enclosure(self, enclosure_id): 
+        self.__assigned_enclosure = intern_id(enclosure_id)
+        self.__display = None
+    
+    def discharge(self, discharge_date, status):
+        """Discharge the animal from rehabilitation."""
+        self.__discharge_date = discharge_date
+        self.__status = status
+        self.__display = None
+        return True
+    
+    def _restore_state(self, discharge_date, status, assigned_enclosure):
+        """Put back state captured earlier; used to roll back failed transactions."""
+        self.__discharge_date = discharge_date
+        self.__status = status
+        self.__assigned_enclosure = assigned_enclosure
+        self.__display = None
+    
+    def to_record(self):
+        """Return the animal's state as a plain tuple for storage."""
+        return (self.__animal_id, self.species, self.condition, self.intake_date,
+                self.__discharge_date, self.__assigned_enclosure, self.__status)
+    
+    @classmethod
+    def from_record(cls, record):
+        """Rebuild an animal from a tuple produced by to_record()."""
+        animal_id, species, condition, intake_date, discharge_date, assigned_enclosure, status = record
+        animal = cls(animal_id, species, condition, intake_date)
+        if discharge_date is not None:
+            animal.discharge(discharge_date, status)
+        animal.assigned_enclosure = assigned_enclosure
+        return animal
+    
+    def __reduce__(self):
+        # Rebuild through the constructor so animal_count stays balanced with __del__
+        return (Animal.from_record, (self.to_record(),))
+    
+    def attach(self, store, data, name, media_type=None):
+        """
+        Attach a file (photo, X-ray, lab report) to the animal.
+        
+        Args:
+            store: attachments.AttachmentStore holding the content
+            data: Bytes-like content, or a binary file object to stream from
+            name: Attachment name, unique for this animal
+            media_type: Optional MIME type, e.g. "image/png"
+        
+        Returns:
+            Attachment: The recorded attachment
+        """
+        return store.attach(self.__animal_id, data, name, media_type)
+    
+    def attachments(self, store):
+        """Return the animal's attachments in a store, oldest first."""
+        return store.attachments(self.__animal_id)
+    
+    def stream_attachment(self, store, name, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Return an iterator over a named attachment's content in memoryview chunks; KeyError if there is none."""
+        attachment = store.find(self.__animal_id, name)
+        if attachment is None:
+            raise KeyError(f"Animal {self.__animal_id} has no attachment {name!r}")
+        return store.stream(attachment.digest, chunk_size)
+    
+    def display_info(self):
+        """Display animal information (rendered once, until the animal's state changes)."""
+        if self.__display is None:
+            self.__display = f"{self.__animal_id} | {self.species} | {self.condition} | Status: {self.__status}"
+        return self.__display
+
+
+class Enclosure:
+    """Class representing an animal enclosure at the rehabilitation center."""
+    
+    enclosure_count = 0
+    
+    def __init__(self, enclosure_id, enclosure_type, capacity):
+        """Initialize an Enclosure object with required attributes."""
+        # Validate parameters
+        if not isinstance(capacity, int) or capacity <= 0:
+            raise ValueError("Capacity must be a positive integer")
+        
+        # Initialize attributes
+        self.__enclosure_id = intern_id(enclosure_id)
+        self.__enclosure_type = enclosure_type
+        self.__capacity = capacity
+        # Insertion-ordered keys give O(1) membership tests; values are unused
+        self.__animals = {}
+        self.__listeners = []
+        self.__is_active = True
+        self.__display = None
+        
+        # Increment enclosure count
+        Enclosure.enclosure_count += 1
+    
+    def __del__(self):
+        """Clean up enclosure resources when the object is destroyed."""
+        # Clear animals and release resources
+        self.__animals.clear()
+        self.__listeners.clear()
+        self.__is_active = False
+        
+        # Decrement enclosure count
+        Enclosure.enclosure_count -= 1
+    
+    @property
+    def enclosure_id(self): return self.__enclosure_id
+    
+    @property
+    def enclosure_type(self): return self.__enclosure_type
+    
+    @property
+    def capacity(self): return self.__capacity
+    
+    @property
+    def animals(self): return list(self.__animals)
+    
+    @property
+    def available_capacity(self): return self.__capacity - len(self.__animals)
+    
+    def has_animal(self, animal_id):
+        """Return True if the animal is in this enclosure, without copying the member list."""
+        return animal_id in self.__animals
+    
+    __contains__ = has_animal
+    
+    def add_animal(self, animal_id):
+        """Add an animal to this enclosure if space is available."""
+        if len(self.__animals) >= self.__capacity:
+            return False
+        
+        if animal_id not in self.__animals:
+            self.__animals[intern_id(animal_id)] = None
+            self.__display = None
+            self.__notify("add", animal_id)
+            return True
+        
+        return False
+    
+    def remove_animal(self, animal_id):
+        """Remove an animal from this enclosure."""
+        if animal_id in self.__animals:
+            del self.__animals[animal_id]
+            self.__display = None
+            self.__notify("remove", animal_id)
+            return True
+        
+        return False
+    
+    def to_record(self):
+        """Return the enclosure's state as a plain tuple for storage."""
+        return (self.__enclosure_id, self.__enclosure_type, self.__capacity, tuple(self.__animals))
+    
+    @classmethod
+    def from_record(cls, record):
+        """Rebuild an enclosure from a tuple produced by to_record()."""
+        enclosure_id, enclosure_type, capacity, animals = record
+        enclosure = cls(enclosure_id, enclosure_type, capacity)
+        for animal_id in animals:
+            enclosure.add_animal(animal_id)
+        return enclosure
+    
+    def __reduce__(self):
+        # Listeners are process-local and are not pickled
+        return (Enclosure.from_record, (self.to_record(),))
+    
+    def add_listener(self, listener):
+        """Register a callable(enclosure, action, animal_id) called after membership changes."""
+        if listener not in self.__listeners:
+            self.__listeners.append(listener)
+    
+    def remove_listener(self, listener):
+        """Unregister a membership listener."""
+        if listener in self.__listeners:
+            self.__listeners.remove(listener)
+    
+    def __notify(self, action, animal_id):
+        for listener in self.__listeners:
+            listener(self, action, animal_id)
+    
+    def display_info(self):
+        """Display enclosure information (rendered once, until membership changes)."""
+        if self.__display is None:
+            self.__display = (f"{self.__enclosure_id} | {self.__enclosure_type} | "
+                              f"Capacity: {len(self.__animals)}/{self.__capacity}")
+        return self.__display
+
+
+class RehabilitationCenter:
+    """Class representing the wildlife rehabilitation center."""
+    
+    def __init__(self, name, location, animal_cache=None, species_catalog=None):
+        """
+        Initialize a RehabilitationCenter object with required attributes.
+        
+        Args:
+            name: Name of the center
+            location: Address of the center
+            animal_cache: Optional mapping (e.g. animal_store.AnimalCache) used
+                instead of an in-memory dict to hold the center's animals
+            species_catalog: Optional species.SpeciesCatalog deciding which
+                enclosure types each species may go into (default: species.CATALOG)
+        """
+        # Validate parameters
+        if not isinstance(name, str) or not name:
+            raise ValueError("Center name must be a non-empty string")
+            
+        # Initialize attributes
+        self.__name = name
+        self.__location = location
+        self.__animals = {} if animal_cache is None else animal_cache
+        self.__enclosures = {}
+        self.__enclosures_by_type = {}
+        self.__species_catalog = CATALOG if species_catalog is None else species_catalog
+        self.__write_lock = threading.RLock()
+        self.__snapshots = weakref.WeakSet()
+        self.__animals_shared = False
+        self.__enclosures_shared = False
+        self.__deferred = None
+        self.__indexes = []
+        self.__treatments = TreatmentScheduler()
+        self.__events = EventBus()
+        self.__system_start_time = datetime.datetime.now()
+        self.__care_tasks = CareTaskScheduler(start=self.__system_start_time)
+        self.__animal_ids = IdAllocator("A")
+        self.__enclosure_ids = IdAllocator("E")
+    
+    def __del__(self):
+        """Clean up center resources when the object is destroyed."""
+        # Deliver pending notifications, then clear all collections
+        # (maps shared with live snapshots belong to those snapshots now)
+        self.__events.flush()
+        if not self.__animals_shared:
+            self.__animals.clear()
+        if not self.__enclosures_shared:
+            self.__enclosures.clear()
+        self.__treatments.clear()
+        self.__care_tasks.clear()
+    
+    @property
+    def name(self): return self.__name
+    
+    @property
+    def location(self): return self.__location
+    
+    @property
+    def animal_count(self): return len(self.__animals)
+    
+    @property
+    def enclosure_count(self): return len(self.__enclosures)
+    
+    @property
+    def treatments(self): return self.__treatments
+    
+    @property
+    def species_catalog(self): return self.__species_catalog
+    
+    def __reduce_ex__(self, protocol):
+        # Pickle through the compact binary format; with protocol 5 the encoded
+        # bytes travel out-of-band without another copy. A custom species catalog
+        # is pickled along (as a copy); schedulers and subscriptions are not kept.
+        import serialization
+        data = serialization.dumps(self)
+        if protocol >= 5:
+            data = pickle.PickleBuffer(data)
+        catalog = None if self.__species_catalog is CATALOG else self.__species_catalog
+        return (serialization.loads, (data, catalog))
+    
+    @property
+    def care_tasks(self): return self.__care_tasks
+    
+    # Snapshot methods
+    def snapshot(self):
+        """
+        Take a consistent point-in-time view of the center in O(1).
+        
+        The snapshot shares the center's animal and enclosure dicts. While it
+        is alive, the first add of an animal (or enclosure) copies that dict,
+        an O(n) pause paid once per snapshot; later writes, and assignments
+        and discharges, cost no more than without a snapshot.
+        
+        Returns:
+            CenterSnapshot: Read-only view unaffected by later writes
+        """
+        if not isinstance(self.__animals, dict):
+            raise TypeError("Snapshots require the center's animals to be held in memory")
+        
+        with self.__write_lock:
+            snapshot = CenterSnapshot(self.__animals, self.__enclosures)
+            self.__snapshots.add(snapshot)
+            self.__animals_shared = True
+            self.__enclosures_shared = True
+        return snapshot
+    
+    def __unshare_animals(self):
+        # Copy-on-write: the first insert after a snapshot copies only the dict it changes
+        if self.__animals_shared:
+            if self.__snapshots:
+                self.__animals = dict(self.__animals)
+            self.__animals_shared = False
+    
+    def __unshare_enclosures(self):
+        if self.__enclosures_shared:
+            if self.__snapshots:
+                self.__enclosures = dict(self.__enclosures)
+            self.__enclosures_shared = False
+    
+    def __preserve(self, animal, *enclosures):
+        # Let live snapshots keep the state about to be overwritten
+        for snapshot in self.__snapshots:
+            snapshot._preserve_animal(animal)
+            for enclosure in enclosures:
+                if enclosure:
+                    snapshot._preserve_members(enclosure)
+    
+    # Transaction methods
+    def transaction(self):
+        """
+        Start a transaction; use as `with center.transaction() as tx:`.
+        
+        Operations called on the transaction are buffered and applied
+        atomically when the block exits. Reads inside the block do not
+        see the buffered operations.
+        """
+        return Transaction(self)
+    
+    def _apply_operations(self, operations):
+        """Apply buffered (method name, args) operations all-or-nothing."""
+        with self.__write_lock:
+            self.__deferred = []
+            undo_log = []
+            try:
+                for name, args in operations:
+                    undo_log.append(self.__capture(name, args))
+                    if not getattr(self, name)(*args):
+                        raise TransactionError(f"{name}{args} failed; transaction rolled back")
+            except Exception:
+                for undo in reversed(undo_log):
+                    self.__rollback(undo)
+                self.__deferred = None
+                raise
+            deferred, self.__deferred = self.__deferred, None
+            
+            # Single maintenance pass for the whole batch, still under the lock
+            # so a concurrent writer cannot publish its events before these
+            for event in deferred:
+                if isinstance(event, AnimalDischarged):
+                    self.__treatments.cancel_animal(event.animal_id)
+                elif isinstance(event, AnimalAdded) and self.__indexes:
+                    animal = self.__animals.get(event.animal_id)
+                    for index in self.__indexes:
+                        index.add_animal(animal)
+            if self.__events.has_subscribers and deferred:
+                self.__events.publish_many(deferred)
+        return True
+    
+    def __capture(self, name, args):
+        # Record what an operation may change so it can be undone
+        if name == "add_animal":
+            return ("animal_map", args[0].animal_id, args[0].animal_id in self.__animals)
+        if name == "add_enclosure":
+            return ("enclosure_map", args[0].enclosure_id, args[0].enclosure_id in self.__enclosures)
+        
+        animal = self.__animals.get(args[0])
+        if not animal:
+            return None
+        target_id = args[1] if name == "assign_animal_to_enclosure" else None
+        return ("animal_state", animal, (animal.discharge_date, animal.status, animal.assigned_enclosure), target_id)
+    
+    def __rollback(self, undo):
+        if undo is None:
+            return
+        kind = undo[0]
+        if kind in ("animal_map", "enclosure_map"):
+            _, key, existed = undo
+            if not existed:
+                if kind == "animal_map":
+                    self.__unshare_animals()
+                    self.__animals.pop(key, None)
+                else:
+                    self.__unshare_enclosures()
+                    self.__forget_enclosure(self.__enclosures.pop(key, None))
+            return
+        
+        # Only this animal's membership can have changed: take it out of the
+        # target enclosure and put it back where it was
+        _, animal, state, target_id = undo
+        previous_id = state[2]
+        if target_id and target_id != previous_id:
+            target = self.__enclosures.get(target_id)
+            if target:
+                target.remove_animal(animal.animal_id)
+        previous = self.__enclosures.get(previous_id)
+        if previous:
+            previous.add_animal(animal.animal_id)
+        animal._restore_state(*state)
+        if not isinstance(self.__animals, dict):
+            # A cache may have evicted this animal, writing its changed state
+            # back to the store; write the restored state through as well
+            self.__animals[animal.animal_id] = animal
+    
+    def __emitting(self):
+        return self.__deferred is not None or self.__events.has_subscribers
+    
+    def __emit(self, event):
+        # Inside a transaction events wait for the commit pass
+        if self.__deferred is not None:
+            self.__deferred.append(event)
+        else:
+            self.__events.publish(event)
+    
+    # Memory accounting
+    def memory_report(self, sample_size=100, top=0):
+        """
+        Estimate the memory held by each part of the center.
+        
+        Object sizes are extrapolated from an evenly spaced sample, so the
+        report stays cheap on large centers. The result is a flat dict of
+        numbers (e.g. "animals.object_bytes") that can be logged periodically
+        and compared over time.
+        
+        Args:
+            sample_size: Objects sized per component
+            top: With tracemalloc tracing, also list the top source files by bytes
+        """
+        # Validate parameters
+        if not isinstance(sample_size, int) or sample_size <= 0:
+            raise ValueError("Sample size must be a positive integer")
+        
+        report = {"timestamp": time.time()}
+        with self.__write_lock:
+            animals, enclosures = self.__animals, self.__enclosures
+            
+            report["animals.count"] = len(animals)
+            if isinstance(animals, dict):
+                report["animals.map_bytes"] = sys.getsizeof(animals)
+                report["animals.object_bytes"] = sampled_size(animals.values(), len(animals), sample_size)
+            else:
+                # Cache-backed: only the resident entries are in memory
+                report["animals.cached_count"] = animals.stats()["cached_entries"]
+                report["animals.cache_bytes"] = estimate_size(animals, sample_size)
+            
+            report["enclosures.count"] = len(enclosures)
+            report["enclosures.map_bytes"] = sys.getsizeof(enclosures)
+            # IDs are interned and owned by the animals, so strings are not counted again
+            report["enclosures.object_bytes"] = sampled_size(enclosures.values(), len(enclosures),
+                                                             sample_size, shared=str)
+            members = sample(enclosures.values(), len(enclosures), sample_size)
+            report["enclosures.membership_bytes"] = int(
+                sum(sys.getsizeof(dict.fromkeys(enclosure.animals)) for enclosure in members)
+                * len(enclosures) / len(members)
+            ) if members else 0
+            
+            for index in self.__indexes:
+                report[f"indexes.{type(index).__name__}.bytes"] = estimate_size(index, sample_size, shared=str)
+            report["treatments.bytes"] = estimate_size(self.__treatments, sample_size)
+            report["care_tasks.bytes"] = estimate_size(self.__care_tasks, sample_size)
+            report["events.bytes"] = estimate_size(self.__events, sample_size)
+            report["snapshots.live"] = len(self.__snapshots)
+        
+        # Membership lists are already part of the enclosure objects
+        report["total_estimated_bytes"] = sum(value for key, value in report.items()
+                                              if key.endswith("bytes") and key != "enclosures.membership_bytes")
+        report.update(tracemalloc_stats(top))
+        return report
+    
+    # Index methods
+    def attach_index(self, index):
+        """
+        Attach an animal index (e.g. search_index.AnimalTextIndex).
+        
+        The index is built from the current animals and then kept current
+        by add_animal. It must provide add_animal(animal).
+        """
+        with self.__write_lock:
+            if index in self.__indexes:
+                return False
+            
+            for animal in self.__animals.values():
+                index.add_animal(animal)
+            self.__indexes.append(index)
+            return True
+    
+    def detach_index(self, index):
+        """Stop maintaining an attached index."""
+        with self.__write_lock:
+            if index not in self.__indexes:
+                return False
+            
+            self.__indexes.remove(index)
+            return True
+    
+    # Event subscription methods
+    def subscribe(self, callback, event_types=None, max_batch=100, max_delay=1.0):
+        """
+        Subscribe to change events delivered in batches.
+        
+        Args:
+            callback: Callable receiving a list of events (see events module)
+            event_types: Event classes to receive, or None for all
+            max_batch: Deliver as soon as this many events are pending
+            max_delay: Deliver once the oldest pending event is this many seconds old
+        
+        Returns:
+            Subscription: Handle for unsubscribe()
+        """
+        return self.__events.subscribe(callback, event_types, max_batch, max_delay)
+    
+    def unsubscribe(self, subscription):
+        """Remove a subscription after delivering its pending events."""
+        return self.__events.unsubscribe(subscription)
+    
+    def flush_events(self):
+        """Deliver every pending event batch now."""
+        self.__events.flush()
+    
+    def poll_events(self):
+        """Deliver event batches whose time window has elapsed."""
+        self.__events.poll()
+    
+    # Animal management methods
+    def add_animal(self, animal):
+        """Add an animal to the center."""
+        with self.__write_lock:
+            if animal.animal_id in self.__animals:
+                return False
+            
+            self.__unshare_animals()
+            self.__animals[animal.animal_id] = animal
+            if self.__indexes and self.__deferred is None:
+                for index in self.__indexes:
+                    index.add_animal(animal)
+            if self.__emitting():
+                self.__emit(AnimalAdded(animal.animal_id, animal.species, time.time()))
+            return True
+    
+    def get_animal(self, animal_id):
+        """Get an animal by ID."""
+        return self.__animals.get(animal_id)
+    
+    def allocate_animal_ids(self, count=1):
+        """Issue `count` new animal IDs ("A001", "A002", ...) not used in this center."""
+        return self.__animal_ids.allocate_many(count, self.__animals)
+    
+    def discharge_animal(self, animal_id, discharge_date, status):
+        """Discharge an animal from the center."""
+        with self.__write_lock:
+            animal = self.__animals.get(animal_id)
+            if not animal:
+                return False
+            
+            # Store the enclosure ID before updating animal status
+            enclosure_id = animal.assigned_enclosure
+            enclosure = self.__enclosures.get(enclosure_id) if enclosure_id else None
+            if self.__snapshots:
+                self.__preserve(animal, enclosure)
+            
+            # Remove from enclosure if assigned
+            if enclosure:
+                enclosure.remove_animal(animal_id)
+            
+            # Update animal status after removing from enclosure
+            animal.discharge(discharge_date, status)
+            
+            # Set assigned_enclosure to None after discharge and removal
+            animal.assigned_enclosure = None
+            
+            # Cancel any treatments still pending for the animal
+            # (transactions do this once at commit instead)
+            if self.__deferred is None:
+                self.__treatments.cancel_animal(animal_id)
+            
+            if self.__emitting():
+                self.__emit(AnimalDischarged(animal_id, discharge_date, status, enclosure_id, time.time()))
+            
+            return True
+    
+    # Treatment management methods
+    def schedule_treatment(self, animal_id, kind, due, interval_minutes=None):
+        """Schedule a treatment for an animal in rehabilitation. Returns the Treatment or None."""
+        animal = self.__animals.get(animal_id)
+        if not animal or animal.discharge_date is not None:
+            return None
+        
+        return self.__treatments.schedule(animal_id, kind, due, interval_minutes)
+    
+    def get_due_treatments(self, minutes, now=None):
+        """Get treatments due within the next number of minutes, earliest first."""
+        return self.__treatments.due_within(minutes, now)
+    
+    # Enclosure management methods
+    def add_enclosure(self, enclosure):
+        """Add an enclosure to the center."""
+        with self.__write_lock:
+            if enclosure.enclosure_id in self.__enclosures:
+                return False
+            
+            self.__unshare_enclosures()
+            self.__enclosures[enclosure.enclosure_id] = enclosure
+            self.__enclosures_by_type.setdefault(enclosure.enclosure_type, {})[enclosure.enclosure_id] = None
+            if self.__emitting():
+                self.__emit(EnclosureAdded(enclosure.enclosure_id, enclosure.enclosure_type,
+                                           enclosure.capacity, time.time()))
+            return True
+    
+    def get_enclosure(self, enclosure_id):
+        """Get an enclosure by ID."""
+        return self.__enclosures.get(enclosure_id)
+    
+    def enclosure_ids(self):
+        """Return a list of the center's enclosure IDs."""
+        return list(self.__enclosures)
+    
+    def compatible_enclosure_ids(self, species):
+        """Return the IDs of enclosures whose type suits a species (all of them for uncataloged species)."""
+        types = self.__species_catalog.compatible_types(species)
+        if types is None:
+            return list(self.__enclosures)
+        return [enclosure_id for enclosure_type in types
+                for enclosure_id in self.__enclosures_by_type.get(enclosure_type, ())]
+    
+    def __forget_enclosure(self, enclosure):
+        if enclosure:
+            same_type = self.__enclosures_by_type.get(enclosure.enclosure_type, {})
+            same_type.pop(enclosure.enclosure_id, None)
+            if not same_type:
+                self.__enclosures_by_type.pop(enclosure.enclosure_type, None)
+    
+    def allocate_enclosure_ids(self, count=1):
+        """Issue `count` new enclosure IDs ("E001", "E002", ...) not used in this center."""
+        return self.__enclosure_ids.allocate_many(count, self.__enclosures)
+    
+    def assign_animal_to_enclosure(self, animal_id, enclosure_id):
+        """Assign an animal to an enclosure."""
+        with self.__write_lock:
+            animal = self.__animals.get(animal_id)
+            enclosure = self.__enclosures.get(enclosure_id)
+            
+            if not animal or not enclosure:
+                return False
+            
+            # Check the species may be housed in this type of enclosure
+            if not self.__species_catalog.is_compatible(animal.species, enclosure.enclosure_type):
+                return False
+            
+            # Check if animal is already in another enclosure
+            previous_enclosure_id = animal.assigned_enclosure
+            if self.__snapshots:
+                self.__preserve(animal, enclosure, self.__enclosures.get(previous_enclosure_id))
+            if animal.assigned_enclosure:
+                old_enclosure = self.__enclosures.get(animal.assigned_enclosure)
+                if old_enclosure:
+                    old_enclosure.remove_animal(animal_id)
+            
+            # Assign to new enclosure
+            if enclosure.add_animal(animal_id):
+                animal.assigned_enclosure = enclosure_id
+                if self.__emitting():
+                    self.__emit(AnimalAssigned(animal_id, enclosure_id, previous_enclosure_id, time.time()))
+                return True
+            
+            return False
+    
+    def schedule_care_task(self, enclosure_id, name, interval_minutes, callback=None):
+        """Schedule a recurring care task for an enclosure. Returns the CareTask or None."""
+        enclosure = self.__enclosures.get(enclosure_id)
+        if not enclosure:
+            return None
+        
+        return self.__care_tasks.add_task(enclosure, name, interval_minutes, callback)
+    
+    # Display methods
+    def render_all(self, kind="animals"):
+        """
+        Render the display lines of every animal or enclosure as one listing.
+        
+        Each object's line is cached until its state changes, so repeated
+        listings only re-render what changed since the last one.
+        
+        Args:
+            kind: "animals" or "enclosures"
+        """
+        # Validate parameters
+        if kind not in ("animals", "enclosures"):
+            raise ValueError("Kind must be 'animals' or 'enclosures'")
+        
+        # Copy the references under the lock; render without blocking writers
+        with self.__write_lock:
+            objects = list((self.__animals if kind == "animals" else self.__enclosures).values())
+        return "\n".join([item.display_info() for item in objects])
+
+
+def main():
+    # Create the rehabilitation center
+    center = RehabilitationCenter("WRA Wildlife Center", "123 Forest Road, Greenville")
+    today = datetime.datetime.now().strftime("%Y-%m-%d")
+    
+    # Create enclosures
+    enclosures = [
+        Enclosure("E001", "Aviary", 5),
+        Enclosure("E002", "Mammal Habitat", 3),
+        Enclosure("E003", "Reptile Habitat", 8)
+    ]
+    for enclosure in enclosures:
+        center.add_enclosure(enclosure)
+    
+    # Create animals
+    animals = [
+        Animal("A001", "Red Fox", "Injured leg", "2023-05-15"),
+        Animal("A002", "Barn Owl", "Wing injury", "2023-05-20"),
+        Animal("A003", "Box Turtle", "Shell damage", "2023-05-22")
+    ]
+    for animal in animals:
+        center.add_animal(animal)
+    
+    # Assign animals to enclosures
+    center.assign_animal_to_enclosure("A001", "E002")
+    center.assign_animal_to_enclosure("A002", "E001")
+    center.assign_animal_to_enclosure("A003", "E003")
+    
+    # Discharge an animal
+    center.discharge_animal("A001", today, "Transferred to long-term care facility")
+    
+    # Menu-based interaction
+    while True:
+        print("\n===== WILDLIFE REHABILITATION MANAGEMENT SYSTEM =====")
+        print(f"Center Name: {center.name}")
+        print(f"Location: {center.location}")
+        print(f"Animals: {center.animal_count} | Enclosures: {center.enclosure_count}")
+        print("\nMenu:")
+        print("1. View Animals")
+        print("2. View Enclosures")
+        print("3. Add New Animal")
+        print("4. Discharge Animal")
+        print("0. Exit")
+        
+        try:
+            choice = int(input("\nEnter your choice (0-4): "))
+            
+            if choice == 1:
+                print("\nCurrent Animals:")
+                print(center.render_all("animals"))
+            
+            elif choice == 2:
+                print("\nEnclosures:")
+                print(center.render_all("enclosures"))
+            
+            elif choice == 3:
+                animal_id = input("Enter animal ID: ")
+                species = input("Enter species: ")
+                condition = input("Enter condition: ")
+                intake_date = datetime.datetime.now().strftime("%Y-%m-%d")
+                
+                animal = Animal(animal_id, species, condition, intake_date)
+                if center.add_animal(animal):
+                    print(f"Animal {animal_id} added successfully.")
+                else:
+                    print(f"Animal with ID {animal_id} already exists.")
+            
+            elif choice == 4:
+                animal_id = input("Enter animal ID: ")
+                status = input("Enter release status: ")
+                discharge_date = datetime.datetime.now().strftime("%Y-%m-%d")
+                
+                if center.discharge_animal(animal_id, discharge_date, status):
+                    print(f"Animal {animal_id} discharged successfully.")
+                else:
+                    print(f"Animal with ID {animal_id} not found or already discharged.")
+            
+            elif choice == 0:
+                print("Thank you for using the Wildlife Rehabilitation Management System.")
+                break
+            
+            else:
+                print("Invalid choice. Please enter a number between 0 and 4.")
+        
+        except Exception as e:
+            print(f"An error occurred: {e}")
+
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,293 @@
+"""
+Workload recording and replay for the Wildlife Rehabilitation Management System.
+
+WorkloadRecorder is opt-in: attach() wraps the public methods of one
+RehabilitationCenter instance (the class is untouched) so every call is
+appended to a trace with its arguments, its start time relative to the
+start of recording, its duration and whether it succeeded. A transaction
+is recorded as one entry holding its buffered operations, not as the
+operations it applies internally. Arguments that are mutable objects are
+pickled as the call is made, so an Animal is stored as it was when added
+even if it is discharged later; plain values (IDs, dates, numbers) are
+kept as they are. Entries are buffered and pickled to the trace file in
+chunks, which lets pickle store a repeated ID string once per chunk.
+
+RECORDED_METHODS is derived from the center's public methods, so new ones
+are recorded without a change here. NOT_RECORDED lists the exceptions:
+transaction() is recorded as the single entry its commit produces, and
+subscribe/unsubscribe/attach_index/detach_index register callbacks and
+index objects that live in the recording process and that a replay
+against another center cannot recreate. A recorded call whose arguments
+cannot be pickled (e.g. a care task callback) keeps its timing but not its
+arguments; replay() counts it as skipped.
+
+replay() re-executes a trace against a fresh center, as fast as possible
+or at a scaled version of the recorded timing, and reports per-operation
+latency percentiles. Run `python workload.py TRACE [SPEED]` to replay a
+trace from the command line.
+"""
+
+import datetime
+import pickle
+import sys
+import threading
+import time
+from collections import namedtuple
+
+from wildlife_rehabilitation_management_system import RehabilitationCenter
+
+TraceEntry = namedtuple("TraceEntry", "operation args kwargs offset duration ok")
+
+TRANSACTION = "transaction"
+
+# Public center methods that are not wrapped (see the module docstring)
+NOT_RECORDED = frozenset((TRANSACTION, "subscribe", "unsubscribe", "attach_index", "detach_index"))
+
+# Every other public center method is recorded
+RECORDED_METHODS = tuple(
+    name for name, value in vars(RehabilitationCenter).items()
+    if not name.startswith("_") and callable(value) and name not in NOT_RECORDED)
+
+# Entries buffered before a write to the trace file
+CHUNK_ENTRIES = 1024
+
+# Argument types that cannot change after the call and need no early copy
+_PLAIN = (str, int, float, bool, type(None), datetime.date, datetime.time, datetime.timedelta)
+
+
+class WorkloadRecorder:
+    """Records calls made on a RehabilitationCenter to a trace file."""
+    
+    def __init__(self, path):
+        """
+        Initialize a WorkloadRecorder.
+        
+        Args:
+            path: Trace file to create (overwritten if it exists)
+        """
+        self.__path = path
+        self.__file = open(path, "wb")
+        self.__buffer = []
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+        self.__center = None
+        self.__start = None
+        self.__recorded = 0
+    
+    @property
+    def path(self): return self.__path
+    
+    @property
+    def entry_count(self): return self.__recorded
+    
+    def attach(self, center):
+        """Start recording calls made on a center."""
+        if self.__center is not None:
+            raise ValueError("Recorder is already attached to a center")
+        if self.__file is None:
+            raise ValueError("Recorder is closed")
+        
+        self.__center = center
+        self.__start = time.perf_counter()
+        for name in RECORDED_METHODS:
+            setattr(center, name, self.__wrap(name, getattr(center, name)))
+        # Transactions hand their buffered operations to this hook on commit
+        setattr(center, "_apply_operations", self.__wrap(TRANSACTION, center._apply_operations))
+        return True
+    
+    def detach(self):
+        """Stop recording and restore the center's own methods."""
+        center = self.__center
+        if center is None:
+            return False
+        
+        for name in (*RECORDED_METHODS, "_apply_operations"):
+            vars(center).pop(name, None)
+        self.__center = None
+        self.flush()
+        return True
+    
+    def flush(self):
+        """Write buffered entries to the trace file."""
+        with self.__lock:
+            self.__write()
+            if self.__file:
+                self.__file.flush()
+    
+    def close(self):
+        """Detach and close the trace file."""
+        self.detach()
+        with self.__lock:
+            self.__write()
+            if self.__file:
+                self.__file.close()
+                self.__file = None
+    
+    def __wrap(self, name, method):
+        local = self.__local
+        
+        def recorded(*args, **kwargs):
+            # Calls made while applying a recorded call (a transaction's
+            # operations) are part of that call, not entries of their own
+            if getattr(local, "active", False):
+                return method(*args, **kwargs)
+            
+            arguments = (args, kwargs)
+            if not _plain(args) or (kwargs and not _plain(kwargs.values())):
+                try:
+                    arguments = pickle.dumps(arguments, pickle.HIGHEST_PROTOCOL)
+                except (pickle.PicklingError, TypeError, AttributeError):
+                    # Timed, but cannot be replayed
+                    arguments = None
+            local.active = True
+            start = time.perf_counter()
+            ok = False
+            try:
+                result = method(*args, **kwargs)
+                ok = _succeeded(result)
+                return result
+            finally:
+                end = time.perf_counter()
+                local.active = False
+                self.__append((name, start - self.__start, end - start, ok, arguments))
+        
+        recorded.__name__ = name
+        recorded.__doc__ = method.__doc__
+        return recorded
+    
+    def __append(self, entry):
+        with self.__lock:
+            self.__buffer.append(entry)
+            self.__recorded += 1
+            if len(self.__buffer) >= CHUNK_ENTRIES:
+                self.__write()
+    
+    def __write(self):
+        if self.__buffer and self.__file:
+            pickle.dump(self.__buffer, self.__file, pickle.HIGHEST_PROTOCOL)
+        self.__buffer = []
+
+
+def _plain(values):
+    for value in values:
+        if not isinstance(value, _PLAIN):
+            return False
+    return True
+
+
+def _succeeded(result):
+    # Center methods report failure as False or None
+    return result is not False and result is not None
+
+
+def read_trace(path):
+    """Yield the TraceEntry records of a trace file in recorded order."""
+    # The file is a sequence of pickled chunks of (operation, offset, duration, ok,
+    # arguments) tuples; arguments is (args, kwargs), pickled again if copied early,
+    # or None if they could not be pickled (args and kwargs are then None)
+    with open(path, "rb") as trace:
+        while True:
+            try:
+                chunk = pickle.load(trace)
+            except EOFError:
+                return
+            for operation, offset, duration, ok, arguments in chunk:
+                if arguments is None:
+                    args, kwargs = None, None
+                else:
+                    args, kwargs = pickle.loads(arguments) if isinstance(arguments, bytes) else arguments
+                yield TraceEntry(operation, args, kwargs, offset, duration, ok)
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def replay(path, center=None, speed=None):
+    """
+    Re-execute a trace and measure each operation.
+    
+    Args:
+        path: Trace file written by WorkloadRecorder
+        center: Center to replay against (default: a new empty center)
+        speed: None to replay as fast as possible, or a factor applied to
+            the recorded timing (1.0 real time, 2.0 twice as fast)
+    
+    Returns:
+        dict: {operation: {"count", "diverged", "skipped", "mean_us", "p50_us",
+               "p95_us", "p99_us", "max_us", "recorded_mean_us"}}, where
+               "diverged" counts calls whose success differs from the recording
+               and "skipped" calls recorded without their arguments
+    """
+    if speed is not None and (not isinstance(speed, (int, float)) or speed <= 0):
+        raise ValueError("Speed must be a positive number")
+    
+    center = center if center is not None else RehabilitationCenter("Replay Center", "Replay")
+    latencies = {}
+    recorded = {}
+    diverged = {}
+    skipped = {}
+    start = time.perf_counter()
+    for entry in read_trace(path):
+        if entry.args is None:
+            skipped[entry.operation] = skipped.get(entry.operation, 0) + 1
+            continue
+        if speed is not None:
+            delay = entry.offset / speed - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+        
+        began = time.perf_counter()
+        try:
+            if entry.operation == TRANSACTION:
+                with center.transaction() as tx:
+                    for name, args in entry.args[0]:
+                        getattr(tx, name)(*args)
+                ok = True
+            else:
+                ok = _succeeded(getattr(center, entry.operation)(*entry.args, **entry.kwargs))
+        except Exception:
+            # Any failure of the call itself: it failed the same way when
+            # recorded, or is counted as diverged below
+            ok = False
+        elapsed = time.perf_counter() - began
+        
+        latencies.setdefault(entry.operation, []).append(elapsed)
+        recorded[entry.operation] = recorded.get(entry.operation, 0.0) + entry.duration
+        if ok != entry.ok:
+            diverged[entry.operation] = diverged.get(entry.operation, 0) + 1
+    
+    summary = {}
+    for operation, samples in latencies.items():
+        samples.sort()
+        summary[operation] = {
+            "count": len(samples),
+            "diverged": diverged.get(operation, 0),
+            "skipped": skipped.pop(operation, 0),
+            "mean_us": sum(samples) * 1e6 / len(samples),
+            "p50_us": _percentile(samples, 0.50) * 1e6,
+            "p95_us": _percentile(samples, 0.95) * 1e6,
+            "p99_us": _percentile(samples, 0.99) * 1e6,
+            "max_us": samples[-1] * 1e6,
+            "recorded_mean_us": recorded[operation] * 1e6 / len(samples),
+        }
+    for operation, count in skipped.items():
+        # Every call of this operation was recorded without its arguments
+        summary[operation] = {"count": 0, "diverged": 0, "skipped": count}
+    return summary
+
+
+def main(args):
+    if not args:
+        print("usage: python workload.py TRACE [SPEED]")
+        return 2
+    
+    speed = float(args[1]) if len(args) > 1 else None
+    for operation, stats in sorted(replay(args[0], speed=speed).items()):
+        print(operation + ": " + " | ".join(f"{key}={value:.4g}" if isinstance(value, float) else f"{key}={value}"
+                                            for key, value in stats.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))